@@ -1,10 +1,12 @@
 from django.contrib.auth.models import (AbstractBaseUser, BaseUserManager,
                                         PermissionsMixin)
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 
 from healthid.manager import BaseManager
 from healthid.utils.app_utils.id_generator import ID_LENGTH, id_gen
+from healthid.utils.app_utils.identity import memoize_identity
 
 
 class UserManager(BaseUserManager, BaseManager):
@@ -113,15 +115,19 @@ class User(AbstractBaseUser, PermissionsMixin):
             outlet(obj): if user is active to an outlet
             None: if user is not active to any outlet
         """
-        outlet_user = \
-            self.outletuser_set.filter(is_default_outlet=True)
-        if outlet_user.exists():
-            return outlet_user.first().outlet
-        outlet_user = \
-            self.outletuser_set.filter(is_active_outlet=True)
-        if outlet_user.exists():
-            return outlet_user.first().outlet
-        return None
+        return memoize_identity(
+            self, 'active_outlet', self.load_active_outlet)
+
+    def load_active_outlet(self):
+        """
+        Load the default outlet of the user, or else the first outlet they
+        are active in, with one query.
+        """
+        outlet_user = self.outletuser_set.filter(
+            Q(is_default_outlet=True) | Q(is_active_outlet=True)
+        ).select_related('outlet').order_by('-is_default_outlet', 'pk')
+        outlet_user = outlet_user.first()
+        return outlet_user.outlet if outlet_user else None
 
     @property
     def active_outlets(self):
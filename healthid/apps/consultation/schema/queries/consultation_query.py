@@ -9,7 +9,8 @@ from graphql_jwt.decorators import login_required
 from healthid.apps.consultation.schema.consultation_schema import (
     ConsultationCatalogueType)
 from healthid.utils.app_utils.database import get_model_object
-from healthid.utils.app_utils.pagination import pagination_query
+from healthid.utils.app_utils.pagination import (
+    pagination_query, store_pagination, total_pages)
 from healthid.utils.messages.consultation_reponses import \
     CONSULTATION_ERROR_RESPONSES
 from healthid.utils.app_utils.pagination_defaults import PAGINATION_DEFAULT
@@ -32,7 +33,6 @@ class Query(graphene.ObjectType):
         minutes_per_session=graphene.Int()
     )
     total_consultations_pages_count = graphene.Int()
-    pagination_result = None
 
     @login_required
     def resolve_consultations(self, info, **kwargs):
@@ -47,13 +47,13 @@ class Query(graphene.ObjectType):
         if page_count or page_number:
             consultations = pagination_query(
                 all_consultations, page_count, page_number)
-            Query.pagination_result = consultations
+            store_pagination(info, consultations)
             return consultations[0]
         paginated_response = pagination_query(all_consultations,
                                               PAGINATION_DEFAULT["page_count"],
                                               PAGINATION_DEFAULT["page_number"]
                                               )
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -67,9 +67,7 @@ class Query(graphene.ObjectType):
         is being applied, this is due to GraphQL order of resolver methods
         execution.
         """
-        if not Query.pagination_result:
-            return 0
-        return Query.pagination_result[1]
+        return total_pages(info)
 
     @login_required
     def resolve_consultation(self, info, **kwargs):
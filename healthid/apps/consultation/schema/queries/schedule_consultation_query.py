@@ -6,7 +6,8 @@ from healthid.apps.consultation.schema.consultation_schema import (
     CustomerConsultation)
 from graphql import GraphQLError
 from graphql_jwt.decorators import login_required
-from healthid.utils.app_utils.pagination import pagination_query
+from healthid.utils.app_utils.pagination import (
+    pagination_query, store_pagination, total_pages)
 from healthid.utils.messages.consultation_reponses import \
     CONSULTATION_ERROR_RESPONSES
 from healthid.utils.app_utils.pagination_defaults import PAGINATION_DEFAULT
@@ -28,7 +29,6 @@ class Query(graphene.ObjectType):
         booking_date=graphene.Date()
     )
     total_bookings_pages_count = graphene.Int()
-    pagination_result = None
 
     @login_required
     def resolve_bookings(self, info, **kwargs):
@@ -42,14 +42,14 @@ class Query(graphene.ObjectType):
             if page_count or page_number:
                 customer_consultations = pagination_query(
                     all_customer_consultations, page_count, page_number)
-                Query.pagination_result = customer_consultations
+                store_pagination(info, customer_consultations)
                 return customer_consultations[0]
             paginated_response =\
                 pagination_query(all_customer_consultations,
                                  PAGINATION_DEFAULT["page_count"],
                                  PAGINATION_DEFAULT["page_number"]
                                  )
-            Query.pagination_result = paginated_response
+            store_pagination(info, paginated_response)
             return paginated_response[0]
         error = CONSULTATION_ERROR_RESPONSES["no_scheduled_consultations"]
         raise GraphQLError(error)
@@ -65,9 +65,7 @@ class Query(graphene.ObjectType):
         is being applied, this is due to GraphQL order of resolver methods
         execution.
         """
-        if not Query.pagination_result:
-            return 0
-        return Query.pagination_result[1]
+        return total_pages(info)
 
     @login_required
     def resolve_booking(self, info, **kwargs):
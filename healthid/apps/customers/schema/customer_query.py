@@ -12,7 +12,8 @@ from graphql_jwt.decorators import login_required
 from healthid.apps.profiles.models import Profile
 from healthid.utils.app_utils.database import get_model_object
 from healthid.utils.messages.customer_responses import CUSTOMER_ERROR_RESPONSES
-from healthid.utils.app_utils.pagination import pagination_query
+from healthid.utils.app_utils.pagination import (
+    pagination_query, store_pagination, total_pages)
 from healthid.utils.app_utils.pagination_defaults import PAGINATION_DEFAULT
 
 
@@ -81,7 +82,6 @@ class Query(graphene.AbstractType):
         page_number=graphene.Int())
     total_customers_pages_count = graphene.Int()
     total_customers_count = graphene.Int()
-    pagination_result = None
 
     @login_required
     def resolve_customers(self, info, **kwargs):
@@ -99,21 +99,19 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             customers = pagination_query(
                 resolved_value, page_count, page_number)
-            Query.pagination_result = customers
+            store_pagination(info, customers)
             return customers[0]
         paginated_response = pagination_query(resolved_value,
                                               PAGINATION_DEFAULT["page_count"],
                                               PAGINATION_DEFAULT["page_number"]
                                               )
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
     def resolve_total_customers_count(self, info, **kwargs):
         business_id = get_user_business(info.context.user).id
-        customers_list = Profile.objects.filter(
-            business_id=business_id)
-        return len(customers_list)
+        return Profile.objects.filter(business_id=business_id).count()
 
     @login_required
     def resolve_total_customers_pages_count(self, info, **kwargs):
@@ -126,9 +124,7 @@ class Query(graphene.AbstractType):
         is being applied, this is due to GraphQL order of resolver methods
         execution.
         """
-        if not Query.pagination_result:
-            return 0
-        return Query.pagination_result[1]
+        return total_pages(info)
 
     @login_required
     def resolve_customer(self, info, **kwargs):
@@ -212,13 +208,13 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             customers = pagination_query(
                 resolved_value, page_count, page_number)
-            Query.pagination_result = customers
+            store_pagination(info, customers)
             return customers[0]
             
         paginated_response = pagination_query(resolved_value,
                                               PAGINATION_DEFAULT["page_count"],
                                               PAGINATION_DEFAULT["page_number"]
                                               )
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]  
 
@@ -0,0 +1,32 @@
+# Generated by Django 2.2 on 2026-10-18 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('despatch_queue', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='despatchqueue',
+            name='attempts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='despatchqueue',
+            name='last_error',
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='despatchqueue',
+            name='sent_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='despatchqueue',
+            index=models.Index(fields=['status', 'due_date'], name='despatch_qu_status_5757a3_idx'),
+        ),
+    ]
@@ -9,6 +9,13 @@ from healthid.utils.app_utils.id_generator import id_gen
 class DespatchQueue(BaseModel):
     '''
     Model class to handle despatch queue
+
+    Attributes:
+        due_date: when the despatch should be sent, pushed back when a
+                  failed attempt is retried
+        attempts: number of times sending has been attempted
+        sent_at: when the despatch was sent
+        last_error: error of the last failed attempt
     '''
 
     PENDING = "pending"
@@ -34,6 +41,14 @@ class DespatchQueue(BaseModel):
     due_date = models.DateTimeField(verbose_name='DateTime', null=True)
     status = models.CharField(max_length=10, choices=SEND_STATUSES,
                               default=PENDING)
+    attempts = models.IntegerField(default=0)
+    sent_at = models.DateTimeField(null=True)
+    last_error = models.TextField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'due_date'])
+        ]
 
     @property
     def add_due_date(self):
@@ -10,7 +10,8 @@ from healthid.utils.app_utils.database import get_model_object
 from healthid.utils.messages.events_responses import EVENTS_ERROR_RESPONSES
 from healthid.utils.app_utils.check_user_in_outlet import \
     check_user_has_an_active_outlet
-from healthid.utils.app_utils.pagination import pagination_query
+from healthid.utils.app_utils.pagination import (
+    pagination_query, store_pagination, total_pages)
 from healthid.utils.app_utils.pagination_defaults import PAGINATION_DEFAULT
 
 
@@ -48,7 +49,6 @@ class Query(graphene.ObjectType):
     )
     event_types = graphene.List(EventTypeType)
     total_events_pages_count = graphene.Int()
-    pagination_result = None
 
     @login_required
     def resolve_events(self, info, **kwargs):
@@ -62,7 +62,7 @@ class Query(graphene.ObjectType):
         if page_count or page_number:
             events = pagination_query(
                 events_set, page_count, page_number)
-            Query.pagination_result = events
+            store_pagination(info, events)
             return events[0]
         if events_set:
             paginated_response = pagination_query(events_set,
@@ -70,7 +70,7 @@ class Query(graphene.ObjectType):
                                                       "page_count"],
                                                   PAGINATION_DEFAULT[
                                                       "page_number"])
-            Query.pagination_result = paginated_response
+            store_pagination(info, paginated_response)
             return paginated_response[0]
         return GraphQLError(EVENTS_ERROR_RESPONSES["no_events_error"])
 
@@ -85,9 +85,7 @@ class Query(graphene.ObjectType):
         is being applied, this is due to GraphQL order of resolver methods
         execution.
         """
-        if not Query.pagination_result:
-            return 0
-        return Query.pagination_result[1]
+        return total_pages(info)
 
     @login_required
     def resolve_event(self, info, **kwargs):
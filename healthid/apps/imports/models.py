@@ -0,0 +1,55 @@
+from django.contrib.postgres.fields import JSONField
+from django.db import models
+
+from healthid.apps.authentication.models import User
+from healthid.models import BaseModel
+from healthid.utils.app_utils.id_generator import id_gen
+
+
+class ImportJob(BaseModel):
+    '''
+    Model class to track csv files queued for import
+
+    Attributes:
+        import_type: nature of the information in the csv, i.e. the
+                     parameter of the csv upload endpoint
+        file_path: where the upload is stored until it is processed
+        rows_processed: number of csv lines read so far
+        progress: percentage of the file read so far
+        status_code: HTTP status the upload would have been answered with
+        result: response message of the upload, or its errors
+    '''
+
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    JOB_STATUSES = (
+        (QUEUED, "Queued"),
+        (PROCESSING, "Processing"),
+        (COMPLETED, "Completed"),
+        (FAILED, "Failed")
+    )
+
+    id = models.CharField(
+        max_length=9, primary_key=True, default=id_gen, editable=False
+    )
+    user = models.ForeignKey(User, related_name="import_jobs",
+                             on_delete=models.CASCADE)
+    import_type = models.CharField(max_length=50)
+    file_name = models.CharField(max_length=255)
+    file_path = models.CharField(max_length=500)
+    on_duplication = models.TextField(null=True)
+    status = models.CharField(max_length=10, choices=JOB_STATUSES,
+                              default=QUEUED)
+    rows_processed = models.IntegerField(default=0)
+    progress = models.IntegerField(default=0)
+    status_code = models.IntegerField(null=True)
+    result = JSONField(null=True)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.COMPLETED, self.FAILED)
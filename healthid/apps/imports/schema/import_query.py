@@ -0,0 +1,39 @@
+import graphene
+from graphene_django import DjangoObjectType
+from graphql_jwt.decorators import login_required
+
+from healthid.apps.imports.models import ImportJob
+from healthid.utils.app_utils.database import get_model_object
+
+
+class ImportJobType(DjangoObjectType):
+    class Meta:
+        model = ImportJob
+        exclude_fields = ('file_path', )
+
+
+class Query(graphene.ObjectType):
+    """
+    Queries the csv files the user queued for import
+
+    returns:
+        import_job: a single 'ImportJob' object
+        import_jobs: list of 'ImportJob' objects, latest first
+    """
+    import_job = graphene.Field(ImportJobType, id=graphene.String())
+    import_jobs = graphene.List(ImportJobType, status=graphene.String())
+
+    @login_required
+    def resolve_import_job(self, info, **kwargs):
+        user_import_jobs = ImportJob.objects.filter(user=info.context.user)
+        return get_model_object(ImportJob, 'id', kwargs.get('id'),
+                                manager_query=user_import_jobs)
+
+    @login_required
+    def resolve_import_jobs(self, info, **kwargs):
+        import_jobs = ImportJob.objects.filter(
+            user=info.context.user).order_by('-created_at')
+        status = kwargs.get('status')
+        if status:
+            import_jobs = import_jobs.filter(status=status)
+        return import_jobs
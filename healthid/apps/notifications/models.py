@@ -2,8 +2,11 @@ from django.db import models
 from django.db.models.signals import post_save
 from healthid.apps.authentication.models import User
 from healthid.models import BaseModel
-from healthid.settings import pusher
 from healthid.utils.app_utils.id_generator import id_gen
+from healthid.utils.notifications_utils.notification_executor import \
+    submit_notification
+from healthid.utils.notifications_utils.pusher_transport import (
+    notification_event, publish_events)
 
 
 class Notification(BaseModel):
@@ -58,16 +61,16 @@ class NotificationMeta(BaseModel):
         return self.notification
 
 
-def save_notify(sender, instance, **kwargs):
+def save_notify(sender, instance, created, **kwargs):
+    """
+    Publish the notification of a meta saved on its own, the ones created
+    in bulk by notify() being published together
+    """
     meta = instance
     notification = meta.get_notification
-    if notification.event_name and notification.subject:
-        pusher.trigger(
-            'notification-channel',
-            notification.event_name, {
-                'subject':  notification.subject,
-                'message': meta.body
-            })
+    if created and notification.event_name and notification.subject:
+        submit_notification(publish_events, [notification_event(
+            notification.event_name, notification.subject, meta.body)])
 
 
 post_save.connect(save_notify, NotificationMeta)
@@ -3,6 +3,7 @@ from graphene_django import DjangoObjectType
 from graphql_jwt.decorators import login_required
 from healthid.apps.notifications.models import Notification, NotificationMeta
 from graphql import GraphQLError
+from healthid.utils.app_utils.dataloaders import GroupedLoader, get_loader
 from healthid.utils.messages.notifications_responses import\
     NOTIFICATION_ERROR_RESPONSES
 
@@ -24,7 +25,9 @@ class NotificationType(DjangoObjectType):
         Returns:
             list: meta data of a single notification
         """
-        return self.get_notification_meta
+        return get_loader(info, 'notification_meta', lambda: GroupedLoader(
+            NotificationMeta.objects.order_by('pk'),
+            'notification_id')).load(self.id)
 
 
 class Query(graphene.ObjectType):
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0050_auto_20200520_1940'),
+    ]
+
+    operations = [
+        # supplier IDs had a random number from 100 to 999
+        migrations.RunSQL(
+            'CREATE SEQUENCE orders_supplier_id_seq START 1000 MINVALUE 1000',
+            'DROP SEQUENCE orders_supplier_id_seq'),
+    ]
@@ -362,6 +362,20 @@ class ProductBatch(BaseModel):
     unit_cost = models.DecimalField(
         max_digits=20, decimal_places=2, default=Decimal('0.00'))
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember what a batch loaded from the database adds to its
+        product's inventory, so the inventory ledger can apply the delta of
+        the next write.
+        """
+        from healthid.utils.product_utils.inventory_ledger import \
+            take_stock_snapshot
+        batch = super().from_db(db, field_names, values)
+        if not batch.get_deferred_fields():
+            batch._stock_snapshot = take_stock_snapshot(batch)
+        return batch
+
     @property
     def get_backup_supplier(self):
         if self.product.backup_supplier_id:
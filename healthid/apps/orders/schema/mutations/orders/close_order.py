@@ -72,9 +72,6 @@ class CloseOrder(graphene.Mutation):
 
                 if product_batch.status not in reconciled_statuses:
                     unreconciled_items.append(product_batch)
-                
-                if product_batch.status == "IN_STOCK":
-                    product_batch.product.update_inventory()
 
                 products_received = products_received + 1
 
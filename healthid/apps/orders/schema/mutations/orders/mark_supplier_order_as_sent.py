@@ -3,7 +3,9 @@ from graphql_jwt.decorators import login_required
 
 from healthid.utils.messages.orders_responses import ORDERS_SUCCESS_RESPONSES
 
-from healthid.apps.orders.models.orders import SupplierOrder
+from healthid.apps.orders.models.orders import ProductBatch, SupplierOrder
+from healthid.utils.product_utils.inventory_ledger import \
+    record_batch_changes
 
 
 class MarkSupplierOrderAsSent(graphene.Mutation):
@@ -34,11 +36,12 @@ class MarkSupplierOrderAsSent(graphene.Mutation):
         for supplier_order_id in supplier_order_ids:
             # update the information of the corresponding productbatch
             supplier_order = SupplierOrder.objects.get(id=supplier_order_id)
-            product_batches = supplier_order.get_product_batches()
-            product_batches.update(status='PENDING_DELIVERY')
-            # update the product properties of the batch
+            product_batches = list(supplier_order.get_product_batches())
             for batch in product_batches:
-                batch.product.update_autofill_quantity()
+                batch.status = ProductBatch.PENDING_DELIVERY
+            ProductBatch.objects.bulk_update(product_batches, ['status'])
+            # update the product properties of the batch
+            record_batch_changes(product_batches)
             modified_product_batches.extend([batch.id for batch in product_batches])
             # update the status of the order
             supplier_order.status = SupplierOrder.PENDING_DELIVERY
@@ -12,9 +12,13 @@ from healthid.apps.orders.models.orders import (
 from healthid.apps.outlets.models import OutletUser
 from healthid.apps.orders.schema.suppliers_query import (
     SuppliersType)
+from healthid.apps.products.models import Product
 from healthid.utils.app_utils.database import get_model_object
+from healthid.utils.app_utils.dataloaders import (GroupedLoader, ModelLoader,
+                                                  get_loader)
 from healthid.apps.orders.models.suppliers import Suppliers
-from healthid.utils.app_utils.pagination import pagination_query
+from healthid.utils.app_utils.pagination import (
+    pagination_query, store_pagination, total_pages)
 from healthid.utils.app_utils.pagination_defaults import PAGINATION_DEFAULT
 from healthid.utils.orders_utils.inventory_notification import \
     autosuggest_product_order
@@ -41,6 +45,33 @@ class SupplierOrderInputType(graphene.InputObjectType):
     supplier_order_id = graphene.Int()
 
 
+def order_items_loader(info):
+    return get_loader(info, 'order_items', lambda: GroupedLoader(
+        ProductBatch.objects.order_by('pk'), 'order_id'))
+
+
+def supplier_order_items_loader(info):
+    return get_loader(info, 'supplier_order_items', lambda: GroupedLoader(
+        ProductBatch.objects.order_by('pk'), 'order_id', 'supplier_id'))
+
+
+def load_product_supplier(info, batch, supplier_field):
+    """
+    Load a supplier of the product of a batch, batching the products and
+    suppliers of every batch resolved in the request.
+    """
+    def load_supplier(product):
+        supplier_id = getattr(product, supplier_field, None)
+        if not supplier_id:
+            return None
+        return get_loader(info, 'suppliers', lambda: ModelLoader(
+            Suppliers.objects.all())).load(supplier_id)
+
+    return get_loader(info, 'products', lambda: ModelLoader(
+        Product.all_objects.all())).load(batch.product_id).then(
+            load_supplier)
+
+
 class ProductBatchType(DjangoObjectType):
     preferred_supplier = graphene.Field(SuppliersType)
     backup_supplier = graphene.Field(SuppliersType)
@@ -49,10 +80,10 @@ class ProductBatchType(DjangoObjectType):
         model = ProductBatch
 
     def resolve_preferred_supplier(self, info):
-        return self.get_preferred_supplier
+        return load_product_supplier(info, self, 'preferred_supplier_id')
 
     def resolve_backup_supplier(self, info):
-        return self.get_backup_supplier
+        return load_product_supplier(info, self, 'backup_supplier_id')
 
 
 class AutosuggestOrder(graphene.ObjectType):
@@ -71,7 +102,7 @@ class OrderType(DjangoObjectType):
         return self.name
 
     def resolve_order_items(self, info):
-        return self.order_items()
+        return order_items_loader(info).load(self.id)
 
 
 class OrderDetailsType(DjangoObjectType):
@@ -97,7 +128,8 @@ class SupplierOrderType(DjangoObjectType):
         model = SupplierOrder
 
     def resolve_number_of_products(self, info):
-        return len(self.get_product_batches())
+        return supplier_order_items_loader(info).load(
+            (self.order_id, self.supplier_id)).then(len)
 
     def resolve_order_details(self, info, **kwargs):
         """
@@ -106,7 +138,8 @@ class SupplierOrderType(DjangoObjectType):
         Returns:
             list: order details of a particular supplier and order
         """
-        return self.get_product_batches()
+        return supplier_order_items_loader(info).load(
+            (self.order_id, self.supplier_id))
 
     def resolve_supplier_order_name(self, info, **kwargs):
         """
@@ -170,7 +203,7 @@ class SupplierOrderDetailsType(DjangoObjectType):
         model = Order
 
     def resolve_number_of_products(self, info):
-        return len(self.order_items())
+        return order_items_loader(info).load(self.id).then(len)
 
     def resolve_order_details(self, info, **kwargs):
         """
@@ -179,7 +212,7 @@ class SupplierOrderDetailsType(DjangoObjectType):
         Returns:
             list: order details of a particular supplier and order
         """
-        return self.order_items()
+        return order_items_loader(info).load(self.id)
 
     def resolve_supplier_order_name(self, info, **kwargs):
         """
@@ -247,7 +280,6 @@ class Query(graphene.AbstractType):
     closed_orders = graphene.List(OrderType, page_count=graphene.Int(),
                                   page_number=graphene.Int())
     total_orders_pages_count = graphene.Int()
-    pagination_result = None
     autosuggest_product_order = graphene.List(AutosuggestOrder)
 
     supplier_order_form = graphene.Field(
@@ -343,7 +375,7 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             orders = pagination_query(
                 allProductBatches, page_count, page_number)
-            Query.pagination_result = orders
+            store_pagination(info, orders)
             return orders[0]
 
         paginated_response = pagination_query(allProductBatches,
@@ -351,7 +383,7 @@ class Query(graphene.AbstractType):
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
 
         return paginated_response[0]
 
@@ -510,14 +542,14 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             orders = pagination_query(
                 orders_set, page_count, page_number)
-            Query.pagination_result = orders
+            store_pagination(info, orders)
             return orders[0]
         paginated_response = pagination_query(orders_set,
                                               PAGINATION_DEFAULT[
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -531,9 +563,7 @@ class Query(graphene.AbstractType):
         is being applied, this is due to GraphQL order of resolver methods
         execution.
         """
-        if not Query.pagination_result:
-            return 0
-        return Query.pagination_result[1]
+        return total_pages(info)
 
     @login_required
     def resolve_order(self, info, **kwargs):
@@ -570,14 +600,14 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             orders_sorted_by_status = pagination_query(
                 orders_set, page_count, page_number)
-            Query.pagination_result = orders_sorted_by_status
+            store_pagination(info, orders_sorted_by_status)
             return orders_sorted_by_status[0]
         paginated_response = pagination_query(orders_set,
                                               PAGINATION_DEFAULT[
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -595,21 +625,21 @@ class Query(graphene.AbstractType):
             outlet=user_outlet.outlet,
             business=business
         ).order_by('id')
-        supplier_order_forms = []
-        for order in orders_set:
-            for supplier_order_form in order.get_supplier_order_forms(status):
-                supplier_order_forms.append(supplier_order_form)
+        supplier_order_forms = SupplierOrder.objects.filter(
+            order__in=orders_set).order_by('order_id', 'pk')
+        if status != 'ALL':
+            supplier_order_forms = supplier_order_forms.filter(status=status)
         if page_count or page_number:
             supplier_orders_sorted_by_status = pagination_query(
                 supplier_order_forms, page_count, page_number)
-            Query.pagination_result = supplier_orders_sorted_by_status
+            store_pagination(info, supplier_orders_sorted_by_status)
             return supplier_orders_sorted_by_status[0]
         paginated_response = pagination_query(orders_set,
                                               PAGINATION_DEFAULT[
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -636,14 +666,14 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             closed_orders = pagination_query(
                 closed_orders_set, page_count, page_number)
-            Query.pagination_result = closed_orders
+            store_pagination(info, closed_orders)
             return closed_orders[0]
         paginated_response = pagination_query(closed_orders_set,
                                               PAGINATION_DEFAULT[
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -19,7 +19,8 @@ from healthid.apps.orders.models import (Suppliers,
 from healthid.utils.auth_utils.decorator import user_permission
 from healthid.utils.app_utils.database import get_model_object
 from healthid.utils.messages.orders_responses import ORDERS_ERROR_RESPONSES
-from healthid.utils.app_utils.pagination import pagination_query
+from healthid.utils.app_utils.pagination import (
+    pagination_query, store_pagination, total_pages, total_count)
 from healthid.utils.app_utils.pagination_defaults import PAGINATION_DEFAULT
 from healthid.apps.orders.models.suppliers import SupplierOutletContacts
 from graphene.types.resolver import dict_resolver
@@ -184,7 +185,6 @@ class Query(graphene.AbstractType):
                                    id=graphene.String(required=True))
     total_suppliers_pages_count = graphene.Int()
     total_number_of_suppliers = graphene.Int()
-    pagination_result = None
 
     supplier_rating = graphene.Float(
         supplier_id=graphene.String(required=True))
@@ -201,14 +201,14 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             suppliers = pagination_query(
                 suppliers_set, page_count, page_number)
-            Query.pagination_result = suppliers
+            store_pagination(info, suppliers)
             return suppliers[0]
         paginated_response = pagination_query(suppliers_set,
                                               PAGINATION_DEFAULT[
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -244,7 +244,7 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             suppliers = pagination_query(
                 suppliers_filtered, page_count, page_number)
-            Query.pagination_result = suppliers
+            store_pagination(info, suppliers)
             return suppliers[0]
 
         paginated_response = pagination_query(suppliers_filtered,
@@ -252,7 +252,7 @@ class Query(graphene.AbstractType):
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -266,15 +266,11 @@ class Query(graphene.AbstractType):
         is being applied, this is due to GraphQL order of resolver methods
         execution.
         """
-        if not Query.pagination_result:
-            return 0
-        return Query.pagination_result[1]
+        return total_pages(info)
 
     @login_required
     def resolve_total_number_of_suppliers(self, info, **kwargs):
-        if not Query.pagination_result:
-            return 0
-        return Query.pagination_result[2]
+        return total_count(info)
 
     @login_required
     def resolve_approved_suppliers(self, info, **kwargs):
@@ -287,14 +283,14 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             approved_suppliers = pagination_query(
                 approved_suppliers_set, page_count, page_number)
-            Query.pagination_result = approved_suppliers
+            store_pagination(info, approved_suppliers)
             return approved_suppliers[0]
         paginated_response = pagination_query(approved_suppliers_set,
                                               PAGINATION_DEFAULT[
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -329,14 +325,14 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             filtered_suppliers = pagination_query(
                 supplier, page_count, page_number)
-            Query.pagination_result = filtered_suppliers
+            store_pagination(info, filtered_suppliers)
             return filtered_suppliers[0]
             
         paginated_response = pagination_query(supplier,
                                               PAGINATION_DEFAULT["page_count"],
                                               PAGINATION_DEFAULT["page_number"]
                                               )
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0] 
 
     @login_required
@@ -353,14 +349,14 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             suppliers_notes = pagination_query(
                 suppliers_notes_set, page_count, page_number)
-            Query.pagination_result = suppliers_notes
+            store_pagination(info, suppliers_notes)
             return suppliers_notes[0]
         paginated_response = pagination_query(suppliers_notes_set,
                                               PAGINATION_DEFAULT[
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -1,25 +1,43 @@
-from random import randint
-
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from healthid.apps.orders.models.orders import ProductBatch
 from healthid.apps.orders.models.suppliers import Suppliers
+from healthid.utils.app_utils.identifiers import identifier, next_values
+from healthid.utils.product_utils.inventory_ledger import (
+    rebuild_inventories, record_batch_changes)
+
+
+# sequence the numbers of supplier IDs are taken from
+SUPPLIER_ID_SEQUENCE = 'orders_supplier_id_seq'
+
+
+@identifier(Suppliers)
+def generate_supplier_id(suppliers):
+    """
+    method to automatically generate the IDs of new suppliers from their
+    name and the supplier ID sequence
+    """
+    new_suppliers = [
+        supplier for supplier in suppliers if not supplier.supplier_id]
+    numbers = next_values(SUPPLIER_ID_SEQUENCE, len(new_suppliers))
+    for supplier, number in zip(new_suppliers, numbers):
+        supplier_name = supplier.name[slice(3)].upper()
+        supplier.supplier_id = 'S-{}{}'.format(supplier_name, number)
+
+
+@receiver(post_save, sender=ProductBatch)
+def update_product_inventory(sender, instance, created, **kwargs):
+    """
+    Apply the stock delta of a saved batch to its product's inventory
+    """
+    record_batch_changes([instance], created=created)
 
 
-@receiver(signal=post_save, sender=Suppliers)
-def generate_supplier_id(
-        sender,
-        instance,
-        update_fields=['supplier_id'],
-        **kwargs):
+@receiver(post_delete, sender=ProductBatch)
+def recount_product_inventory(sender, instance, **kwargs):
     """
-    method to automatically generate supplier ID based on
-    supplier's name, id, and address line 1
+    Recount the inventory of a product after one of its batches is deleted
     """
-    if not instance.supplier_id:
-        supplier_name = instance.name[slice(3)].upper()
-        random_number = randint(100, 999)
-        instance.supplier_id = 'S-{}{}'.format(supplier_name, random_number)
-        post_save.disconnect(generate_supplier_id, sender=Suppliers)
-        instance.save()
-        post_save.connect(generate_supplier_id, sender=Suppliers)
+    if instance.product_id is not None:
+        rebuild_inventories([instance.product_id])
@@ -1,10 +1,13 @@
 from django.dispatch import receiver
-from django.db.models.signals import post_save
-from healthid.apps.outlets.models import Outlet
+from django.db.models.signals import post_delete, post_save
+from healthid.apps.authentication.models import User
+from healthid.apps.business.models import Business, UserBusiness
+from healthid.apps.outlets.models import Outlet, OutletUser
 from healthid.apps.preference.models import (Currency,
                                              OutletPreference,
                                              Timezone, Vat)
 from healthid.utils.app_utils.id_generator import id_gen
+from healthid.utils.app_utils.identity import forget_identity
 
 
 @receiver(post_save, sender=Outlet)
@@ -45,7 +48,39 @@ def set_prefix(sender, update_fields=['prefix_id'], *args, **kwargs):
     outlet_name = outlet.name[slice(3)].upper()
     business_name = outlet.business.trading_name[slice(2)].upper()
     outlet_id = (str(outlet.id)).zfill(3)
+    # the prefix is not stored, it is returned with the outlet just saved
     outlet.prefix_id = '{}{}-{}'.format(business_name, outlet_id, outlet_name)
-    post_save.disconnect(set_prefix, sender=Outlet)
-    outlet.save()
-    post_save.connect(set_prefix, sender=Outlet)
+
+
+@receiver(post_save, sender=User)
+def forget_user_identity(sender, instance, **kwargs):
+    """
+    Drop the memoized identity of a user whose role may have changed
+    """
+    forget_identity(instance.id)
+
+
+@receiver(post_save, sender=UserBusiness)
+@receiver(post_delete, sender=UserBusiness)
+@receiver(post_save, sender=OutletUser)
+@receiver(post_delete, sender=OutletUser)
+def forget_member_identity(sender, instance, **kwargs):
+    """
+    Drop the memoized identity of a user joining or leaving a business or
+    an outlet, or changing their active outlet
+    """
+    forget_identity(instance.user_id)
+
+
+@receiver(post_save, sender=Business)
+def forget_business_identities(sender, instance, **kwargs):
+    forget_identity(*UserBusiness.objects.filter(
+        business=instance).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=Outlet)
+@receiver(post_save, sender=OutletPreference)
+def forget_outlet_identities(sender, instance, **kwargs):
+    outlet_id = instance.id if sender is Outlet else instance.outlet_id
+    forget_identity(*OutletUser.objects.filter(
+        outlet_id=outlet_id).values_list('user_id', flat=True))
@@ -0,0 +1,27 @@
+#
+# Verify the incremental inventory counters of products
+# against their batches and report any drift
+#
+from django.core.management.base import BaseCommand
+
+from healthid.utils.product_utils.inventory_ledger import reconcile_inventory
+
+
+class Command(BaseCommand):
+
+    help = "Verify the product inventory counters against the batch tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only report drift, do not rebuild the drifted counters")
+
+    def handle(self, *args, **options):
+        report = reconcile_inventory(fix=not options["dry_run"])
+        for product_id, field, recorded, expected in report["drift"]:
+            self.stdout.write(
+                f"product {product_id}: {field} is {recorded}, "
+                f"expected {expected}")
+        drifted = len({drift[0] for drift in report["drift"]})
+        self.stdout.write(
+            f"{report['checked']} products checked, {drifted} drifted")
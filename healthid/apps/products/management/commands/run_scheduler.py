@@ -0,0 +1,23 @@
+#
+# Run the scheduled jobs in the process leading the scheduler, the other
+# processes running the command standing by to take over
+#
+import signal
+
+from django.core.management.base import BaseCommand
+
+from healthid.jobs.leader import SchedulerLeader
+from healthid.jobs.main_job import add_jobs, scheduler
+
+
+class Command(BaseCommand):
+
+    help = 'Run the scheduled jobs, in one process at a time'
+
+    def handle(self, *args, **options):
+        leader = SchedulerLeader(scheduler, add_jobs)
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signal_number, lambda *args: leader.stop())
+        self.stdout.write('Waiting for the scheduler lock')
+        leader.run()
+        self.stdout.write('Scheduler stopped')
@@ -1,23 +1,21 @@
-# 
-# Write a script to set the outlet_id of all existing batches 
-# to the assigned outlet of the user who created them.
-# 
+#
+# Write a script to rebuild the inventory counters and the
+# stock properties of all existing products from their batches.
+#
 from django.core.management.base import BaseCommand
 from healthid.apps.products.models import Product
 
+
 class Command(BaseCommand):
     args = 'No Arguments'
-    help = 'A helper function to help populate the BatchInfo outlet_id to that of the user who created it'
+    help = 'A helper function to rebuild the stock properties of all products'
 
-    def _update_product_properties(self):
+    def _update_product_properties(self, chunk_size=500):
         # get all products and update the properties on them
-        all_products = Product.objects.all()
-        for product in all_products:
-            product.update_quantity_in_stock()
-            product.update_autofill_quantity()
-            product.update_avarage_unit_cost()
-            product.update_pre_tax_retail_price()
-
+        product_ids = list(
+            Product.objects.order_by('id').values_list('id', flat=True))
+        for start in range(0, len(product_ids), chunk_size):
+            Product.update_inventories(product_ids[start:start + chunk_size])
 
     def handle(self, *args, **options):
         self._update_product_properties()
@@ -0,0 +1,29 @@
+# Generated by Django 2.2 on 2026-10-18 12:01
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0040_auto_20200528_2147'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductInventory',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inventory', serialize=False, to='products.Product')),
+                ('in_stock_quantity', models.IntegerField(default=0)),
+                ('pre_ordered_quantity', models.IntegerField(default=0)),
+                ('in_stock_batches', models.IntegerField(default=0)),
+                ('in_stock_unit_cost', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=24)),
+                ('batches', models.IntegerField(default=0)),
+                ('unit_cost', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=24)),
+                ('selling_unit_cost', models.DecimalField(decimal_places=2, max_digits=20, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 2.2 on 2026-10-18 13:18
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+from healthid.utils.product_utils.product_search import search_vector
+
+
+def build_search_vectors(apps, schema_editor):
+    """
+    Build the search document of the existing products.
+    """
+    Product = apps.get_model('products', 'Product')
+    ProductCategory = apps.get_model('products', 'ProductCategory')
+    Suppliers = apps.get_model('orders', 'Suppliers')
+    Product._base_manager.update(
+        search_vector=search_vector(ProductCategory, Suppliers))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0041_productinventory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='product_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['sku_number'], name='product_sku_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['global_upc'], name='product_upc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productmeta',
+            index=models.Index(fields=['dataKey', 'dataValue'], name='product_meta_value_idx'),
+        ),
+        migrations.RunPython(
+            build_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 2.2 on 2026-10-18 14:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0042_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchExpiryNotice',
+            fields=[
+                ('batch', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='expiry_notice', serialize=False, to='products.BatchInfo')),
+                ('window_days', models.IntegerField()),
+                ('notified_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='batchinfo',
+            index=models.Index(condition=models.Q(sold_out=False), fields=['expiry_date'], name='batch_expiry_date_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2 on 2026-10-18 14:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outlets', '0013_merge_20200421_1903'),
+        ('products', '0043_batch_expiry_notice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LowStockAlert',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alerted_at', models.DateTimeField()),
+                ('outlet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_alerts', to='outlets.Outlet')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_alerts', to='products.Product')),
+            ],
+            options={
+                'unique_together': {('outlet', 'product')},
+            },
+        ),
+    ]
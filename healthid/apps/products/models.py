@@ -2,6 +2,8 @@ from decimal import Decimal
 from functools import reduce
 import datetime
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.db.models import Q, Sum
@@ -15,12 +17,16 @@ from healthid.apps.business.models import Business
 from healthid.apps.products.managers import ProductManager, QuantityManager
 from healthid.models import BaseModel
 from healthid.utils.app_utils.id_generator import id_gen
+from healthid.utils.app_utils.identifiers import assign_identifiers
 from healthid.utils.app_utils.validator import validator
 
 from healthid.utils.messages.products_responses import PRODUCTS_ERROR_RESPONSES
 from healthid.utils.product_utils.product_price_checker import \
     round_off_selling_price
 
+PRODUCT_STOCK_FIELDS = ('quantity_in_stock', 'autofill_quantity',
+                        'avarage_unit_cost', 'pre_tax_retail_price')
+
 
 class ProductCategory(BaseModel):
     """
@@ -111,6 +117,7 @@ class Product(BaseModel):
     reorder_max = models.IntegerField(default=0)
     request_declined = models.BooleanField(default=False)
     global_upc = models.CharField(max_length=50, null=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     quantity_in_stock = models.IntegerField(default=0)
     autofill_quantity = models.IntegerField(default=0)
@@ -132,6 +139,12 @@ class Product(BaseModel):
             "business",
             "description",
             "dispensing_size"))
+        indexes = [
+            GinIndex(fields=['search_vector'],
+                     name='product_search_vector_idx'),
+            models.Index(fields=['sku_number'], name='product_sku_idx'),
+            models.Index(fields=['global_upc'], name='product_upc_idx'),
+        ]
 
     @property
     def get_tags(self):
@@ -143,6 +156,14 @@ class Product(BaseModel):
     def __repr__(self):
         return f"<{self.product_name}>"
 
+    def save(self, *args, **kwargs):
+        # a new product takes its id, which its sku number is derived from,
+        # before being inserted
+        if self.pk is None:
+            assign_identifiers([self])
+            kwargs['force_insert'] = True
+        super(Product, self).save(*args, **kwargs)
+
     @property
     def product_batches(self):
         """
@@ -153,20 +174,6 @@ class Product(BaseModel):
             product_id=self.id
         )
 
-    def update_quantity_in_stock(self):
-        """
-        Reflect ProductBatches with the status 'IN_STOCK'
-        """
-        quantity_sum_dict = self.product_batches.filter(
-            status="IN_STOCK",
-        ).exclude(
-            batch_ref="OUT OF STOCK"
-        ).aggregate(quantity_sum=Sum('quantity'))
-
-        quantity = quantity_sum_dict['quantity_sum'] or 0
-        self.quantity_in_stock = quantity
-        self.save()
-
     def pre_ordered_quantity(self):
         """
         Reflect ProductBatches with the status 'PENDING_DELIVERY'
@@ -177,23 +184,6 @@ class Product(BaseModel):
 
         return quantity_sum_dict['quantity_sum'] or 0
 
-    def update_autofill_quantity(self):
-        suggest_quantity = self.reorder_max - (
-                self.quantity_in_stock + self.pre_ordered_quantity())
-
-        self.autofill_quantity = suggest_quantity if suggest_quantity > 0 else 0
-        self.save()
-
-    def update_avarage_unit_cost(self):
-        available_batches = self.product_batches.filter(status="IN_STOCK")
-        if available_batches.exists():
-            result = available_batches.aggregate(models.Avg('unit_cost'))
-        else:
-            result = self.product_batches.aggregate(models.Avg('unit_cost'))
-
-        self.avarage_unit_cost = result['unit_cost__avg'] or 0
-        self.save()
-
     @staticmethod
     def pre_tax_retail_price_calculator(self):
         selling_price = self.sales_price or 0
@@ -212,10 +202,6 @@ class Product(BaseModel):
         selling_price = round_off_selling_price(selling_price)
         self.pre_tax_retail_price = selling_price
 
-    def update_pre_tax_retail_price(self):
-        Product.pre_tax_retail_price_calculator(self)
-        self.save()
-
     @property
     def update_sales_price(self):
         selling_price = self.pre_tax_retail_price
@@ -283,23 +269,97 @@ class Product(BaseModel):
         """
         A singular function to update all the stock properties of a product
         """
-        self.update_quantity_in_stock()
-        self.update_autofill_quantity()
-        self.update_avarage_unit_cost()
-        self.update_pre_tax_retail_price()
+        for product in Product.update_inventories([self.id]):
+            for field in PRODUCT_STOCK_FIELDS:
+                setattr(self, field, getattr(product, field))
 
     @staticmethod
-    def general_search(search_term):
-        search_filter = (
-                Q(product_name__icontains=search_term) |
-                Q(description__icontains=search_term) |
-                Q(brand__icontains=search_term) |
-                Q(manufacturer__icontains=search_term) |
-                Q(product_category__name__icontains=search_term) |
-                Q(preferred_supplier__name__icontains=search_term) |
-                Q(sku_number__exact=search_term)
-        )
-        return search_filter
+    def update_inventories(product_ids):
+        """
+        Set based counterpart of update_inventory().
+
+        Rebuilds the inventory counters of several products from their
+        batches with one grouped aggregate and writes the derived stock
+        properties back with a single bulk update, so the cost does not grow
+        with the number of products.
+
+        Args:
+            product_ids(list): ids of the products to refresh
+
+        Returns:
+            products(list): the refreshed product instances
+        """
+        from healthid.utils.product_utils.inventory_ledger import \
+            rebuild_inventories
+        inventories = rebuild_inventories(product_ids)
+        return [inventory.product for inventory in inventories]
+
+
+class ProductInventory(models.Model):
+    """
+    Running stock counters of a product.
+
+    The counters are kept in step with the product's batches by
+    healthid.utils.product_utils.inventory_ledger, which applies the
+    quantity and cost deltas of every batch write instead of aggregating
+    over all the batches again. The stock properties stored on the product
+    are derived from them.
+
+    Attributes:
+        in_stock_quantity: quantity held by 'IN_STOCK' batches
+        pre_ordered_quantity: quantity held by 'PENDING_DELIVERY' batches
+        in_stock_batches: number of 'IN_STOCK' batches
+        in_stock_unit_cost: sum of the unit costs of 'IN_STOCK' batches
+        batches: number of batches
+        unit_cost: sum of the unit costs of all batches
+        selling_unit_cost: highest unit cost among unexpired batches
+    """
+    product = models.OneToOneField(
+        Product, primary_key=True, on_delete=models.CASCADE,
+        related_name='inventory')
+    in_stock_quantity = models.IntegerField(default=0)
+    pre_ordered_quantity = models.IntegerField(default=0)
+    in_stock_batches = models.IntegerField(default=0)
+    in_stock_unit_cost = models.DecimalField(
+        max_digits=24, decimal_places=2, default=Decimal('0.00'))
+    batches = models.IntegerField(default=0)
+    unit_cost = models.DecimalField(
+        max_digits=24, decimal_places=2, default=Decimal('0.00'))
+    selling_unit_cost = models.DecimalField(
+        max_digits=20, decimal_places=2, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def average_unit_cost(self):
+        if self.in_stock_batches:
+            return self.in_stock_unit_cost / self.in_stock_batches
+        if self.batches:
+            return self.unit_cost / self.batches
+        return Decimal('0.00')
+
+    def update_product(self):
+        """
+        Derive the stock properties of the product from the counters.
+        """
+        product = self.product
+        product.quantity_in_stock = self.in_stock_quantity
+        suggest_quantity = product.reorder_max - (
+            self.in_stock_quantity + self.pre_ordered_quantity)
+        product.autofill_quantity = \
+            suggest_quantity if suggest_quantity > 0 else 0
+        average_cost = self.average_unit_cost
+        product.avarage_unit_cost = int(average_cost)
+
+        selling_price = product.sales_price or 0
+        if self.batches:
+            if product.auto_price and self.selling_unit_cost is not None:
+                selling_price = self.selling_unit_cost * \
+                    Decimal(1 + product.markup / 100)
+            if not product.auto_price and product.sales_price is None:
+                selling_price = average_cost * \
+                    Decimal(1 + product.markup / 100)
+        product.pre_tax_retail_price = round_off_selling_price(selling_price)
+        return product
 
 
 class ProductMeta(models.Model):
@@ -318,6 +378,10 @@ class ProductMeta(models.Model):
 
     class Meta:
         unique_together = (("product", "dataKey"))
+        indexes = [
+            models.Index(fields=['dataKey', 'dataValue'],
+                         name='product_meta_value_idx'),
+        ]
 
     def __int__(self):
         return self.id
@@ -345,6 +409,12 @@ class BatchInfo(BaseModel):
     comment = models.TextField(blank=True)
     outlet = models.ForeignKey(Outlet, on_delete=models.CASCADE, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['expiry_date'], name='batch_expiry_date_idx',
+                         condition=Q(sold_out=False)),
+        ]
+
     def __str__(self):
         return self.batch_no
 
@@ -381,6 +451,33 @@ class BatchInfo(BaseModel):
         return proposed_quantity.quantity_remaining if proposed_quantity else 0
 
 
+class BatchExpiryNotice(models.Model):
+    """
+    Narrowest expiry window, in days before expiry, the outlet of a batch
+    has been notified about.
+    """
+    batch = models.OneToOneField(
+        BatchInfo, primary_key=True, on_delete=models.CASCADE,
+        related_name='expiry_notice')
+    window_days = models.IntegerField()
+    notified_at = models.DateTimeField(auto_now=True)
+
+
+class LowStockAlert(models.Model):
+    """
+    Last low stock alert the users of an outlet got about a product, kept
+    while the product stays at or below its reorder threshold.
+    """
+    outlet = models.ForeignKey(
+        Outlet, on_delete=models.CASCADE, related_name='low_stock_alerts')
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='low_stock_alerts')
+    alerted_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = (('outlet', 'product'),)
+
+
 class Quantity(BaseModel):
     id = models.CharField(
         max_length=9, primary_key=True, default=id_gen, editable=False)
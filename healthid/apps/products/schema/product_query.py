@@ -16,12 +16,15 @@ from healthid.apps.products.models import (BatchInfo, DispensingSize, Product,
 from healthid.utils.app_utils.check_user_in_outlet import \
     check_user_has_an_active_outlet
 from healthid.utils.app_utils.database import get_model_object
+from healthid.utils.app_utils.dataloaders import GroupedLoader, get_loader
 from healthid.utils.auth_utils.decorator import user_permission
 from healthid.utils.messages.common_responses import ERROR_RESPONSES
 from healthid.utils.messages.products_responses import PRODUCTS_ERROR_RESPONSES
-from healthid.utils.app_utils.pagination import pagination_query
+from healthid.utils.app_utils.pagination import (
+    pagination_query, store_pagination, total_pages, total_count)
 from healthid.utils.app_utils.pagination_defaults import PAGINATION_DEFAULT
 from healthid.utils.app_utils.validators import validate_expire_months
+from healthid.utils.product_utils.product_search import search_products
 from healthid.apps.orders.services import SaveAutofillItems
 from healthid.apps.orders.models.orders import OrdersProducts, ProductBatch
 from healthid.utils.app_utils.get_user_business import get_user_business
@@ -40,7 +43,11 @@ class BatchInfoType(DjangoObjectType):
         model = BatchInfo
 
     def resolve_quantity(self, info, **kwargs):
-        return self.quantity
+        loader = get_loader(info, 'batch_quantities', lambda: GroupedLoader(
+            Quantity.objects.order_by('pk'), 'batch_id'))
+        return loader.load(self.id).then(
+            lambda quantities: quantities[0].quantity_remaining
+            if quantities else 0)
 
     def resolver_proposed_quantity(self, info, **kwargs):
         return self.proposed_quantity
@@ -68,6 +75,7 @@ class ProductType(DjangoObjectType):
 
     class Meta:
         model = Product
+        exclude_fields = ('search_vector',)
         filter_fields = {
             'is_approved': ['exact'],
             'product_name': ['exact', 'icontains', 'istartswith'],
@@ -118,7 +126,6 @@ class SurveyType(DjangoObjectType):
 
 
 class Query(graphene.AbstractType):
-    pagination_result = None
 
     products = graphene.List(ProductType,
                              search=graphene.String(),
@@ -213,13 +220,12 @@ class Query(graphene.AbstractType):
             business.id).filter(parent_id__isnull=True).order_by('id')
 
         if search:
-            search_filter = Product.general_search(search)
-            products_set = products_set.filter(search_filter)
+            products_set = search_products(products_set, search)
 
         if page_count or page_number:
             products = pagination_query(
                 products_set, page_count, page_number)
-            Query.pagination_result = products
+            store_pagination(info, products)
             return products[0]
         Query.attach_upc_to_products(products_set)
         paginated_response = pagination_query(products_set,
@@ -227,7 +233,7 @@ class Query(graphene.AbstractType):
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
 
         return paginated_response[0]
 
@@ -242,9 +248,7 @@ class Query(graphene.AbstractType):
         is being applied, this is due to GraphQL order of resolver methods
         execution.
         """
-        if not Query.pagination_result:
-            return 0
-        return Query.pagination_result[1]
+        return total_pages(info)
 
     @login_required
     def resolve_products_total_number(self, info, **kwargs):
@@ -257,9 +261,7 @@ class Query(graphene.AbstractType):
         is being applied, this is due to GraphQL order of resolver methods
         execution.
         """
-        if not Query.pagination_result:
-            return 0
-        return Query.pagination_result[2]
+        return total_count(info)
 
     @login_required
     def resolve_filter_products(self, info, **kwargs):
@@ -303,14 +305,14 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             filtered_products = pagination_query(
                 response, page_count, page_number)
-            Query.pagination_result = filtered_products
+            store_pagination(info, filtered_products)
             return filtered_products[0]
             
         paginated_response = pagination_query(response,
                                               PAGINATION_DEFAULT["page_count"],
                                               PAGINATION_DEFAULT["page_number"]
                                               )
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     def get_data_value(kwargs):
@@ -386,14 +388,14 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             proposed_products = pagination_query(
                 proposed_products_set, page_count, page_number)
-            Query.pagination_result = proposed_products
+            store_pagination(info, proposed_products)
             return proposed_products[0]
         paginated_response = pagination_query(proposed_products_set,
                                               PAGINATION_DEFAULT[
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -410,14 +412,14 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             approved_products = pagination_query(
                 approved_products_set, page_count, page_number)
-            Query.pagination_result = approved_products
+            store_pagination(info, approved_products)
             return approved_products[0]
         paginated_response = pagination_query(approved_products_set,
                                               PAGINATION_DEFAULT[
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -437,14 +439,14 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             approved_products = pagination_query(
                 near_expired_products_set, page_count, page_number)
-            Query.pagination_result = approved_products
+            store_pagination(info, approved_products)
             return approved_products[0]
         paginated_response = pagination_query(near_expired_products_set,
                                               PAGINATION_DEFAULT[
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -472,14 +474,14 @@ class Query(graphene.AbstractType):
         if page_count or page_number:
             proposed_edits = pagination_query(
                 proposed_edits_set, page_count, page_number)
-            Query.pagination_result = proposed_edits
+            store_pagination(info, proposed_edits)
             return proposed_edits[0]
         paginated_response = pagination_query(proposed_edits_set,
                                               PAGINATION_DEFAULT[
                                                   "page_count"],
                                               PAGINATION_DEFAULT[
                                                   "page_number"])
-        Query.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -637,7 +639,7 @@ class BatchQuery(graphene.AbstractType):
         near_expired_batches = pagination_query(near_expired_batches_set,
                                                 page_count,
                                                 page_number)
-        Query.pagination_result = near_expired_batches
+        store_pagination(info, near_expired_batches)
         return near_expired_batches[0]
 
     @login_required
@@ -651,9 +653,7 @@ class BatchQuery(graphene.AbstractType):
         is being applied, this is due to GraphQL order of resolver methods
         execution.
         """
-        if not Query.pagination_result:
-            return 0
-        return Query.pagination_result[1]
+        return total_pages(info)
 
     @login_required
     def resolve_batches_total_number(self, info, **kwargs):
@@ -666,6 +666,4 @@ class BatchQuery(graphene.AbstractType):
         is being applied, this is due to GraphQL order of resolver methods
         execution.
         """
-        if not Query.pagination_result:
-            return 0
-        return Query.pagination_result[2]
+        return total_count(info)
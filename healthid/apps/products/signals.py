@@ -3,36 +3,74 @@ import datetime
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
-from healthid.apps.products.models import BatchInfo, Product, Quantity
+from healthid.apps.orders.models.suppliers import Suppliers
+from healthid.apps.products.models import (BatchInfo, Product,
+                                           ProductCategory, Quantity)
 from healthid.utils.app_utils.id_generator import id_gen
+from healthid.utils.app_utils.identifiers import identifier, next_ids
 from healthid.utils.notifications_utils.handle_notifications import notify
+from healthid.utils.notifications_utils.notification_executor import \
+    submit_notification
 from healthid.utils.messages.products_responses import \
     PRODUCTS_SUCCESS_RESPONSES
+from healthid.utils.product_utils.product_search import (
+    SEARCH_FIELDS, update_search_vectors)
+
+
+@identifier(Product)
+def generate_SKUNumber(products):
+    """
+    Method generates the ids of new products, and the sku numbers derived
+    from them
+    """
+    new_products = [product for product in products if product.pk is None]
+    for product, product_id in zip(
+            new_products, next_ids(Product, len(new_products))):
+        product.id = product_id
+    for product in products:
+        product.sku_number = str(product.id).zfill(6)
 
 
 @receiver(post_save, sender=Product)
-def generate_SKUNumber(sender, update_fields=['sku_number'], *args, **kwargs):
+def update_product_search_vector(sender, instance, update_fields=None,
+                                 **kwargs):
     """
-    Method  generates skunumber using signals
+    Rebuild the search document of a product when its searched fields
+    may have changed
     """
-    product = kwargs['instance']
-    product_id = (str(product.id)).zfill(6)
-    product.sku_number = '{}'.format(product_id)
-    post_save.disconnect(generate_SKUNumber, sender=Product)
-    product.save()
-    post_save.connect(generate_SKUNumber, sender=Product)
+    if update_fields and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    update_search_vectors(Product.all_objects.filter(pk=instance.pk))
 
 
-@receiver(post_save, sender=BatchInfo)
-def generate_batch_no(sender, instance, created, **kwargs):
-    if created:
-        now = datetime.datetime.now()
-        batch_no = "BN" + now.strftime("%Y%m%d%H%M") + "-" + id_gen()
-        batch_info = instance
-        batch_info.batch_no = batch_no
-        post_save.disconnect(generate_batch_no, sender=BatchInfo)
-        batch_info.save()
-        post_save.connect(generate_batch_no, sender=BatchInfo)
+@receiver(post_save, sender=ProductCategory)
+def update_category_search_vectors(sender, instance, created, **kwargs):
+    """
+    Rebuild the search documents of the products of a renamed category
+    """
+    if not created:
+        update_search_vectors(Product.all_objects.filter(
+            product_category=instance))
+
+
+@receiver(post_save, sender=Suppliers)
+def update_supplier_search_vectors(sender, instance, created, **kwargs):
+    """
+    Rebuild the search documents of the products preferring a renamed
+    supplier
+    """
+    if not created:
+        update_search_vectors(Product.all_objects.filter(
+            preferred_supplier=instance))
+
+
+@identifier(BatchInfo)
+def generate_batch_no(batches):
+    now = datetime.datetime.now()
+    for batch_info in batches:
+        if batch_info._state.adding:
+            batch_info.batch_no = \
+                "BN" + now.strftime("%Y%m%d%H%M") + "-" + id_gen()
 
 
 @receiver(post_save, sender=BatchInfo)
@@ -54,6 +92,8 @@ post_save.connect(set_nearest_expiry_date, sender=BatchInfo)
 def notify_quantity(sender, instance, created, **kwargs):
     """
     Method to generate notifications for proposed change in batch quantity.
+    Low stock is alerted about by the alert_low_stock job instead, once per
+    product and window rather than on every save.
     """
     if created:
         if not instance.quantity_remaining and instance.parent is None:
@@ -75,34 +115,12 @@ def notify_quantity(sender, instance, created, **kwargs):
                             all_users.append(user)
                     message = PRODUCTS_SUCCESS_RESPONSES[
                         "batch_edit_proposal"].format(batch.batch_no)
-                    notify(
+                    submit_notification(
+                        notify,
                         users=all_users,
                         subject='Proposed change in batch quantity',
                         event_name='batch_quantity',
                         body=message)
-    # if quantity instance is not a proposal,
-    # we can check if the product quantity is low
-    if not instance.parent_id:
-        # set an arbitrary quantity threshold
-        # we'll check for instances where product quantity
-        # goes below this threshold
-        quantity_threshold = 50
-        product = instance.batch.product
-        if len(product.business.outlet_set.all()) > 0:
-            outlet_users = \
-                product.business.outlet_set.first().active_outlet_users
-            if len(outlet_users) > 0:
-                # notify all outlet users.
-                if product.quantity_in_stock < quantity_threshold:
-                    message = PRODUCTS_SUCCESS_RESPONSES[
-                        "low_quantity_alert"].format(
-                        product.product_name,
-                        product.quantity_in_stock)
-                    notify(
-                        users=outlet_users,
-                        subject='Low quantity alert',
-                        event_name='product_quantity',
-                        body=message)
 
 
 @receiver(post_save, sender=Quantity)
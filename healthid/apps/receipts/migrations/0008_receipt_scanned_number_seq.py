@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('receipts', '0007_auto_20200401_0943'),
+    ]
+
+    operations = [
+        # numbers of UPC-A codes of number system 0, the barcodes receipts
+        # were given before being random codes of number systems 1 to 9
+        migrations.RunSQL(
+            'CREATE SEQUENCE receipts_scanned_number_seq '
+            'MINVALUE 1 MAXVALUE 9999999999',
+            'DROP SEQUENCE receipts_scanned_number_seq'),
+    ]
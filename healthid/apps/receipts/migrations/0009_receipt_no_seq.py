@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('receipts', '0008_receipt_scanned_number_seq'),
+    ]
+
+    operations = [
+        # receipt numbers had a random number from 100 to 999
+        migrations.RunSQL(
+            'CREATE SEQUENCE receipts_receipt_no_seq START 1000 MINVALUE 1000',
+            'DROP SEQUENCE receipts_receipt_no_seq'),
+    ]
@@ -1,5 +1,4 @@
 from django.db import models
-from django.db.models.signals import pre_save
 
 from healthid.models import BaseModel
 from healthid.apps.outlets.models import Outlet
@@ -8,7 +7,10 @@ from healthid.apps.products.models import Product
 from healthid.apps.sales.models import Sale, SaleReturn
 from healthid.apps.sales.models import SaleDetail
 from healthid.utils.app_utils.send_mail import SendMail
-from healthid.utils.receipts.barcode import generate_barcode, generate_receipt_number
+from healthid.utils.app_utils.identifiers import identifier, next_values
+from healthid.utils.receipts.barcode import (RECEIPT_NUMBER_SEQUENCE,
+                                             SCANNED_NUMBER_SEQUENCE,
+                                             barcode_link, upc_code)
 from healthid.utils.messages.receipts_responses import RECEIPT_ERROR_RESPONSES
 from healthid.utils.app_utils.database import SaveContextManager, get_model_object
 from healthid.utils.messages.receipts_responses import RECEIPT_SUCCESS_RESPONSES
@@ -68,6 +70,22 @@ class Receipt(BaseModel):
     def __str__(self):
         return self.id
 
+    @property
+    def barcode_image_url(self):
+        """
+        Url of the barcode of the receipt, rendered when it is first
+        requested
+
+        Returns:
+            string: url of the barcode image
+            None: if the receipt has no barcode number
+        """
+        if self.barcode_url:
+            return self.barcode_url
+        if self.scanned_number is None:
+            return None
+        return barcode_link(self.scanned_number)
+
     def create_receipt(self, sale, outlet_id):
         """
         generates a receipt for a sale
@@ -276,12 +294,18 @@ class Receipt(BaseModel):
         mail.send()
 
 
-def generate_receipt_number_and_barcode(**kwargs):
+@identifier(Receipt)
+def generate_receipt_number_and_barcode(receipts):
     """
-    Generates receipt barcode and receipt number
+    Generates the receipt numbers and barcode numbers of new receipts, the
+    barcode images being rendered on demand
     """
-    receipt = kwargs.get("instance")
-    receipt.receipt_no = generate_receipt_number(receipt, Receipt)
-
-
-pre_save.connect(generate_receipt_number_and_barcode, sender=Receipt)
+    unnumbered = [receipt for receipt in receipts if not receipt.receipt_no]
+    numbers = next_values(RECEIPT_NUMBER_SEQUENCE, len(unnumbered))
+    for receipt, number in zip(unnumbered, numbers):
+        receipt.receipt_no = f'RN{number}-{receipt.sale_id}'
+    unscanned = [
+        receipt for receipt in receipts if receipt.scanned_number is None]
+    numbers = next_values(SCANNED_NUMBER_SEQUENCE, len(unscanned))
+    for receipt, number in zip(unscanned, numbers):
+        receipt.scanned_number = upc_code(number)
@@ -141,7 +141,7 @@ class ReceiptType(DjangoObjectType):
             string: url of a receipt
         """
         if self.receipt_template.barcode:
-            return self.barcode_url
+            return self.barcode_image_url
         return None
 
 
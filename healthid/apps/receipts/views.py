@@ -0,0 +1,26 @@
+from django.http import Http404, HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.cache import cache_control
+
+from healthid.utils.receipts.barcode import BARCODE_FORMATS, render_barcode
+
+
+@method_decorator(cache_control(public=True, max_age=31536000),
+                  name='dispatch')
+class ReceiptBarcodeView(View):
+    """
+    Render the barcode of a receipt from its number, the image of a number
+    never changing.
+    """
+
+    def get(self, request, *args, **kwargs):
+        image_format = kwargs.get('image_format')
+        if image_format not in BARCODE_FORMATS:
+            raise Http404
+        try:
+            image = render_barcode(kwargs.get('scanned_number'), image_format)
+        except ValueError:
+            raise Http404
+        return HttpResponse(image,
+                            content_type=BARCODE_FORMATS[image_format])
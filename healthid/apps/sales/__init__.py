@@ -0,0 +1 @@
+default_app_config = 'healthid.apps.sales.apps.SalesConfig'
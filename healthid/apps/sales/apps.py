@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 
 class SalesConfig(AppConfig):
-    name = 'sales'
+    name = 'healthid.apps.sales'
+
+    def ready(self):
+        from . import signals  # noqa F401
@@ -1,42 +1,38 @@
-# 
-# Write a script to populate the sale performnce table
-# From rows in the sales and saleDetails table
-# 
-from django.core.management.base import BaseCommand
-from healthid.apps.sales.models import SalesPerformance, Sale, SaleDetail
+#
+# Populate the sale performance table
+# from rows in the sales and saleDetails table
+#
+from datetime import datetime
 
+from django.core.management.base import BaseCommand
 
-class Command(BaseCommand):
-    args = 'No Arguments'
-    help = 'A helper function to help populate the Sales performance Table'
+from healthid.utils.sales_utils.sale_performance import (
+    backfill_in_parallel, populate_sale_performace_table)
 
-    def _populate_sale_performance_db(self):
-        # firstly get all the sale_id of the most recent sales performance
-        most_recent_sale_performance = SalesPerformance.objects.all().order_by("sale_id").last()
-        
-        if most_recent_sale_performance:
-            total_sale_details = SaleDetail.objects.filter(sale_id__gt = most_recent_sale_performance.sale_id)
-        else:
-            total_sale_details = SaleDetail.objects.all()
 
-        # add all not present in the db
-        for existing_sale_detail in total_sale_details:
-            corresponding_sale = Sale.objects.get(id = existing_sale_detail.sale_id)
-            new_sale_performance = SalesPerformance()
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
 
-            new_sale_performance.product_id = existing_sale_detail.product_id
-            new_sale_performance.unit_price = existing_sale_detail.price
-            new_sale_performance.discount = existing_sale_detail.discount
-            new_sale_performance.quantity_sold = existing_sale_detail.quantity
 
-            new_sale_performance.sale_id = corresponding_sale.id
-            new_sale_performance.cashier_id = corresponding_sale.sales_person_id
-            new_sale_performance.outlet_id = corresponding_sale.outlet_id
-            new_sale_performance.customer_id = corresponding_sale.customer_id
-            new_sale_performance.subtotal = corresponding_sale.sub_total
-            new_sale_performance.transaction_date = corresponding_sale.created_at
+class Command(BaseCommand):
+    help = 'A helper function to help populate the Sales performance Table'
 
-            new_sale_performance.save()
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from", dest="date_from", type=parse_date,
+            help="Backfill the sales made from this date, YYYY-MM-DD")
+        parser.add_argument(
+            "--to", dest="date_to", type=parse_date,
+            help="Backfill the sales made up to this date, YYYY-MM-DD")
+        parser.add_argument(
+            "--workers", type=int, default=4,
+            help="Number of date ranges backfilled in parallel")
 
     def handle(self, *args, **options):
-        self._populate_sale_performance_db()
+        if options["date_from"] and options["date_to"]:
+            loaded = backfill_in_parallel(
+                options["date_from"], options["date_to"],
+                workers=options["workers"])
+        else:
+            loaded = populate_sale_performace_table(max_chunks=None)
+        self.stdout.write(f"{loaded} sale details loaded")
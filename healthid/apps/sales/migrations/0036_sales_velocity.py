@@ -0,0 +1,45 @@
+# Generated by Django 2.2 on 2026-10-18 12:39
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0041_productinventory'),
+        ('outlets', '0013_merge_20200421_1903'),
+        ('sales', '0035_auto_20200622_1525'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSalesVelocity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekly_sales', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), size=None)),
+                ('velocity', models.FloatField()),
+                ('window_end', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('outlet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_velocities', to='outlets.Outlet')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_velocities', to='products.Product')),
+            ],
+            options={
+                'unique_together': {('product', 'outlet')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sale_date', models.DateField()),
+                ('quantity_sold', models.IntegerField(default=0)),
+                ('outlet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='outlets.Outlet')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='products.Product')),
+            ],
+            options={
+                'unique_together': {('product', 'outlet', 'sale_date')},
+            },
+        ),
+    ]
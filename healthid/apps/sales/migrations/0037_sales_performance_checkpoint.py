@@ -0,0 +1,78 @@
+# Generated by Django 2.2 on 2026-10-18 12:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Max
+
+
+# links the rows loaded before sale details were tracked to their detail,
+# pairing the rows and details of a sale with the same product, quantity
+# and price in id order. Prices were stored rounded to integers.
+LINK_LEGACY_ROWS = """
+    WITH legacy AS (
+        SELECT id, sale_id, product_id, quantity_sold, unit_price,
+               row_number() OVER (
+                   PARTITION BY sale_id, product_id, quantity_sold, unit_price
+                   ORDER BY id) AS rank
+        FROM sales_salesperformance WHERE sale_detail_id IS NULL),
+    details AS (
+        SELECT id, sale_id, product_id, quantity,
+               price::integer AS unit_price,
+               row_number() OVER (
+                   PARTITION BY sale_id, product_id, quantity, price::integer
+                   ORDER BY id) AS rank
+        FROM sales_saledetail)
+    UPDATE sales_salesperformance performance
+    SET sale_detail_id = details.id
+    FROM legacy JOIN details ON details.sale_id = legacy.sale_id
+        AND details.product_id = legacy.product_id
+        AND details.quantity = legacy.quantity_sold
+        AND details.unit_price = legacy.unit_price
+        AND details.rank = legacy.rank
+    WHERE performance.id = legacy.id
+"""
+
+
+def create_sales_performance_checkpoint(apps, schema_editor):
+    """
+    Link the rows already loaded to their sale detail, and start the sales
+    performance load after the sale details loaded by sale id, the previous
+    high-water mark.
+    """
+    schema_editor.execute(LINK_LEGACY_ROWS)
+    SaleDetail = apps.get_model('sales', 'SaleDetail')
+    SalesPerformance = apps.get_model('sales', 'SalesPerformance')
+    EtlCheckpoint = apps.get_model('sales', 'EtlCheckpoint')
+    last_sale_id = SalesPerformance.objects.aggregate(
+        Max('sale_id'))['sale_id__max']
+    if last_sale_id is None:
+        return
+    last_id = SaleDetail.objects.filter(sale_id__lte=last_sale_id).aggregate(
+        Max('id'))['id__max'] or 0
+    EtlCheckpoint.objects.create(name='sales_performance', last_id=last_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0036_sales_velocity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EtlCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='salesperformance',
+            name='sale_detail',
+            field=models.OneToOneField(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='performance', to='sales.SaleDetail'),
+        ),
+        migrations.RunPython(create_sales_performance_checkpoint,
+                             reverse_code=migrations.RunPython.noop),
+    ]
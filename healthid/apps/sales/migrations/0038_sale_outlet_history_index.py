@@ -0,0 +1,17 @@
+# Generated by Django 2.2 on 2026-10-18 12:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0037_sales_performance_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['outlet', '-created_at', '-id'], name='sale_outlet_history_idx'),
+        ),
+    ]
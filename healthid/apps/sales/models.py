@@ -1,12 +1,12 @@
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
 from decimal import Decimal
 from graphql import GraphQLError
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Q, Sum, Count
+from django.db.models import Sum
 from django.db.models.signals import pre_save
 
 from healthid.apps.orders.models.orders import ProductBatch
-from healthid.utils.app_utils.get_user_business import get_user_business
 
 from healthid.apps.authentication.models import User
 from healthid.apps.outlets.models import Outlet
@@ -19,6 +19,7 @@ from healthid.apps.preference.models import OutletPreference
 from healthid.utils.app_utils.database import (SaveContextManager,
                                                get_model_object)
 from healthid.utils.app_utils.id_generator import id_gen
+from healthid.utils.app_utils.query_counter import QueryCounter
 from healthid.utils.sales_utils.initiate_sale import initiate_sale
 from healthid.utils.sales_utils.validate_sale import SalesValidator
 from healthid.utils.sales_utils.validators import check_approved_sales
@@ -188,9 +189,7 @@ class Sale(BaseModel):
         """
         Returns the split payments breakdown
         """
-        return Payments.objects.filter(
-            sale_id=self.id
-        )
+        return self.payments_set.all()
 
         pass
 
@@ -198,6 +197,8 @@ class Sale(BaseModel):
         """
         This method create a sale after it has been validated
         by _validate_sales_details()
+        The number of queries spent checking out the basket is kept on
+        the returned sale as query_count.
         Arguments:
             kwargs: information about sale
             info: information about the logged in user
@@ -221,8 +222,7 @@ class Sale(BaseModel):
             paid_amount *= -1
             amount_to_pay *= -1
         outlet = get_model_object(Outlet, "id", outlet_id)
-        sold_product_instances = Sale._validate_sales_details(
-            self, **kwargs)
+        Sale._validate_sales_details(self, **kwargs)
         sale = Sale(sales_person=sales_person,
                     outlet=outlet,
                     payment_method=payment_method,
@@ -258,13 +258,12 @@ class Sale(BaseModel):
                     customer_account=customer_credit)
                 debit_wallet_history.save()
 
-        with SaveContextManager(sale) as sale:
+        with QueryCounter() as checkout_queries, \
+                SaveContextManager(sale) as sale:
             loyalty_points_earned = initiate_sale(
-                sold_product_instances,
                 sold_batches,
                 sale,
-                SaleDetail,
-                BatchHistory)
+                SaleDetail)
             if customer_id:
                 sale.customer = customer
                 if customer.loyalty_member:
@@ -272,42 +271,15 @@ class Sale(BaseModel):
                     customer.loyalty_points += loyalty_points_earned
                     customer.save()
                 sale.save()
+        sale.query_count = checkout_queries.count
         return sale
 
-    def sales_history(self, outlet_id=None, search=None, \
-                      date_from=None, date_to=None):
-        sales = Sale.objects.filter(outlet_id=outlet_id)
-
-        if search:
-            search_keys = (
-                    Q(customer__first_name__icontains=search) |
-                    Q(customer__last_name__icontains=search) |
-                    Q(sales_person__first_name__icontains=search) |
-                    Q(sales_person__last_name__icontains=search) |
-                    Q(customer__email__icontains=search) |
-                    Q(saledetail__product__product_name__icontains=search) |
-                    Q(notes__icontains=search)
-            )
-            sales = list(set(sales.filter(search_keys)))
-
-        date_from_sales = []
-
-        if date_from:
-            for sale in sales:
-                if sale.created_at >= date_from:
-                    date_from_sales.append(sale)
-            date_to_sales = []
-            if date_to:
-                for sale in date_from_sales:
-                    if sale.created_at <= date_to:
-                        date_to_sales.append(sale)
-                return date_to_sales
-            return date_from_sales
-
-        return sales
-
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['outlet', '-created_at', '-id'],
+                         name='sale_outlet_history_idx')
+        ]
 
 
 class SaleDetail(BaseModel):
@@ -484,36 +456,13 @@ class BatchHistory(BaseModel):
         related_name='quantity_by_batches')
     quantity_taken = models.PositiveIntegerField()
 
-    def team_performance(self, business, date_today_before, date_today_after):
-
-        sales = BatchHistory.objects.filter(created_at__gte=date_today_before).filter(
-            created_at__lte=date_today_after)
-
-        users_sales = []
-
-        for sale in sales:
-            if not any(user.sale.sales_person == sale.sale.sales_person for user in users_sales) and get_user_business(
-                    sale.sale.sales_person) == business:
-                sale.totalProductsSold = sales.filter(sale__sales_person=sale.sale.sales_person).aggregate(
-                    Count('product__product_name', distinct=True))['product__product_name__count'] or 0
-
-                sale.totalQtySold = sales.filter(sale__sales_person=sale.sale.sales_person).aggregate(
-                    Sum('quantity_taken'))['quantity_taken__sum'] or 0
-
-                sale.totalCashAmount = sales.filter(sale__sales_person=sale.sale.sales_person).filter(
-                    sale__payment_method='cash').aggregate(Sum('sale__paid_amount'))['sale__paid_amount__sum'] or 0
-
-                sale.totalCardAmount = sales.filter(sale__sales_person=sale.sale.sales_person).filter(
-                    sale__payment_method='card').aggregate(Sum('sale__paid_amount'))['sale__paid_amount__sum'] or 0
-
-                users_sales.append(sale)
-
-        return users_sales
-
 
 class SalesPerformance(BaseModel):
     sale = models.ForeignKey(
         Sale, on_delete=models.CASCADE, related_name="sales")
+    sale_detail = models.OneToOneField(
+        SaleDetail, on_delete=models.CASCADE, null=True,
+        related_name="performance")
     product = models.ForeignKey(
         Product, on_delete=models.CASCADE, related_name="sale_product")
     cashier = models.ForeignKey(
@@ -529,6 +478,62 @@ class SalesPerformance(BaseModel):
     transaction_date = models.DateTimeField()
 
 
+class DailyProductSales(models.Model):
+    """
+    Quantity of a product sold by an outlet on a day, aggregated from the
+    sale details by healthid.utils.sales_utils.sale_velocity so that the
+    sales velocity is computed from a few rows per product rather than
+    from every sale.
+    """
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="daily_sales")
+    outlet = models.ForeignKey(
+        Outlet, on_delete=models.CASCADE, related_name="daily_sales")
+    sale_date = models.DateField()
+    quantity_sold = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = (("product", "outlet", "sale_date"))
+
+
+class ProductSalesVelocity(models.Model):
+    """
+    Sales velocity of a product at an outlet, computed daily over a
+    rolling window of weeks.
+
+    Attributes:
+        weekly_sales: quantity sold in each week of the window, the most
+                      recent week first
+        velocity: average quantity sold in the weeks with sales
+        window_end: last day of the window
+    """
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="sales_velocities")
+    outlet = models.ForeignKey(
+        Outlet, on_delete=models.CASCADE, related_name="sales_velocities")
+    weekly_sales = ArrayField(models.IntegerField())
+    velocity = models.FloatField()
+    window_end = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (("product", "outlet"))
+
+
+class EtlCheckpoint(models.Model):
+    """
+    Progress of an incremental load of rows from one table into another.
+
+    Attributes:
+        name: name of the load
+        last_id: id of the last source row loaded
+        updated_at: when the load last moved forward
+    """
+    name = models.CharField(max_length=100, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
 class Payments(BaseModel):
     """
     defines a model which stores the different payment methods associated with a sale
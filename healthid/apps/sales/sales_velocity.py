@@ -1,15 +1,12 @@
 """ Contains business logic for calculating sales velocity."""
 import collections
-from dateutil.relativedelta import relativedelta
-
-from django.db.models import Sum
-from django.utils import timezone
 
 from healthid.apps.preference.models import OutletPreference
-from healthid.apps.sales.models import SaleDetail
+from healthid.apps.sales.models import ProductSalesVelocity
 from healthid.utils.app_utils.database import get_model_object
 from healthid.utils.messages.sales_responses import (
     SALES_ERROR_RESPONSES, SALES_SUCCESS_RESPONSES)
+from healthid.utils.sales_utils.sale_velocity import VELOCITY_WEEKS
 
 
 class SalesVelocity():
@@ -36,46 +33,19 @@ class SalesVelocity():
             weeks_count (int) how many weeks of sales
                 that are to be queried.
         Returns an array of sales for a product.
-        The values are for a sum of n weeks back
-            starting from the day the request is made
-        """
-        today = timezone.now()
-
-        week_sales = []
-        initial_weeks_count = 0
-
-        while initial_weeks_count < weeks_count:
-            current_date = today + relativedelta(
-                weeks=-(initial_weeks_count+1))
-            earlier_date = today + relativedelta(
-                weeks=-(initial_weeks_count+2))
-            week_sale = self.get_sales_for_period(
-                current_date, earlier_date)
-            week_sales.append(week_sale[0])
-            initial_weeks_count += 1
-
-        week_sales = [(
-            lambda week_sale: 0 if week_sale is None else week_sale)(
-            week_sale) for week_sale in week_sales]
-
-        return week_sales
-
-    def get_sales_for_period(self, current_date, earlier_date):
-        """
-        Get total sales for a specific period
-        Args:
-            current_date (date) When the period starts going back
-            earlier_date (date) When the period ends going forward
-        Returns:
-            A list containing total sales, which
-            can be an int or None
+        The values are for a sum of n weeks back, as of the last
+            refresh of the product's sales velocity at the outlet
+        Raises:
+            ValueError: when weeks_count is not between 1 and the
+                VELOCITY_WEEKS stored for the product
         """
-        period_sales = SaleDetail.objects.filter(
-            product_id=self.product_id,
-            created_at__gte=earlier_date,
-            created_at__lte=current_date).aggregate(
-            Sum('quantity')).values()
-        return list(period_sales)
+        if not 1 <= weeks_count <= VELOCITY_WEEKS:
+            raise ValueError(
+                f'weeks_count must be between 1 and {VELOCITY_WEEKS}')
+        weekly_sales = ProductSalesVelocity.objects.filter(
+            product_id=self.product_id, outlet_id=self.outlet_id
+        ).values_list('weekly_sales', flat=True).first() or []
+        return (weekly_sales + [0] * weeks_count)[:weeks_count]
 
     def velocity_calculator(self):
         """
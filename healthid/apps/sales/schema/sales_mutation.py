@@ -206,6 +206,7 @@ class CreateSale(graphene.Mutation):
     error = graphene.String()
     receipt = graphene.Field(ReceiptType)
     products = graphene.List(ProductType)
+    query_count = graphene.Int()
 
     class Arguments:
         customer_id = graphene.String()
@@ -258,7 +259,8 @@ class CreateSale(graphene.Mutation):
         return CreateSale(sale=sale,
                           receipt=receipt,
                           message=SALES_SUCCESS_RESPONSES["create_sales_success"],
-                          products=products
+                          products=products,
+                          query_count=sale.query_count
                           )
 
 
@@ -279,7 +281,8 @@ class CreateReturn(CreateSale):
                             receipt=receipt,
                             message=SALES_SUCCESS_RESPONSES["sales_return_approved"],
                             products=products,
-                            old_sale=old_sale
+                            old_sale=old_sale,
+                            query_count=sale.query_count
                             )
 
 
@@ -1,16 +1,20 @@
 import graphene
 from django.db.models import Q
 from graphql_jwt.decorators import login_required
+from graphene.types.resolver import dict_resolver
 from graphene_django import DjangoObjectType
 from graphene_django.filter import DjangoFilterConnectionField
 from graphql.error import GraphQLError
 from healthid.utils.app_utils.pagination_defaults import PAGINATION_DEFAULT
-from healthid.utils.app_utils.pagination import pagination_query
+from healthid.utils.app_utils.pagination import (
+    pagination_query, store_pagination)
+from healthid.utils.auth_utils.decorator import user_permission
+from healthid.utils.sales_utils.sales_report import build_sales_report
+from healthid.utils.sales_utils.team_report import team_performance
 
 from healthid.apps.sales.sales_velocity import SalesVelocity
 from healthid.apps.sales.models import BatchHistory, SalesPerformance
 from healthid.utils.app_utils.get_user_business import get_user_business
-from healthid.utils.app_utils.pagination import pagination_query
 
 
 class Velocity(graphene.ObjectType):
@@ -29,6 +33,45 @@ class BatchHistoryType(DjangoObjectType):
     totalCardAmount = graphene.Float()
 
 
+class SoldProductReport(graphene.ObjectType):
+    class Meta:
+        default_resolver = dict_resolver
+
+    product_name = graphene.String()
+    qty_sold = graphene.Int()
+    batch_nbr = graphene.String()
+    expire_date = graphene.Date()
+
+
+class SalesTotalsReport(graphene.ObjectType):
+    class Meta:
+        default_resolver = dict_resolver
+
+    total_number_sold = graphene.Int()
+    total_qty_sold = graphene.Int()
+    total_amount_cash = graphene.Float()
+    total_amount_card = graphene.Float()
+    sold_amount = graphene.Float()
+
+
+class CashierSalesReport(SalesTotalsReport):
+    class Meta:
+        default_resolver = dict_resolver
+
+    user_id = graphene.String()
+    user_name = graphene.String()
+    product_list = graphene.List(SoldProductReport)
+
+
+class OutletSalesReport(SalesTotalsReport):
+    class Meta:
+        default_resolver = dict_resolver
+
+    id = graphene.Int()
+    name = graphene.String()
+    cashiers = graphene.List(CashierSalesReport)
+
+
 class SalePerformanceType(DjangoObjectType):
     class Meta:
         model = SalesPerformance
@@ -68,6 +111,9 @@ class Query(graphene.ObjectType):
         date_to=graphene.DateTime(required=True),
         page_count=graphene.Int(),
         page_number=graphene.Int())
+    sales_report = graphene.List(
+        OutletSalesReport,
+        date=graphene.Date())
     sales = graphene.relay.Node.Field(SalePerformanceType)
     sale_performances = DjangoFilterConnectionField(
             SalePerformanceType,
@@ -95,15 +141,15 @@ class Query(graphene.ObjectType):
         page_number = kwargs.get('page_number')
         
         business = get_user_business(info.context.user)
-        resolved_sales = BatchHistory.team_performance(self, business, date_from, date_to)
-
-        if page_number and page_count:
-            sales = pagination_query(resolved_sales, page_count, page_number)
-            Query.pagination_result = sales
-
-            return sales[0]
+        return team_performance(
+            business.id, date_from, date_to, page_count, page_number)
 
-        return resolved_sales
+    @login_required
+    @user_permission('Manager')
+    def resolve_sales_report(self, info, **kwargs):
+        business = get_user_business(info.context.user)
+        return build_sales_report(
+            [business.id], kwargs.get('date'))[business.id]
 
     def resolve_sale_performances(self, info, **kwargs):
 
@@ -134,7 +180,7 @@ class Query(graphene.ObjectType):
 
         if page_count and page_number:
             filtered_sales = pagination_query(resolve_sales, page_count, page_number)
-            Query.pagination_result = filtered_sales
+            store_pagination(info, filtered_sales)
             return filtered_sales[0]
 
         return resolve_sales
\ No newline at end of file
@@ -9,10 +9,14 @@ from healthid.apps.sales.models import (
     Sale, SaleDetail, SalesPrompt, SaleReturn, SaleReturnDetail, Payments)
 
 from healthid.utils.app_utils.database import get_model_object
-from healthid.utils.app_utils.pagination import pagination_query
+from healthid.utils.app_utils.dataloaders import GroupedLoader, get_loader
+from healthid.utils.app_utils.pagination import (
+    encode_cursor, keyset_page, pagination_query, store_pagination,
+    total_count, total_pages)
 from healthid.utils.app_utils.pagination_defaults import PAGINATION_DEFAULT
 from healthid.utils.auth_utils.decorator import user_permission
 from healthid.utils.messages.sales_responses import SALES_ERROR_RESPONSES
+from healthid.utils.sales_utils.sales_history import sales_history
 
 
 class SalesPromptType(DjangoObjectType):
@@ -33,6 +37,7 @@ class PaymentsType(DjangoObjectType):
 class SaleType(DjangoObjectType):
     register_id = graphene.Int(source='get_default_register')
     split_payments = graphene.List(PaymentsType)
+    cursor = graphene.String()
 
     class Meta:
         model = Sale
@@ -41,7 +46,11 @@ class SaleType(DjangoObjectType):
     id = graphene.ID(required=True)
 
     def resolve_split_payments(self, info, **kwargs):
-        return self.get_split_payments
+        return get_loader(info, 'sale_payments', lambda: GroupedLoader(
+            Payments.objects.order_by('pk'), 'sale_id')).load(self.id)
+
+    def resolve_cursor(self, info, **kwargs):
+        return encode_cursor(self)
 
     @resolve_only_args
     def resolve_id(self):
@@ -80,7 +89,9 @@ class Query(graphene.ObjectType):
                                          page_count=graphene.Int(),
                                          page_number=graphene.Int(),
                                          date_from=graphene.DateTime(),
-                                         date_to=graphene.DateTime())
+                                         date_to=graphene.DateTime(),
+                                         first=graphene.Int(),
+                                         after=graphene.String())
     all_sales_history = graphene.List(SaleType,
                                       page_count=graphene.Int(),
                                       page_number=graphene.Int())
@@ -114,19 +125,23 @@ class Query(graphene.ObjectType):
         if date_to and not date_from:
             raise GraphQLError(SALES_ERROR_RESPONSES["provide_date_from"])
 
-        sale = Sale()
-        resolved_value = sale.sales_history(
+        resolved_value = sales_history(
             outlet_id=outlet_id,
             search=search,
             date_from=date_from,
             date_to=date_to)
 
+        if kwargs.get('first'):
+            return keyset_page(
+                resolved_value, kwargs['first'], kwargs.get('after'))
+
         if page_count or page_number:
             sales = pagination_query(
                 resolved_value, page_count, page_number)
-            Query.pagination_result = sales
+            store_pagination(info, sales)
             return sales[0]
 
+        resolved_value = list(resolved_value)
         if not resolved_value:
             return GraphQLError(SALES_ERROR_RESPONSES["no_sales_error"])
 
@@ -143,15 +158,11 @@ class Query(graphene.ObjectType):
         is being applied, this is due to GraphQL order of resolver methods
         execution.
         """
-        if not Query.pagination_result:
-            return 0
-        return Query.pagination_result[1]
+        return total_pages(info)
 
     @login_required
     def resolve_total_number_of_sales(self, info, **kwargs):
-        if not Query.pagination_result:
-            return 0
-        return Query.pagination_result[2]
+        return total_count(info)
 
     @login_required
     def resolve_sale_history(self, info, sale_id):
@@ -169,7 +180,7 @@ class Query(graphene.ObjectType):
         if page_count or page_number:
             sales = pagination_query(
                 resolved_value, page_count, page_number)
-            Query.pagination_result = sales
+            store_pagination(info, sales)
             return sales[0]
         if resolved_value:
             paginated_response = pagination_query(resolved_value,
@@ -178,6 +189,6 @@ class Query(graphene.ObjectType):
                                                   PAGINATION_DEFAULT[
                                                       "page_number"])
 
-            Query.pagination_result = paginated_response
+            store_pagination(info, paginated_response)
             return paginated_response[0]
         return GraphQLError(SALES_ERROR_RESPONSES["no_sales_error"])
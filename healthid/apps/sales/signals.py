@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from healthid.apps.sales.models import Sale
+from healthid.utils.sales_utils.team_report import invalidate_team_report
+
+
+@receiver(post_save, sender=Sale)
+def refresh_team_report(sender, instance, **kwargs):
+    """
+    Drop the cached team reports of the business a sale is made in
+    """
+    invalidate_team_report(instance.outlet.business_id)
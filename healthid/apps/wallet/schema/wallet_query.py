@@ -1,6 +1,7 @@
 import graphene
 from graphql_jwt.decorators import login_required
-from healthid.utils.app_utils.pagination import pagination_query
+from healthid.utils.app_utils.pagination import (
+    pagination_query, store_pagination, total_pages)
 from healthid.utils.app_utils.pagination_defaults import PAGINATION_DEFAULT
 from healthid.apps.wallet.schema.wallet_schema import CustomerCreditType
 from healthid.apps.wallet.models import CustomerCredit
@@ -18,7 +19,6 @@ class CustomerCreditQuery(graphene.ObjectType):
         customer_id=graphene.Int(),
     )
     total_customer_credit_account_pages = graphene.Int()
-    pagination_result = None
     @login_required
     def resolve_customer_credits(self, info, **kwargs):
 
@@ -30,14 +30,14 @@ class CustomerCreditQuery(graphene.ObjectType):
                 resolved_values, page_count, page_number
             )
 
-            CustomerCreditQuery.pagination_result = customer_credits
+            store_pagination(info, customer_credits)
             return customer_credits[0]
 
         paginated_response = pagination_query(
             resolved_values,
             PAGINATION_DEFAULT['page_count'],
             PAGINATION_DEFAULT['page_number'])
-        CustomerCreditQuery.pagination_result = paginated_response
+        store_pagination(info, paginated_response)
         return paginated_response[0]
 
     @login_required
@@ -50,6 +50,4 @@ class CustomerCreditQuery(graphene.ObjectType):
     @login_required
     def resolve_total_customer_credit_account_pages(self, info, **kwargs):
         """ Resolves the total number of pages on paginated store credits. """
-        if not CustomerCreditQuery.pagination_result:
-            return 0
-        return CustomerCreditQuery.pagination_result[1]
+        return total_pages(info)
@@ -0,0 +1,101 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+logger = logging.getLogger(__name__)
+
+# key of the Postgres advisory lock held by the process running the jobs
+SCHEDULER_LOCK_ID = 727001
+
+
+class SchedulerLeader:
+    """
+    Run a scheduler in a single process among the ones started.
+
+    The process holding the SCHEDULER_LOCK_ID session advisory lock is the
+    leader and runs the jobs. The others stand by, trying to take the lock
+    every retry_seconds. The lock is released by Postgres when the session
+    of the leader ends, so a standby takes over when the leader dies. A
+    leader that loses its connection stops its scheduler and stands by.
+
+    Attributes:
+        scheduler(obj): scheduler started while leading
+        add_jobs(callable): adds the jobs to the scheduler once leading
+        retry_seconds(float): seconds between two checks of the lock
+        leading(bool): True while the process holds the lock
+    """
+
+    def __init__(self, scheduler, add_jobs, retry_seconds=None):
+        self.scheduler = scheduler
+        self.add_jobs = add_jobs
+        self.retry_seconds = retry_seconds or \
+            settings.SCHEDULER_LOCK_RETRY_SECONDS
+        self.leading = False
+        self.stopped = threading.Event()
+
+    def try_lock(self):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_lock(%s)',
+                               [SCHEDULER_LOCK_ID])
+                locked, = cursor.fetchone()
+            return locked
+        except DatabaseError:
+            connection.close()
+            return False
+
+    def holds_lock(self):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT EXISTS(SELECT 1 FROM pg_locks WHERE "
+                    "locktype = 'advisory' AND objid = %s AND granted AND "
+                    "pid = pg_backend_pid())", [SCHEDULER_LOCK_ID])
+                held, = cursor.fetchone()
+            return held
+        except DatabaseError:
+            connection.close()
+            return False
+
+    def lead(self):
+        logger.info('Leading the scheduler')
+        self.leading = True
+        self.add_jobs()
+        if self.scheduler.state:
+            self.scheduler.resume()
+        else:
+            self.scheduler.start()
+
+    def stand_by(self):
+        logger.warning('Lost the scheduler lock, standing by')
+        self.leading = False
+        self.scheduler.pause()
+
+    def check(self):
+        """
+        Take the lead when the lock is free, or give it up when it was lost
+        """
+        if self.leading and not self.holds_lock():
+            self.stand_by()
+        elif not self.leading and self.try_lock():
+            self.lead()
+
+    def run(self):
+        """
+        Check the lock every retry_seconds until stop() is called
+        """
+        try:
+            while not self.stopped.is_set():
+                self.check()
+                self.stopped.wait(self.retry_seconds)
+        finally:
+            if self.scheduler.state:
+                self.scheduler.shutdown()
+            if self.leading:
+                self.leading = False
+                connection.close()
+
+    def stop(self):
+        self.stopped.set()
@@ -1,12 +1,15 @@
 import os
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.background import BackgroundScheduler
 from django.conf import settings
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
+from django_apscheduler.jobstores import DjangoJobStore, register_events
+from django_apscheduler.models import DjangoJob, DjangoJobExecution
 from healthid.utils.despatch_util.despatch_email_util import (
     queue_emails_job)
 from healthid.apps.stock.models import StockCountTemplate
-from healthid.utils.sales_utils.sales_report import check_user_sales, send_sales_report
+from healthid.utils.sales_utils.sales_report import send_sales_report
 from healthid.utils.sales_utils.sale_performance import populate_sale_performace_table
 from healthid.utils.stock_utils.daily_stock_report import generate_stock_reports
 from healthid.utils.sales_utils.sale_velocity import calculate_sale_velocity
@@ -16,64 +19,86 @@ from healthid.utils.stock_utils.stock_count_alert import \
     generate_stock_counts_notifications, schedule_templates
 from healthid.utils.product_utils.product_expiry import \
     check_for_expiry_products
+from healthid.utils.product_utils.low_stock_alerts import alert_low_stock
 from healthid.utils.orders_utils.inventory_notification import \
     inventory_check
-    
+from healthid.utils.product_utils.inventory_ledger import \
+    reconcile_inventory_job
+from healthid.utils.csv_import.import_jobs import resume_import_jobs
+
 
 time_interval = os.environ.get('EXPIRY_NOTIFICATION_DURATION', '43200')
 job_run_interval = int(settings.STOCK_JOB_TIME_INTERVAL)
 generate_promotion_interval = os.environ.get('GENERATE_PROMOTION_INTERVAL',
-                                             1440) 
+                                             1440)
+
+# jobs are stored in the database, for the process taking over the
+# scheduler to pick up their next run times, and their runs are recorded
+# as DjangoJobExecution rows. A job never runs twice at once, and the runs
+# it missed while no scheduler was up are run once.
+scheduler = BackgroundScheduler(
+    jobstores={'default': DjangoJobStore()},
+    executors={'default': ThreadPoolExecutor(settings.SCHEDULER_WORKERS)},
+    job_defaults={'coalesce': True, 'max_instances': 1,
+                  'misfire_grace_time': settings.SCHEDULER_MISFIRE_GRACE})
+register_events(scheduler)
 
-scheduler = BackgroundScheduler()
 
-scheduler.add_job(notify_about_expired_products,
-                  'interval', minutes=int(time_interval))
-scheduler.add_job(calculate_sale_velocity, 'cron',
-                  hour=21, minute=00)
-scheduler.add_job(generate_stock_reports, 'cron',
-                  hour=22, minute=00)
-scheduler.add_job(populate_sale_performace_table, 'cron',
-                  hour=8, minute=00 )
-scheduler.add_job(check_for_expiry_products, 'interval',
-                  minutes=int(generate_promotion_interval))
-scheduler.add_job(inventory_check, 'cron',
-                  day_of_week='sun', hour=23, minute=50)
-scheduler.add_job(notify_pusher_about_expired_products, 'cron',
-                  day_of_week='mon', hour=9, minute=30)
-scheduler.add_job(notify_pusher_about_expired_products, 'cron',
-                  day_of_week='mon', hour=9, minute=30)
+def delete_old_job_executions():
+    """
+    Drop the records of the job runs older than SCHEDULER_EXECUTION_MAX_AGE
+    """
+    DjangoJobExecution.objects.delete_old_job_executions(
+        settings.SCHEDULER_EXECUTION_MAX_AGE)
 
-if not settings.TESTING:
-    scheduler.add_job(queue_emails_job, 'interval', seconds=5)
 
-scheduler.start()
+def add_job(func, trigger, **kwargs):
+    scheduler.add_job(func, trigger, replace_existing=True,
+                      id=f'{func.__module__}.{func.__name__}', **kwargs)
 
 
-def alert_counting():
+def add_jobs():
     """
-    Method starts a new job for stock counts notifications
+    Add the jobs of the application to the scheduler, which is only started
+    by the scheduler process, see the run_scheduler command
     """
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(
-        generate_stock_counts_notifications, 'interval',
-        minutes=job_run_interval)
-    scheduler.start()
+    add_job(notify_about_expired_products,
+            'interval', minutes=int(time_interval))
+    add_job(calculate_sale_velocity, 'cron',
+            hour=21, minute=00)
+    add_job(generate_stock_reports, 'cron',
+            hour=22, minute=00)
+    add_job(populate_sale_performace_table, 'interval', minutes=15)
+    add_job(check_for_expiry_products, 'interval',
+            minutes=int(generate_promotion_interval))
+    add_job(inventory_check, 'cron',
+            day_of_week='sun', hour=23, minute=50)
+    add_job(reconcile_inventory_job, 'cron',
+            hour=3, minute=00)
+    add_job(resume_import_jobs, 'interval', minutes=5)
+    add_job(notify_pusher_about_expired_products, 'cron',
+            day_of_week='mon', hour=9, minute=30)
+    add_job(generate_stock_counts_notifications, 'interval',
+            minutes=job_run_interval)
+    add_job(alert_low_stock, 'interval',
+            minutes=settings.LOW_STOCK_ALERT_INTERVAL)
+    add_job(delete_old_job_executions, 'cron', hour=4, minute=00)
+
+    if not settings.TESTING:
+        add_job(queue_emails_job, 'interval', seconds=5)
 
 
 def start_schedule_templates():
     """
     Shedules a job for each of the template filtered
     """
-    if not scheduler.state:
-        scheduler.start()
-
     stock_templates = StockCountTemplate.objects.filter(
         scheduled=False, interval__gt=0)
     for template in stock_templates:
         scheduler.add_job(
-            lambda: schedule_templates(template), 'interval',
+            schedule_templates, 'interval', args=[template],
             id='{}'.format(template.id),
+            replace_existing=True,
             days=template.interval,
             start_date=template.created_at,
             end_date=template.end_on)
@@ -84,8 +109,7 @@ def start_schedule_templates():
 @receiver(post_delete, sender=StockCountTemplate)
 def remove_scheduled_jobs(sender, instance, using, **kwargs):
     """
-    Stops a schedule when a template is deleted if necessary
+    Stops a schedule when a template is deleted if necessary, from the job
+    store shared with the scheduler process
     """
-    job_id = '{}'.format(instance.id)
-    if scheduler.get_job(job_id) in scheduler.get_jobs():
-        scheduler.remove_job(job_id)
+    DjangoJob.objects.filter(name='{}'.format(instance.id)).delete()
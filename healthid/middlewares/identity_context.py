@@ -0,0 +1,18 @@
+from django.utils.deprecation import MiddlewareMixin
+
+from healthid.utils.app_utils.identity import (close_identity_scope,
+                                               open_identity_scope)
+
+
+class IdentityContext(MiddlewareMixin):
+    """
+    Memoize the business, active outlet, role and outlet preference of
+    users for the duration of a request.
+    """
+
+    def process_request(self, request):
+        open_identity_scope()
+
+    def process_response(self, request, response):
+        close_identity_scope()
+        return response
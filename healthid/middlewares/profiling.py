@@ -0,0 +1,54 @@
+import time
+
+from django.db import connection
+from promise import is_thenable
+
+from healthid.utils.app_utils.profiling import (OperationProfile,
+                                                profiling_enabled,
+                                                record_profile)
+
+
+class OperationProfiler:
+    """
+    Profile the GraphQL operations of requests, counting the SQL queries
+    of sampled ones.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling_enabled():
+            return self.get_response(request)
+        profile = request.operation_profile = OperationProfile()
+        if profile.sampled:
+            with connection.execute_wrapper(profile.record_query):
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+        record_profile(profile, None if response.streaming
+                       else len(response.content))
+        return response
+
+
+class FieldProfiler:
+    """
+    Graphene middleware naming the operation profiled for a request and
+    timing its resolvers when it is sampled. Resolvers returning a
+    promise are timed until it is fulfilled, their batch included.
+    """
+
+    def resolve(self, next, root, info, **kwargs):
+        profile = getattr(info.context, 'operation_profile', None)
+        if profile is None:
+            return next(root, info, **kwargs)
+        profile.start_operation(info)
+        if not profile.sampled:
+            return next(root, info, **kwargs)
+        started = time.perf_counter()
+        result = next(root, info, **kwargs)
+        if is_thenable(result):
+            return result.then(
+                lambda value: profile.record_field(info, started) or value)
+        profile.record_field(info, started)
+        return result
@@ -24,6 +24,7 @@ from healthid.apps.sales.schema import (sales_mutation, sales_schema,
                                         cart_mutation, cart_query, sales_query,
                                         near_expire_promotion)
 from healthid.apps.events.schema import event_querys, event_mutations
+from healthid.apps.imports.schema import import_query
 from healthid.apps.stock.schema.mutations import stock_mutation
 from healthid.apps.stock.schema.queries import stock_query
 from healthid.apps.customers.schema import customer_mutation, customer_query
@@ -54,6 +55,7 @@ class Query(
         customer_query.Query,
         order_query.Query,
         wallet_query.CustomerCreditQuery,
+        import_query.Query,
         graphene.ObjectType):
     pass
 
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'graphene_django',
     'healthid.apps.authentication',
     'healthid.apps.business',
@@ -64,11 +65,14 @@ INSTALLED_APPS = [
     'django_apscheduler',
     'healthid.apps.stock',
     'healthid.apps.wallet',
-    'healthid.apps.despatch_queue'
+    'healthid.apps.despatch_queue',
+    'healthid.apps.imports'
 ]
 
 MIDDLEWARE = [
+    'healthid.middlewares.profiling.OperationProfiler',
     'healthid.middlewares.ignore_login_token.IgnoreToken',
+    'healthid.middlewares.identity_context.IdentityContext',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -152,7 +156,8 @@ USE_TZ = True
 GRAPHENE = {
     "SCHEMA": "healthid.schema.schema",
     "MIDDLEWARE": [
-        "graphql_jwt.middleware.JSONWebTokenMiddleware"
+        "graphql_jwt.middleware.JSONWebTokenMiddleware",
+        "healthid.middlewares.profiling.FieldProfiler",
     ],
     "SCHEMA_INDENT": 4,
 }
@@ -214,6 +219,23 @@ SCHEDULER_CONFIG = {
 }
 
 SCHEDULER_AUTOSTART = True
+# the jobs run in the single process leading the run_scheduler command,
+# on SCHEDULER_WORKERS threads. The records of their runs are kept for
+# SCHEDULER_EXECUTION_MAX_AGE seconds
+SCHEDULER_WORKERS = int(os.environ.get('SCHEDULER_WORKERS', '4'))
+SCHEDULER_MISFIRE_GRACE = int(
+    os.environ.get('SCHEDULER_MISFIRE_GRACE', '300'))
+SCHEDULER_LOCK_RETRY_SECONDS = int(
+    os.environ.get('SCHEDULER_LOCK_RETRY_SECONDS', '15'))
+SCHEDULER_EXECUTION_MAX_AGE = int(
+    os.environ.get('SCHEDULER_EXECUTION_MAX_AGE', '604800'))
+# products at or below their reorder threshold are looked for every
+# LOW_STOCK_ALERT_INTERVAL minutes, an outlet being alerted about a product
+# again after LOW_STOCK_ALERT_WINDOW seconds if it stays low
+LOW_STOCK_ALERT_INTERVAL = int(
+    os.environ.get('LOW_STOCK_ALERT_INTERVAL', '15'))
+LOW_STOCK_ALERT_WINDOW = int(
+    os.environ.get('LOW_STOCK_ALERT_WINDOW', '86400'))
 
 pusher = pusher.Pusher(
     app_id=os.environ.get('PUSHER_APP_ID'),
@@ -226,6 +248,77 @@ STOCK_JOB_TIME_INTERVAL = os.environ.get('STOCK_JOB_TIME_INTERVAL', '1440')
 MOCK_AVERAGE_WEEKLY_SALES = int(
     os.environ.get('MOCK_AVERAGE_WEEKLY_SALES', '2'))
 TESTING = sys.argv[1:2] == ['test']
+# csv uploads are imported by this many background workers, or inline
+# within the request when set to 0. Uploads wait in CSV_IMPORT_DIR, which
+# the scheduler process resuming queued jobs must see too, and imports
+# still running after CSV_IMPORT_TIMEOUT seconds are failed
+CSV_IMPORT_WORKERS = int(
+    os.environ.get('CSV_IMPORT_WORKERS', '0' if TESTING else '2'))
+CSV_IMPORT_DIR = os.environ.get(
+    'CSV_IMPORT_DIR', os.path.join(BASE_DIR, 'csv_imports'))
+CSV_IMPORT_TIMEOUT = int(os.environ.get('CSV_IMPORT_TIMEOUT', '3600'))
+# emails, in-app and pusher notifications are sent by this many
+# background workers, or inline when set to 0
+NOTIFICATION_WORKERS = int(
+    os.environ.get('NOTIFICATION_WORKERS', '0' if TESTING else '4'))
+NOTIFICATION_QUEUE_SIZE = int(
+    os.environ.get('NOTIFICATION_QUEUE_SIZE', '1000'))
+NOTIFICATION_SUBMIT_TIMEOUT = float(
+    os.environ.get('NOTIFICATION_SUBMIT_TIMEOUT', '5'))
+# notification events are published to Pusher, or kept in memory by a
+# local transport when set to 'local'
+PUSHER_TRANSPORT = os.environ.get(
+    'PUSHER_TRANSPORT', 'local' if TESTING else 'pusher')
+# email despatches are sent in batches over one SMTP connection and
+# retried after DESPATCH_RETRY_DELAY seconds, doubled on every attempt
+DESPATCH_BATCH_SIZE = int(os.environ.get('DESPATCH_BATCH_SIZE', '100'))
+DESPATCH_MAX_BATCHES = int(os.environ.get('DESPATCH_MAX_BATCHES', '10'))
+DESPATCH_MAX_ATTEMPTS = int(os.environ.get('DESPATCH_MAX_ATTEMPTS', '5'))
+DESPATCH_RETRY_DELAY = int(os.environ.get('DESPATCH_RETRY_DELAY', '60'))
+DESPATCH_CLAIM_TIMEOUT = int(os.environ.get('DESPATCH_CLAIM_TIMEOUT', '600'))
+# cache shared by every process when CACHE_BACKEND is set, e.g. to
+# django.core.cache.backends.db.DatabaseCache with a CACHE_LOCATION table
+# made by createcachetable, or else a separate cache in each process
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+# team reports are cached for this many seconds when set, or until a sale
+# is made. A sale only invalidates the reports cached by every process with
+# a shared CACHE_BACKEND, so leave it unset without one
+TEAM_REPORT_CACHE_TIMEOUT = int(
+    os.environ.get('TEAM_REPORT_CACHE_TIMEOUT', '0'))
+# paginated lists are counted with COUNT(*), cached for this many seconds
+# when set, or estimated by the planner once it expects at least
+# PAGINATION_ESTIMATE_THRESHOLD rows when that is set
+PAGINATION_COUNT_CACHE_TIMEOUT = int(
+    os.environ.get('PAGINATION_COUNT_CACHE_TIMEOUT', '0'))
+PAGINATION_ESTIMATE_THRESHOLD = int(
+    os.environ.get('PAGINATION_ESTIMATE_THRESHOLD', '0'))
+# the business, active outlet, role and outlet preference of users are
+# loaded once per request, and shared between requests for this many
+# seconds when set
+IDENTITY_CACHE_TIMEOUT = int(os.environ.get('IDENTITY_CACHE_TIMEOUT', '0'))
+# share of GraphQL operations whose resolvers and SQL queries are profiled,
+# and time from which an operation is recorded as slow whether it was
+# sampled or not; the last GRAPHQL_PROFILE_BUFFER_SIZE profiles are kept
+GRAPHQL_PROFILE_SAMPLE_RATE = float(
+    os.environ.get('GRAPHQL_PROFILE_SAMPLE_RATE', '0'))
+GRAPHQL_SLOW_OPERATION_MS = int(
+    os.environ.get('GRAPHQL_SLOW_OPERATION_MS', '0'))
+GRAPHQL_PROFILE_BUFFER_SIZE = int(
+    os.environ.get('GRAPHQL_PROFILE_BUFFER_SIZE', '200'))
+# GraphQL operations nested deeper or costing more, in objects fetched,
+# are rejected, and so are the operations of a user who spent more than
+# GRAPHQL_COST_BUDGET_PER_MINUTE in the last minute when that is set
+GRAPHQL_MAX_QUERY_DEPTH = int(os.environ.get('GRAPHQL_MAX_QUERY_DEPTH', '10'))
+GRAPHQL_MAX_QUERY_COST = int(
+    os.environ.get('GRAPHQL_MAX_QUERY_COST', '20000'))
+GRAPHQL_COST_BUDGET_PER_MINUTE = int(
+    os.environ.get('GRAPHQL_COST_BUDGET_PER_MINUTE', '0'))
 
 django_heroku.settings(locals())
 
@@ -245,5 +338,10 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        'healthid.utils.app_utils.profiling': {
+            'handlers': ['file'],
+            'level': 'INFO',
+            'propagate': True,
+        },
     },
 }
\ No newline at end of file
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from healthid.apps.authentication.models import User
+from healthid.apps.business.models import UserBusiness
+from healthid.apps.outlets.models import OutletUser
+from healthid.tests.factories import (OutletFactory, TimezoneFactory,
+                                      UserFactory, roleFactory)
+from healthid.utils.app_utils.check_user_in_outlet import \
+    check_user_has_an_active_outlet
+from healthid.utils.app_utils.get_user_business import get_user_business
+from healthid.utils.app_utils.identity import get_role_name, identity_scope
+from healthid.utils.app_utils.query_counter import QueryCounter
+from healthid.utils.preference_utils.outlet_preference import \
+    get_outlet_preference_by_user
+
+
+class TestIdentityContext(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        TimezoneFactory()
+        self.user = UserFactory(role=roleFactory())
+        self.outlet = OutletFactory()
+        UserBusiness.objects.create(
+            user=self.user, business=self.outlet.business)
+        self.outlet_user = OutletUser.objects.create(
+            user=self.user, outlet=self.outlet, is_active_outlet=True)
+
+    def resolve_identity(self, user):
+        return (get_user_business(user), check_user_has_an_active_outlet(user),
+                get_role_name(user), get_outlet_preference_by_user(user))
+
+    def test_identity_is_loaded_once_per_request(self):
+        user = User.objects.get(pk=self.user.pk)
+        with identity_scope():
+            with QueryCounter() as first_resolver:
+                business, outlet, _, preference = self.resolve_identity(user)
+            with QueryCounter() as other_resolvers:
+                for _ in range(3):
+                    self.resolve_identity(user)
+
+        self.assertEqual(first_resolver.count, 4)
+        self.assertEqual(other_resolvers.count, 0)
+        self.assertEqual(business, self.outlet.business)
+        self.assertEqual(outlet, self.outlet)
+        self.assertEqual(preference.outlet_id, self.outlet.id)
+
+    def test_identity_is_not_kept_outside_a_request(self):
+        user = User.objects.get(pk=self.user.pk)
+        self.resolve_identity(user)
+        with QueryCounter() as counter:
+            self.resolve_identity(user)
+
+        # the role stays cached on the user as any related object
+        self.assertEqual(counter.count, 3)
+
+    def test_default_outlet_is_the_active_outlet(self):
+        default_outlet = OutletFactory(business=self.outlet.business)
+        OutletUser.objects.create(
+            user=self.user, outlet=default_outlet, is_default_outlet=True)
+
+        self.assertEqual(self.user.active_outlet, default_outlet)
+
+    @override_settings(IDENTITY_CACHE_TIMEOUT=60)
+    def test_identity_is_shared_until_outlets_change(self):
+        with identity_scope():
+            self.resolve_identity(User.objects.get(pk=self.user.pk))
+        with identity_scope(), QueryCounter() as counter:
+            self.resolve_identity(User.objects.get(pk=self.user.pk))
+        self.assertEqual(counter.count, 1)
+
+        self.outlet_user.is_active_outlet = False
+        self.outlet_user.save()
+
+        with identity_scope():
+            user = User.objects.get(pk=self.user.pk)
+            self.assertIsNone(user.active_outlet)
+            self.assertIsNone(get_outlet_preference_by_user(user))
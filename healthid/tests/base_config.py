@@ -3,9 +3,11 @@ from datetime import datetime
 
 from django.forms import model_to_dict
 from django.test import Client, TestCase
+from rest_framework.response import Response
 
 from healthid.apps.authentication.models import Role, User
 from healthid.apps.events.models import Event, EventType
+from healthid.apps.imports.models import ImportJob
 from healthid.apps.orders.models import (Order, SupplierNote,
                                          Suppliers, SuppliersContacts,
                                          SuppliersMeta, Tier)
@@ -279,6 +281,15 @@ class BaseConfiguration(TestCase):
         self.assertNotIn("errors", resp, "Response had errors")
         self.assertEqual(resp["data"], expected, "Response has correct data")
 
+    def import_job_response(self, response):
+        """
+        follow a csv upload to the import job it queued, which runs
+        inline in tests, and return the outcome of the import
+        """
+        self.assertEqual(response.status_code, 202)
+        job = ImportJob.objects.get(id=response.data['jobId'])
+        return Response(job.result, job.status_code)
+
     def register_user(self, user, business):
         """
         register a new user
@@ -35,7 +35,8 @@ class TestCustomerCsvUpload(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['customers']), {'file': file},
             **self.auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='customers')
+        response = self.import_job_response(
+            view(request, param='customers'))
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.data["message"],
                          "Customers successfully added")
@@ -50,7 +51,8 @@ class TestCustomerCsvUpload(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['customers']), {'file': file},
             **self.auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='retail_pro_customers')
+        response = self.import_job_response(
+            view(request, param='retail_pro_customers'))
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.data["message"],
                          "Customers successfully added"
@@ -67,7 +69,8 @@ class TestCustomerCsvUpload(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['customers']), {'file': file},
             **self.auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='retail_pro_customers')
+        response = self.import_job_response(
+            view(request, param='retail_pro_customers'))
         
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.data["message"],
@@ -85,7 +88,8 @@ class TestCustomerCsvUpload(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['customers']), {'file': file},
             **self.auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='quick_books_customers')
+        response = self.import_job_response(
+            view(request, param='quick_books_customers'))
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.data["message"],
                          "Customers successfully added"
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from smtplib import SMTPRecipientsRefused, SMTPServerDisconnected
+from unittest.mock import patch
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from healthid.apps.despatch_queue.models import DespatchQueue, Despatch_Meta
+from healthid.tests.factories import UserFactory
+from healthid.utils.app_utils.query_counter import QueryCounter
+from healthid.utils.despatch_util.despatch_email_util import (
+    get_despatch_counters, queue_emails_job)
+
+SEND_MESSAGES = \
+    'django.core.mail.backends.locmem.EmailBackend.send_messages'
+
+
+class TestDespatchWorker(TestCase):
+
+    def despatch(self, minutes=-1, user=None, **kwargs):
+        despatch_q = DespatchQueue.objects.create(
+            recipient=user or UserFactory(),
+            due_date=timezone.now() + timedelta(minutes=minutes), **kwargs)
+        for key, value in (('subject', 'Stock count'), ('body', 'Count')):
+            Despatch_Meta.objects.create(
+                despatch=despatch_q, dataKey=key, dataValue=value)
+        return despatch_q
+
+    def test_due_pending_despatches_are_sent_in_one_batch(self):
+        due = [self.despatch() for _ in range(3)]
+        later = self.despatch(minutes=30)
+        sent = self.despatch(status=DespatchQueue.SENT)
+        sent_before = get_despatch_counters()['sent']
+
+        queue_emails_job()
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].subject, 'Stock count')
+        for despatch_q in due:
+            despatch_q.refresh_from_db()
+            self.assertEqual(despatch_q.status, DespatchQueue.SENT)
+            self.assertEqual(despatch_q.attempts, 1)
+            self.assertIsNotNone(despatch_q.sent_at)
+        later.refresh_from_db()
+        self.assertEqual(later.status, DespatchQueue.PENDING)
+        self.assertEqual(sent.attempts, 0)
+        self.assertEqual(get_despatch_counters()['sent'], sent_before + 3)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        query_counts = []
+        for size in (2, 10):
+            for _ in range(size):
+                self.despatch()
+            with QueryCounter() as counter:
+                queue_emails_job()
+            query_counts.append(counter.count)
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    @override_settings(DESPATCH_MAX_ATTEMPTS=2, DESPATCH_RETRY_DELAY=60)
+    def test_refused_email_is_retried_with_backoff_then_failed(self):
+        despatch_q = self.despatch()
+        with patch(SEND_MESSAGES, side_effect=SMTPRecipientsRefused({})):
+            queue_emails_job()
+            despatch_q.refresh_from_db()
+            self.assertEqual(despatch_q.status, DespatchQueue.PENDING)
+            self.assertEqual(despatch_q.attempts, 1)
+            self.assertGreater(despatch_q.due_date,
+                               timezone.now() + timedelta(seconds=50))
+
+            DespatchQueue.objects.filter(id=despatch_q.id).update(
+                due_date=timezone.now())
+            queue_emails_job()
+        despatch_q.refresh_from_db()
+        self.assertEqual(despatch_q.status, DespatchQueue.FAILED)
+        self.assertEqual(despatch_q.attempts, 2)
+        self.assertIsNotNone(despatch_q.last_error)
+
+    def test_lost_connection_retries_the_rest_of_the_batch(self):
+        despatches = [self.despatch(minutes=-2), self.despatch()]
+        with patch(SEND_MESSAGES, side_effect=[
+                1, SMTPServerDisconnected('gone')]):
+            queue_emails_job()
+        statuses = [DespatchQueue.objects.get(id=despatch_q.id).status
+                    for despatch_q in despatches]
+        self.assertEqual(statuses,
+                         [DespatchQueue.SENT, DespatchQueue.PENDING])
+
+    @override_settings(DESPATCH_MAX_ATTEMPTS=2)
+    def test_broken_despatch_does_not_hold_back_the_batch(self):
+        despatches = [self.despatch(minutes=-3), self.despatch(minutes=-2),
+                      self.despatch(minutes=-1)]
+        with patch(SEND_MESSAGES, side_effect=[
+                1, ValueError('Header values may not contain newlines'),
+                1]):
+            queue_emails_job()
+        statuses = [DespatchQueue.objects.get(id=despatch_q.id).status
+                    for despatch_q in despatches]
+        self.assertEqual(statuses, [DespatchQueue.SENT,
+                                    DespatchQueue.PENDING,
+                                    DespatchQueue.SENT])
+
+        DespatchQueue.objects.filter(id=despatches[1].id).update(
+            due_date=timezone.now())
+        with patch(SEND_MESSAGES, side_effect=ValueError('bad')) as send:
+            queue_emails_job()
+        self.assertEqual(send.call_count, 1)
+        broken = DespatchQueue.objects.get(id=despatches[1].id)
+        self.assertEqual(broken.status, DespatchQueue.FAILED)
+        self.assertEqual(broken.attempts, 2)
+        self.assertEqual(broken.last_error, 'bad')
+
+    def test_despatch_to_user_without_email_permission_is_cancelled(self):
+        despatch_q = self.despatch(
+            user=UserFactory(email_notification_permissions=False))
+        queue_emails_job()
+        despatch_q.refresh_from_db()
+        self.assertEqual(despatch_q.status, DespatchQueue.CANCELLED)
+        self.assertEqual(mail.outbox, [])
+
+    def test_stale_claimed_despatch_is_released(self):
+        despatch_q = self.despatch(status=DespatchQueue.PROCESSING)
+        DespatchQueue.objects.filter(id=despatch_q.id).update(
+            updated_at=timezone.now() - timedelta(hours=1))
+        queue_emails_job()
+        despatch_q.refresh_from_db()
+        self.assertEqual(despatch_q.status, DespatchQueue.SENT)
@@ -0,0 +1,136 @@
+import os
+from datetime import timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from healthid.apps.imports.models import ImportJob
+from healthid.apps.orders.models.suppliers import SuppliersMeta
+from healthid.apps.products.models import Product
+from healthid.tests.factories import (BusinessFactory, DispensingSizeFactory,
+                                      ProductCategoryFactory,
+                                      SuppliersFactory, UserFactory)
+from healthid.utils.csv_import.import_jobs import (queue_import_job,
+                                                   resume_import_jobs,
+                                                   run_import_job)
+
+CSV_HEADER = 'Name,Description,Brand,Manufacturer,Dispensing size,' \
+    'preferred supplier,Backup supplier,Category,Loyalty weight,' \
+    'VAT status,Global UPC\n'
+
+
+class TestImportJobs(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        business = BusinessFactory(user=(self.user, ))
+        business.save()
+        ProductCategoryFactory(name='Prescription', business=business)
+        DispensingSizeFactory(name='Tablets')
+        SuppliersMeta.objects.create(
+            supplier=SuppliersFactory(), display_name='Shadik')
+
+    def products_csv(self, *names, category='prescription'):
+        rows = ''.join(
+            f'{name},pain relief,panadol,Harmon,tablets,shadik,shadik,'
+            f'{category},1,VAT,123456789012\n' for name in names)
+        return SimpleUploadedFile('products.csv',
+                                  (CSV_HEADER + rows).encode('utf-8'))
+
+    def test_queued_job_imports_the_file_and_stores_the_outcome(self):
+        job = queue_import_job(
+            self.user, 'products', self.products_csv('Panadol', 'Aspirin'))
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, ImportJob.COMPLETED)
+        self.assertEqual(job.status_code, 201)
+        self.assertEqual(job.result['noOfProductsAdded'], 2)
+        self.assertEqual(job.rows_processed, 3)
+        self.assertEqual(job.progress, 100)
+        self.assertIsNotNone(job.finished_at)
+        self.assertFalse(os.path.exists(job.file_path))
+        self.assertEqual(Product.all_products.filter(
+            product_name__in=['Panadol', 'Aspirin']).count(), 2)
+
+    def test_invalid_file_fails_the_job_with_its_errors(self):
+        job = queue_import_job(
+            self.user, 'products',
+            self.products_csv('Panadol', category='unknown'))
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, ImportJob.FAILED)
+        self.assertEqual(job.status_code, 400)
+        self.assertIn('category', job.result['rows'][0]['1'])
+        self.assertFalse(Product.all_products.filter(
+            product_name='Panadol').exists())
+
+    def test_job_already_claimed_is_not_run_again(self):
+        job = ImportJob.objects.create(
+            user=self.user, import_type='products', file_name='products.csv',
+            file_path='missing.csv', status=ImportJob.PROCESSING)
+        run_import_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.PROCESSING)
+        self.assertIsNone(job.result)
+
+    def test_upload_endpoint_queues_a_job_reported_by_the_status_endpoint(
+            self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post(
+            reverse('handle_csv', args=['products']),
+            {'file': self.products_csv('Panadol')})
+        self.assertEqual(response.status_code, 202)
+
+        response = client.get(
+            reverse('csv_import_job', args=[response.data['jobId']]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], ImportJob.COMPLETED)
+        self.assertEqual(response.data['result']['noOfProductsAdded'], 1)
+
+        client.force_authenticate(UserFactory())
+        response = client.get(
+            reverse('csv_import_job', args=[response.data['jobId']]))
+        self.assertEqual(response.status_code, 404)
+
+    def job(self, status, age, **kwargs):
+        job = ImportJob.objects.create(
+            user=self.user, import_type='products', file_name='products.csv',
+            file_path='missing.csv', status=status, **kwargs)
+        ImportJob.objects.filter(id=job.id).update(
+            created_at=timezone.now() - age)
+        return job
+
+    @override_settings(CSV_IMPORT_TIMEOUT=3600)
+    def test_stalled_jobs_are_failed(self):
+        stalled = self.job(
+            ImportJob.PROCESSING, timedelta(hours=2),
+            started_at=timezone.now() - timedelta(hours=2))
+        running = self.job(
+            ImportJob.PROCESSING, timedelta(minutes=10),
+            started_at=timezone.now() - timedelta(minutes=10))
+
+        resume_import_jobs()
+
+        stalled.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual(stalled.status, ImportJob.FAILED)
+        self.assertIn('stopped', stalled.result['error'])
+        self.assertIsNotNone(stalled.finished_at)
+        self.assertEqual(running.status, ImportJob.PROCESSING)
+
+    @override_settings(CSV_IMPORT_TIMEOUT=3600)
+    def test_queued_jobs_without_their_file_are_not_resumed(self):
+        recent = self.job(ImportJob.QUEUED, timedelta(minutes=10))
+        lost = self.job(ImportJob.QUEUED, timedelta(hours=2))
+
+        resume_import_jobs()
+
+        recent.refresh_from_db()
+        lost.refresh_from_db()
+        self.assertEqual(recent.status, ImportJob.QUEUED)
+        self.assertEqual(lost.status, ImportJob.FAILED)
+        self.assertIn('no longer available', lost.result['error'])
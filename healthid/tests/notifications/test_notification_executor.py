@@ -0,0 +1,51 @@
+import threading
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from healthid.utils.notifications_utils.notification_executor import \
+    NotificationExecutor
+
+
+class TestNotificationExecutor(SimpleTestCase):
+
+    def test_notifications_run_off_the_submitting_thread(self):
+        executor = NotificationExecutor(2, 10, submit_timeout=1)
+        threads = []
+        for _ in range(3):
+            executor.submit(
+                lambda: threads.append(threading.current_thread()))
+        executor.shutdown()
+
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(threading.current_thread(), threads)
+        counters = executor.get_counters()
+        self.assertEqual(counters['completed'], 3)
+        self.assertEqual(counters['pending'], 0)
+        self.assertEqual(counters['ran_inline'], 0)
+
+    def test_full_queue_runs_notifications_on_the_submitting_thread(self):
+        executor = NotificationExecutor(1, 1, submit_timeout=0.01)
+        release = threading.Event()
+        threads = []
+        executor.submit(release.wait)
+        executor.submit(release.wait)
+        executor.submit(lambda: threads.append(threading.current_thread()))
+        release.set()
+        executor.shutdown()
+
+        self.assertEqual(threads, [threading.current_thread()])
+        self.assertEqual(executor.get_counters()['ran_inline'], 1)
+
+    def test_failed_notifications_are_counted(self):
+        executor = NotificationExecutor(1, 1, submit_timeout=1)
+        with patch('traceback.print_exc'):
+            executor.submit(lambda: 1 / 0)
+            executor.shutdown()
+        self.assertEqual(executor.get_counters()['failed'], 1)
+
+    def test_without_workers_notifications_run_inline(self):
+        executor = NotificationExecutor(0, 0, submit_timeout=0)
+        threads = []
+        executor.submit(lambda: threads.append(threading.current_thread()))
+        self.assertEqual(threads, [threading.current_thread()])
@@ -0,0 +1,59 @@
+from django.test import TestCase
+
+from healthid.apps.notifications.models import Notification, NotificationMeta
+from healthid.tests.factories import TimezoneFactory, UserFactory
+from healthid.utils.notifications_utils.handle_notifications import notify
+from healthid.utils.notifications_utils.pusher_transport import (
+    NOTIFICATION_CHANNEL, PUSHER_BATCH_SIZE, local_transport,
+    notification_event, publish_events)
+
+
+class TestNotificationFanOut(TestCase):
+
+    def setUp(self):
+        TimezoneFactory()
+        local_transport.clear()
+        self.addCleanup(local_transport.clear)
+
+    def test_notifications_are_created_in_bulk(self):
+        users = [UserFactory() for _ in range(40)]
+
+        with self.assertNumQueries(4):
+            notifications = notify(users=users, subject='Stock count',
+                                   body='Count the shelves',
+                                   event_name='stock_count')
+
+        self.assertEqual(len(notifications), 40)
+        self.assertEqual(Notification.objects.filter(
+            user__in=users, event_name='stock_count').count(), 40)
+        self.assertEqual(NotificationMeta.objects.filter(
+            notification__in=notifications).count(), 40)
+        self.assertEqual(notifications[0].notification_meta.body,
+                         'Count the shelves')
+
+    def test_one_event_is_published_for_all_the_users(self):
+        notify(users=[UserFactory(), UserFactory()], subject='Stock count',
+               body='Count the shelves', event_name='stock_count')
+
+        self.assertEqual(local_transport.events, [{
+            'channel': NOTIFICATION_CHANNEL,
+            'name': 'stock_count',
+            'data': {'subject': 'Stock count',
+                     'message': 'Count the shelves'},
+        }])
+
+    def test_nobody_to_notify(self):
+        self.assertEqual(notify(users=[], subject='Stock count', body=''), [])
+        self.assertEqual(local_transport.events, [])
+
+    def test_events_are_published_in_batches(self):
+        events = [notification_event('general_notification', str(number),
+                                     'body') for number in range(25)]
+        batches = []
+        local_transport.trigger_batch = batches.append
+        self.addCleanup(delattr, local_transport, 'trigger_batch')
+
+        publish_events(events)
+
+        self.assertEqual([len(batch) for batch in batches],
+                         [PUSHER_BATCH_SIZE, PUSHER_BATCH_SIZE, 5])
@@ -1,8 +1,10 @@
 from healthid.tests.base_config import BaseConfiguration
 from healthid.apps.notifications.models import Notification
+from healthid.apps.products.models import Product
 from healthid.tests.test_fixtures.batch_info import batch_info_query
 from healthid.tests.test_fixtures.notifications import (
     delete_notification, update_notification_status, view_notifications)
+from healthid.utils.product_utils.low_stock_alerts import alert_low_stock
 
 
 class NotificationTests(BaseConfiguration):
@@ -20,6 +22,8 @@ class NotificationTests(BaseConfiguration):
         self.query_with_token(
             self.access_token_master, batch_info_query.format(
                 **self.batch_data))
+        Product.objects.filter(pk=self.product.pk).update(reorder_point=50)
+        alert_low_stock()
         self.response = self.query_with_token(
             self.access_token_master, view_notifications)
         self.id = self.response['data']['notifications'][0]['id']
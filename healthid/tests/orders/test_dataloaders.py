@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+from django.test import TestCase
+
+from healthid.apps.authentication.models import Role
+from healthid.apps.business.models import UserBusiness
+from healthid.apps.orders.models.orders import SupplierOrder
+from healthid.apps.outlets.models import OutletUser
+from healthid.schema import schema
+from healthid.tests.factories import (OrderFactory, OutletFactory,
+                                      ProductBatchFactory, ProductFactory,
+                                      SuppliersFactory, UserFactory)
+from healthid.utils.app_utils.query_counter import QueryCounter
+
+orders_query = '''
+{
+    orders(pageCount: 50, pageNumber: 1) {
+        id
+        orderItems {
+            id
+            preferredSupplier { id }
+            backupSupplier { id }
+        }
+    }
+}
+'''
+
+supplier_orders_query = '''
+{
+    supplierOrdersSortedByStatus(status: "ALL", pageCount: 50,
+                                 pageNumber: 1) {
+        id
+        numberOfProducts
+        orderDetails { id }
+    }
+}
+'''
+
+
+class TestDataLoaders(TestCase):
+    fixtures = ['timezones', 'tiers', 'countries', 'role_data']
+
+    def setUp(self):
+        self.user = UserFactory(role=Role.objects.get(name='Master Admin'))
+        self.outlet = OutletFactory()
+        UserBusiness.objects.create(
+            user=self.user, business=self.outlet.business)
+        OutletUser.objects.create(
+            user=self.user, outlet=self.outlet, is_active_outlet=True)
+
+    def add_order(self, items):
+        order = OrderFactory(
+            outlet=self.outlet, business=self.outlet.business,
+            destination_outlet=self.outlet)
+        for _ in range(items):
+            supplier = SuppliersFactory()
+            product = ProductFactory(
+                preferred_supplier=supplier, backup_supplier=supplier)
+            ProductBatchFactory(
+                order=order, supplier=supplier, product=product)
+            SupplierOrder.objects.create(order=order, supplier=supplier)
+        return order
+
+    def execute(self, query):
+        with QueryCounter() as counter:
+            result = schema.execute(
+                query, context_value=SimpleNamespace(user=self.user))
+        self.assertIsNone(result.errors)
+        return result.data, counter.count
+
+    def test_orders_are_resolved_in_a_constant_number_of_queries(self):
+        self.add_order(1)
+        _, few_orders = self.execute(orders_query)
+        for _ in range(3):
+            self.add_order(3)
+        data, many_orders = self.execute(orders_query)
+
+        self.assertEqual(few_orders, many_orders)
+        self.assertEqual(len(data['orders']), 4)
+        item = data['orders'][-1]['orderItems'][0]
+        self.assertEqual(
+            item['preferredSupplier'], item['backupSupplier'])
+        self.assertIsNotNone(item['preferredSupplier'])
+
+    def test_supplier_orders_are_resolved_in_a_constant_number_of_queries(
+            self):
+        self.add_order(1)
+        _, few_orders = self.execute(supplier_orders_query)
+        for _ in range(3):
+            self.add_order(3)
+        data, many_orders = self.execute(supplier_orders_query)
+
+        self.assertEqual(few_orders, many_orders)
+        self.assertEqual(len(data['supplierOrdersSortedByStatus']), 10)
+        for supplier_order in data['supplierOrdersSortedByStatus']:
+            self.assertEqual(
+                supplier_order['numberOfProducts'],
+                len(supplier_order['orderDetails']))
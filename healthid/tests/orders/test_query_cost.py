@@ -0,0 +1,85 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from graphql import GraphQLError, parse
+
+from healthid.schema import schema
+from healthid.utils.app_utils.query_cost import check_query_cost, query_cost
+
+orders_query = '''
+query Orders($pageCount: Int) {
+    orders(pageCount: $pageCount, pageNumber: 1) {
+        id
+        orderItems {
+            id
+            ...Suppliers
+        }
+    }
+}
+
+fragment Suppliers on ProductBatchType {
+    preferredSupplier { id }
+    backupSupplier { id }
+}
+'''
+
+
+class TestQueryCost(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def cost(self, query, variables=None):
+        return query_cost(schema, parse(query), variables)
+
+    def test_lists_multiply_the_cost_of_their_fields(self):
+        # 10 orders, 50 items each, with two suppliers per item
+        self.assertEqual(
+            self.cost(orders_query, {'pageCount': 10}),
+            (10 + 10 * 50 + 10 * 50 * 2, 4))
+
+    def test_unpaginated_table_scans_are_costly(self):
+        cost, _ = self.cost('{ allSalesHistory { id } }')
+
+        self.assertEqual(cost, 5000)
+
+    def test_introspection_is_free(self):
+        self.assertEqual(self.cost('{ __schema { types { name } } }'), (0, 0))
+
+    @override_settings(GRAPHQL_MAX_QUERY_DEPTH=3)
+    def test_deep_queries_are_rejected(self):
+        with self.assertRaises(GraphQLError):
+            check_query_cost(schema, parse(orders_query), {'pageCount': 1})
+
+    @override_settings(GRAPHQL_MAX_QUERY_COST=1000)
+    def test_costly_queries_are_rejected(self):
+        with self.assertRaises(GraphQLError):
+            check_query_cost(schema, parse(orders_query), {'pageCount': 10})
+
+    @override_settings(GRAPHQL_COST_BUDGET_PER_MINUTE=2500)
+    def test_users_spend_a_budget_per_minute(self):
+        report = check_query_cost(
+            schema, parse(orders_query), {'pageCount': 1}, user_key='user')
+
+        self.assertEqual(report['remaining_budget'], 2500 - 151)
+        with self.assertRaises(GraphQLError):
+            check_query_cost(schema, parse(orders_query),
+                             {'pageCount': 20}, user_key='user')
+
+    def test_cost_is_reported_in_the_response(self):
+        response = self.client.post(
+            '/healthid/', json.dumps({'query': '{ allSalesHistory { id } }'}),
+            content_type='application/json')
+
+        self.assertEqual(
+            response.json()['extensions']['cost']['requested'], 5000)
+
+    @override_settings(GRAPHQL_MAX_QUERY_COST=1000)
+    def test_rejected_queries_are_not_run(self):
+        response = self.client.post(
+            '/healthid/', json.dumps({'query': '{ allSalesHistory { id } }'}),
+            content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('data', response.json())
@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from healthid.apps.outlets.models import OutletUser
+from healthid.apps.products.models import BatchExpiryNotice
+from healthid.tests.factories import (BatchInfoFactory, OutletFactory,
+                                      TimezoneFactory, UserFactory,
+                                      roleFactory)
+from healthid.utils.product_utils import batch_expiries
+
+today = date(2026, 1, 1)
+
+
+@patch.object(batch_expiries, 'submit_notification')
+class TestBatchExpiryScanner(TestCase):
+
+    def setUp(self):
+        TimezoneFactory()
+        self.outlet = OutletFactory()
+        self.other_outlet = OutletFactory()
+
+    def batch(self, days, outlet=None, **kwargs):
+        return BatchInfoFactory(
+            outlet=outlet or self.outlet,
+            expiry_date=today + timedelta(days=days), **kwargs)
+
+    def test_one_digest_is_sent_per_outlet(self, submit_notification):
+        first, second = self.batch(200), self.batch(10)
+        other = self.batch(-5, self.other_outlet)
+        self.batch(400)
+        self.batch(10, sold_out=True)
+
+        with self.assertNumQueries(3):
+            batch_expiries.notify_about_expired_products(today)
+
+        digests = {call[0][1]: call[0][2]
+                   for call in submit_notification.call_args_list}
+        self.assertEqual(digests, {self.outlet: [second, first],
+                                   self.other_outlet: [other]})
+        self.assertEqual(
+            dict(BatchExpiryNotice.objects.values_list(
+                'batch_id', 'window_days')),
+            {first.id: 365, second.id: 30, other.id: 0})
+
+    def test_batches_are_notified_once_per_window(self, submit_notification):
+        batch = self.batch(200)
+        batch_expiries.notify_about_expired_products(today)
+
+        self.assertEqual(
+            batch_expiries.notify_about_expired_products(today), [])
+        self.assertEqual(batch_expiries.notify_about_expired_products(
+            today + timedelta(days=120)), [batch])
+        self.assertEqual(batch.expiry_notice.window_days, 90)
+        self.assertEqual(submit_notification.call_count, 2)
+
+    @patch.object(batch_expiries, 'notify')
+    def test_master_admins_get_the_digest(self, notify, _):
+        admin = UserFactory(role=roleFactory(name='Master Admin'))
+        OutletUser.objects.create(
+            user=admin, outlet=self.outlet, is_active_outlet=True)
+        batches = [self.batch(10), self.batch(-1)]
+
+        batch_expiries.trigger_notification(self.outlet, batches, today)
+
+        kwargs = notify.call_args[1]
+        self.assertEqual(kwargs['users'], [admin])
+        self.assertIn(batches[0].batch_no, kwargs['html_body'])
+        self.assertIn('Expired', kwargs['html_body'])
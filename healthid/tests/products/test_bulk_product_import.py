@@ -0,0 +1,97 @@
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+
+from healthid.apps.orders.models.suppliers import SuppliersMeta
+from healthid.apps.products.models import Product, ProductMeta
+from healthid.tests.factories import (BusinessFactory, DispensingSizeFactory,
+                                      ProductCategoryFactory, ProductFactory,
+                                      SuppliersFactory, UserFactory)
+from healthid.utils.app_utils.query_counter import QueryCounter
+from healthid.utils.product_utils.bulk_product_import import \
+    BulkProductImport
+
+
+class TestBulkProductImport(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.business = BusinessFactory(user=(self.user, ))
+        self.business.save()
+        self.category = ProductCategoryFactory(
+            name='Prescription', business=self.business)
+        self.dispensing_size = DispensingSizeFactory(name='Tablets')
+        self.supplier = SuppliersMeta.objects.create(
+            supplier=SuppliersFactory(), display_name='Shadik')
+
+    def product_row(self, name, **columns):
+        return {
+            'name': name,
+            'description': 'pain relief',
+            'brand': 'panadol',
+            'manufacturer': 'Harmon',
+            'dispensing size': 'tablets',
+            'preferred supplier': 'shadik',
+            'backup supplier': 'SHADIK',
+            'category': 'prescription',
+            'loyalty weight': '1',
+            'vat status': 'VAT',
+            'global upc': '123456789012',
+            **columns
+        }
+
+    def test_import_creates_products_with_sku_numbers(self):
+        rows = [self.product_row(f'Product {index}') for index in range(3)]
+        result = BulkProductImport(self.user).run(rows)
+
+        self.assertEqual(result['product_count'], 3)
+        self.assertEqual(result['duplicated_products'], [])
+        self.assertGreater(result['rows_per_second'], 0)
+        product = Product.all_products.get(product_name='Product 0')
+        self.assertEqual(product.sku_number, str(product.id).zfill(6))
+        self.assertEqual(product.business_id, self.business.id)
+        self.assertEqual(product.dispensing_size_id, self.dispensing_size.id)
+        self.assertEqual(product.preferred_supplier_id,
+                         self.supplier.supplier_id)
+        self.assertTrue(product.vat_status)
+        self.assertTrue(ProductMeta.objects.filter(
+            product=product, dataKey='global_upc').exists())
+
+    def test_import_reports_duplicated_products(self):
+        ProductFactory(product_name='Existing', business=self.business)
+        rows = [self.product_row('existing'), self.product_row('New'),
+                self.product_row('new')]
+        result = BulkProductImport(self.user).run(rows)
+
+        self.assertEqual(result['product_count'], 1)
+        self.assertEqual(
+            [duplicate['row'] for duplicate in result['duplicated_products']],
+            [1, 3])
+        self.assertEqual(
+            len(result['duplicated_products'][1]['conflicts']), 1)
+
+        skipped = BulkProductImport(
+            self.user, {'existing': 'skip'}).run(rows[:1])
+        self.assertEqual(skipped['duplicated_products'], [])
+
+    def test_invalid_rows_are_reported_before_anything_is_saved(self):
+        rows = [self.product_row('Valid'),
+                self.product_row('Invalid', category='Unknown',
+                                 **{'backup supplier': 'Nobody'})]
+        with self.assertRaises(ValidationError) as error:
+            BulkProductImport(self.user).run(rows)
+
+        row_errors = error.exception.detail['rows'][0]['2']
+        self.assertIn('category', row_errors)
+        self.assertIn('backup supplier', row_errors)
+        self.assertFalse(
+            Product.all_products.filter(product_name='Valid').exists())
+
+    def test_import_query_count_does_not_grow_with_rows(self):
+        query_counts = []
+        for size in (2, 40):
+            rows = [self.product_row(f'Product {size}-{index}')
+                    for index in range(size)]
+            with QueryCounter() as counter:
+                BulkProductImport(self.user).run(rows)
+            query_counts.append(counter.count)
+        self.assertEqual(query_counts[0], query_counts[1])
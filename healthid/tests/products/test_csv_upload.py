@@ -49,7 +49,8 @@ class TestCsvUpload(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['products']), {'file': file},
             **self.auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='products')
+        response = self.import_job_response(
+            view(request, param='products'))
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertIn('message', response.data)
         self.assertIn('noOfProductsAdded', response.data)
@@ -68,7 +69,8 @@ class TestCsvUpload(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['products']), {'file': file},
             **self.auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='retail_pro_products')
+        response = self.import_job_response(
+            view(request, param='retail_pro_products'))
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertIn('message', response.data)
         self.assertIn('noOfProductsAdded', response.data)
@@ -91,7 +93,8 @@ class TestCsvUpload(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['products']), {'file': file},
             **self.auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='quick_books_products')
+        response = self.import_job_response(
+            view(request, param='quick_books_products'))
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertIn('message', response.data)
@@ -111,7 +114,8 @@ class TestCsvUpload(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['products']), {'file': file},
             **self.auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='products')
+        response = self.import_job_response(
+            view(request, param='products'))
         self.assertEqual(response.status_code, 400)
         self.assertIn('rows', response.data)
         self.assertIn('columns', response.data)
@@ -137,7 +141,8 @@ class TestCsvUpload(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['batch_info']), {'file': file},
             **self.auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='batch_info')
+        response = self.import_job_response(
+            view(request, param='batch_info'))
         self.assertEqual(response.status_code, 201)
         self.assertEqual(
             response.data['success'],
@@ -160,7 +165,8 @@ class TestCsvUpload(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['batch_info']), {'file': file},
             **self.auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='batch_info')
+        response = self.import_job_response(
+            view(request, param='batch_info'))
 
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.data[0],
@@ -183,7 +189,8 @@ class TestCsvUpload(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['batch_info']), {'file': file},
             **self.auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='batch_info')
+        response = self.import_job_response(
+            view(request, param='batch_info'))
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.data[0],
                          PRODUCTS_ERROR_RESPONSES["batch_bool_error"]
@@ -205,7 +212,8 @@ class TestCsvUpload(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['batch_info']), {'file': file},
             **self.auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='batch_info')
+        response = self.import_job_response(
+            view(request, param='batch_info'))
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.data[0],
                          PRODUCTS_ERROR_RESPONSES["batch_expiry_error"].format
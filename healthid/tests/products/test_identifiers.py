@@ -0,0 +1,81 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from healthid.apps.orders.models.suppliers import Suppliers
+from healthid.apps.products.models import Product
+from healthid.tests.factories import (BatchInfoFactory, ProductFactory,
+                                      ReceiptFactory, SuppliersFactory,
+                                      TierFactory, TimezoneFactory,
+                                      UserFactory)
+from healthid.utils.app_utils.identifiers import assign_identifiers
+
+
+class TestIdentifiers(TestCase):
+
+    def setUp(self):
+        TimezoneFactory()
+
+    def product(self, template, name):
+        return Product(
+            product_name=name, description=name,
+            product_category_id=template.product_category_id,
+            dispensing_size_id=template.dispensing_size_id,
+            preferred_supplier_id=template.preferred_supplier_id,
+            backup_supplier_id=template.backup_supplier_id)
+
+    def writes(self, queries, table):
+        return [query['sql'].split()[0] for query in queries
+                if query['sql'].startswith((f'INSERT INTO "{table}"',
+                                            f'UPDATE "{table}"'))
+                and 'SET "search_vector"' not in query['sql']]
+
+    def test_products_are_numbered_in_a_single_write(self):
+        product = self.product(ProductFactory(), 'Single')
+
+        with CaptureQueriesContext(connection) as queries:
+            product.save()
+
+        self.assertEqual(self.writes(queries, 'products_product'),
+                         ['INSERT'])
+        product.refresh_from_db()
+        self.assertEqual(product.sku_number, str(product.id).zfill(6))
+
+    def test_bulk_created_products_are_numbered(self):
+        template = ProductFactory()
+        products = [self.product(template, f'Bulk {number}')
+                    for number in range(3)]
+
+        with self.assertNumQueries(1):
+            assign_identifiers(products)
+        Product.all_products.bulk_create(products)
+
+        ids = [product.id for product in products]
+        self.assertEqual(ids, list(range(ids[0], ids[0] + 3)))
+        self.assertEqual(
+            list(Product.all_objects.filter(id__in=ids).order_by(
+                'id').values_list('sku_number', flat=True)),
+            [str(product_id).zfill(6) for product_id in ids])
+
+    def test_suppliers_are_numbered_from_a_sequence(self):
+        first, second = SuppliersFactory(), SuppliersFactory()
+
+        self.assertRegex(first.supplier_id, r'^S-SUP\d{4,}$')
+        self.assertNotEqual(first.supplier_id, second.supplier_id)
+        suppliers = [Suppliers(name='Bulk', tier=TierFactory(),
+                               user=UserFactory()) for _ in range(2)]
+        with self.assertNumQueries(1):
+            assign_identifiers(suppliers)
+        self.assertEqual(len({supplier.supplier_id
+                              for supplier in suppliers}), 2)
+
+    def test_batches_and_receipts_are_numbered_when_inserted(self):
+        with CaptureQueriesContext(connection) as queries:
+            batch = BatchInfoFactory()
+        receipt = ReceiptFactory()
+
+        self.assertEqual(self.writes(queries, 'products_batchinfo'),
+                         ['INSERT'])
+        self.assertTrue(batch.batch_no.startswith('BN'))
+        self.assertRegex(receipt.receipt_no,
+                         rf'^RN\d{{4,}}-{receipt.sale_id}$')
@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+
+from healthid.apps.orders.models.orders import ProductBatch
+from healthid.apps.products.models import Product, ProductInventory
+from healthid.tests.factories import (ProductBatchFactory, ProductFactory,
+                                      TimezoneFactory)
+from healthid.utils.app_utils.query_counter import QueryCounter
+from healthid.utils.product_utils.inventory_ledger import reconcile_inventory
+
+
+class TestInventoryLedger(TestCase):
+
+    def setUp(self):
+        TimezoneFactory()
+        self.product = ProductFactory(reorder_max=100)
+        self.in_stock = self.create_batch(quantity=10, unit_cost=100)
+        self.pending = self.create_batch(
+            quantity=20, unit_cost=300, status=ProductBatch.PENDING_DELIVERY)
+        self.expired = self.create_batch(
+            quantity=5, unit_cost=200,
+            expiry_date=date.today() - timedelta(days=3))
+
+    def create_batch(self, product=None, **kwargs):
+        kwargs.setdefault('status', ProductBatch.IN_STOCK)
+        return ProductBatchFactory(
+            product=product or self.product, order=None, **kwargs)
+
+    def assert_no_drift(self):
+        report = reconcile_inventory([self.product.id], fix=False)
+        self.assertEqual(report['drift'], [])
+
+    def test_counters_follow_batch_writes(self):
+        product = Product.all_products.get(id=self.product.id)
+        self.assertEqual(product.quantity_in_stock, 15)
+        self.assertEqual(product.autofill_quantity, 65)
+        self.assertEqual(product.avarage_unit_cost, 150)
+        self.assert_no_drift()
+
+        self.pending.status = ProductBatch.IN_STOCK
+        self.pending.save()
+        self.assert_no_drift()
+        self.pending.unit_cost = 50
+        self.pending.save()
+        self.assert_no_drift()
+        self.in_stock.delete()
+        self.assert_no_drift()
+        self.expired.hard_delete()
+        self.assert_no_drift()
+
+    def test_batch_loaded_with_only_is_recounted(self):
+        batch = ProductBatch.objects.only(
+            'id', 'quantity', 'product_id').get(id=self.in_stock.id)
+        batch.quantity = 3
+        batch.save()
+        self.assert_no_drift()
+        self.assertEqual(Product.all_products.get(
+            id=self.product.id).quantity_in_stock, 8)
+
+    def test_reconcile_repairs_drift(self):
+        ProductInventory.objects.filter(product=self.product).update(
+            in_stock_quantity=999)
+        report = reconcile_inventory([self.product.id])
+        self.assertEqual(report['checked'], 1)
+        self.assertIn(
+            (self.product.id, 'in_stock_quantity', 999, 15), report['drift'])
+        self.assert_no_drift()
+
+    def test_batch_save_cost_does_not_grow_with_batches(self):
+        crowded_product = ProductFactory()
+        for _ in range(30):
+            self.create_batch(product=crowded_product, quantity=10)
+        query_counts = []
+        for product in (self.product, crowded_product):
+            batch = ProductBatch.objects.filter(product=product).first()
+            batch.quantity = 1
+            with QueryCounter() as counter:
+                batch.save()
+            query_counts.append(counter.count)
+        self.assertEqual(query_counts[0], query_counts[1])
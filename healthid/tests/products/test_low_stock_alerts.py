@@ -0,0 +1,85 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from healthid.apps.outlets.models import OutletUser
+from healthid.apps.preference.models import OutletPreference
+from healthid.apps.products.models import LowStockAlert
+from healthid.apps.sales.models import ProductSalesVelocity
+from healthid.tests.factories import (OutletFactory, ProductFactory,
+                                      TimezoneFactory, UserFactory)
+from healthid.utils.product_utils import low_stock_alerts
+
+now = timezone.now()
+
+
+@override_settings(LOW_STOCK_ALERT_WINDOW=3600)
+@patch.object(low_stock_alerts, 'submit_notification')
+class TestLowStockAlerts(TestCase):
+
+    def setUp(self):
+        TimezoneFactory()
+        self.outlet = OutletFactory()
+        OutletPreference.objects.filter(outlet=self.outlet).update(
+            reorder_point=4)
+
+    def product(self, quantity, **kwargs):
+        return ProductFactory(business=self.outlet.business,
+                              quantity_in_stock=quantity, **kwargs)
+
+    def alerted(self, at=now):
+        alerted = low_stock_alerts.alert_low_stock(at)
+        return alerted.get(self.outlet.id, [])
+
+    def test_thresholds_come_from_the_outlet_and_velocities(
+            self, submit_notification):
+        own_point = self.product(2, reorder_point=2)
+        outlet_point = self.product(4, reorder_point=0)
+        self.product(5, reorder_point=0)
+        fast = self.product(20, reorder_point=0)
+        ProductSalesVelocity.objects.create(
+            product=fast, outlet=self.outlet, weekly_sales=[6],
+            velocity=6, window_end=now.date())
+
+        self.assertCountEqual(self.alerted(),
+                              [own_point, outlet_point, fast])
+        submit_notification.assert_called_once()
+
+    def test_products_are_alerted_about_once_per_window(
+            self, submit_notification):
+        product = self.product(1)
+
+        self.assertEqual(self.alerted(), [product])
+        self.assertEqual(self.alerted(now + timedelta(minutes=30)), [])
+        self.assertEqual(self.alerted(now + timedelta(hours=2)), [product])
+        self.assertEqual(submit_notification.call_count, 2)
+
+    def test_restocked_products_are_alerted_about_again(
+            self, submit_notification):
+        product = self.product(1)
+        self.alerted()
+
+        product.quantity_in_stock = 100
+        product.save()
+        self.assertEqual(self.alerted(now + timedelta(minutes=10)), [])
+        self.assertFalse(LowStockAlert.objects.exists())
+
+        product.quantity_in_stock = 0
+        product.save()
+        self.assertEqual(self.alerted(now + timedelta(minutes=20)), [product])
+
+    @patch.object(low_stock_alerts, 'notify')
+    def test_outlet_users_get_one_digest(self, notify, _):
+        user = UserFactory()
+        OutletUser.objects.create(
+            user=user, outlet=self.outlet, is_active_outlet=True)
+        products = [self.product(1), self.product(3)]
+
+        low_stock_alerts.trigger_low_stock_alert(self.outlet, products)
+
+        kwargs = notify.call_args[1]
+        self.assertEqual(kwargs['users'], [user])
+        for product in products:
+            self.assertIn(product.product_name, kwargs['body'])
@@ -0,0 +1,57 @@
+from django.test import TestCase
+
+from healthid.apps.products.models import Product, ProductMeta
+from healthid.tests.factories import (BusinessFactory, ProductFactory,
+                                      SuppliersFactory, TimezoneFactory)
+from healthid.utils.product_utils.product_search import search_products
+
+
+class TestProductSearch(TestCase):
+
+    def setUp(self):
+        TimezoneFactory()
+        self.business = BusinessFactory()
+        self.panadol = self.add_product(
+            'Panadol Extra', description='pain relief tablets')
+        self.aspirin = self.add_product(
+            'Aspirin', description='panadol alternative')
+
+    def add_product(self, product_name, **kwargs):
+        return ProductFactory(
+            product_name=product_name, business=self.business, **kwargs)
+
+    def search(self, search_term):
+        return list(search_products(
+            Product.all_products.filter(business=self.business),
+            search_term))
+
+    def test_words_are_matched_as_prefixes(self):
+        self.assertEqual(self.search('pana ext'), [self.panadol])
+
+    def test_product_names_rank_above_descriptions(self):
+        self.assertEqual(self.search('panadol'), [self.panadol, self.aspirin])
+
+    def test_sku_number_and_upc_are_matched_exactly(self):
+        ProductMeta.objects.create(
+            product=self.aspirin, dataKey='global_upc',
+            dataValue='5012345678900')
+        sku_number = Product.all_products.get(pk=self.panadol.pk).sku_number
+
+        self.assertEqual(self.search(sku_number), [self.panadol])
+        self.assertEqual(self.search('5012345678900'), [self.aspirin])
+
+    def test_renamed_supplier_is_searchable(self):
+        supplier = SuppliersFactory()
+        self.panadol.preferred_supplier = supplier
+        self.panadol.save()
+        supplier.name = 'Dawa Distributors'
+        supplier.save()
+
+        self.assertEqual(self.search('dawa'), [self.panadol])
+
+    def test_renamed_category_is_searchable(self):
+        category = self.aspirin.product_category
+        category.name = 'Analgesics'
+        category.save()
+
+        self.assertEqual(self.search('analg'), [self.aspirin])
@@ -0,0 +1,89 @@
+import time
+from unittest.mock import Mock
+
+from django.db import connection
+from django.test import TestCase
+
+from healthid.jobs import main_job
+from healthid.jobs.leader import SCHEDULER_LOCK_ID, SchedulerLeader
+
+
+class TestSchedulerLeader(TestCase):
+
+    def setUp(self):
+        self.scheduler = Mock(state=0)
+        self.add_jobs = Mock()
+        self.leader = SchedulerLeader(self.scheduler, self.add_jobs, 1)
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock_all()')
+
+    def other_process(self):
+        """
+        Database session of another scheduler process
+        """
+        other = connection.get_new_connection(
+            connection.get_connection_params())
+        other.autocommit = True
+        self.addCleanup(other.close)
+        with other.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_lock(%s)', [SCHEDULER_LOCK_ID])
+        return other
+
+    def check_until_leading(self):
+        # the lock of a closed session is released shortly after
+        deadline = time.monotonic() + 5
+        self.leader.check()
+        while not self.leader.leading and time.monotonic() < deadline:
+            time.sleep(0.05)
+            self.leader.check()
+
+    def test_the_process_taking_the_lock_runs_the_jobs(self):
+        self.leader.check()
+
+        self.assertTrue(self.leader.leading)
+        self.add_jobs.assert_called_once_with()
+        self.scheduler.start.assert_called_once_with()
+
+    def test_standby_takes_over_when_the_leader_dies(self):
+        other = self.other_process()
+        self.leader.check()
+        self.assertFalse(self.leader.leading)
+
+        other.close()
+        self.check_until_leading()
+
+        self.assertTrue(self.leader.leading)
+        self.scheduler.start.assert_called_once_with()
+
+    def test_leader_stands_by_when_it_loses_the_lock(self):
+        self.leader.check()
+        self.scheduler.state = 1
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(%s)',
+                           [SCHEDULER_LOCK_ID])
+        other = self.other_process()
+
+        self.leader.check()
+        self.assertFalse(self.leader.leading)
+        self.scheduler.pause.assert_called_once_with()
+
+        other.close()
+        self.check_until_leading()
+        self.scheduler.resume.assert_called_once_with()
+
+
+class TestScheduledJobs(TestCase):
+
+    def tearDown(self):
+        main_job.scheduler.remove_all_jobs()
+
+    def test_jobs_are_added_once_with_their_ids(self):
+        main_job.add_jobs()
+
+        job_ids = [job.id for job in main_job.scheduler.get_jobs()]
+        self.assertEqual(len(job_ids), len(set(job_ids)))
+        self.assertIn('healthid.utils.product_utils.product_expiry.'
+                      'check_for_expiry_products', job_ids)
+        self.assertFalse(main_job.scheduler.running)
@@ -0,0 +1,64 @@
+import csv
+import io
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from healthid.apps.products.models import Product
+from healthid.tests.factories import ProductFactory, UserFactory
+from healthid.utils.app_utils.query_counter import QueryCounter
+from healthid.utils.product_utils.handle_csv_export import handle_csv_export
+
+
+class TestStreamCsvExport(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(UserFactory())
+        self.url = reverse('export_csv', kwargs={'param': 'products'})
+
+    def exported_rows(self, response):
+        content = b''.join(response.streaming_content).decode('utf-8')
+        return list(csv.DictReader(io.StringIO(content)))
+
+    def test_export_streams_products_with_their_relations(self):
+        product = ProductFactory(vat_status=True, quantity_in_stock=7)
+        product.tags.add('pain', 'fever')
+        ProductFactory(is_approved=False)
+
+        response = self.client.post(self.url, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = self.exported_rows(response)
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['PRODUCT NAME'], product.product_name)
+        self.assertEqual(rows[0]['PRODUCT CATEGORY'],
+                         product.product_category.name)
+        self.assertEqual(rows[0]['PREFERRED SUPPLIER'],
+                         product.preferred_supplier.name)
+        self.assertEqual(rows[0]['VAT STATUS'], 'VAT')
+        self.assertEqual(rows[0]['QUANTITY'], '7')
+        self.assertEqual(sorted(rows[0]['TAGS'].split(', ')),
+                         ['fever', 'pain'])
+
+    def test_export_includes_the_requested_fields_only(self):
+        ProductFactory()
+        response = self.client.post(
+            self.url, {'product_name': True, 'brand': True}, format='json')
+        rows = self.exported_rows(response)
+        self.assertEqual(list(rows[0]), ['PRODUCT NAME', 'BRAND'])
+
+    def test_export_query_count_does_not_grow_with_products(self):
+        query_counts = []
+        for size in (2, 20):
+            for _ in range(size):
+                ProductFactory().tags.add('pain')
+            products = Product.objects.filter(is_approved=True)
+            with QueryCounter() as counter:
+                list(handle_csv_export.stream_products(
+                    products, ['product_name', 'product_category', 'tags'],
+                    chunk_size=50))
+            query_counts.append(counter.count)
+        self.assertEqual(query_counts[0], query_counts[1])
@@ -0,0 +1,49 @@
+from django.test import TestCase
+
+from healthid.tests.factories import ReceiptFactory, TimezoneFactory
+from healthid.utils.receipts.barcode import render_barcode
+
+
+class TestReceiptBarcode(TestCase):
+
+    def setUp(self):
+        TimezoneFactory()
+
+    def test_receipts_get_sequential_upc_codes(self):
+        first, second = ReceiptFactory(), ReceiptFactory()
+
+        self.assertEqual(len(f'{first.scanned_number:012d}'), 12)
+        self.assertEqual(second.scanned_number // 10,
+                         first.scanned_number // 10 + 1)
+        self.assertTrue(first.barcode_image_url.endswith(
+            f'/healthid/receipts/barcode/{first.scanned_number}.svg'))
+
+    def test_saving_a_receipt_keeps_its_numbers(self):
+        receipt = ReceiptFactory()
+        numbers = receipt.receipt_no, receipt.scanned_number
+
+        receipt.save()
+        receipt.refresh_from_db()
+
+        self.assertEqual((receipt.receipt_no, receipt.scanned_number),
+                         numbers)
+
+    def test_barcodes_are_rendered_on_demand(self):
+        receipt = ReceiptFactory()
+        render_barcode.cache_clear()
+
+        response = self.client.get(receipt.barcode_image_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertIn(b'<svg', response.content)
+        self.client.get(receipt.barcode_image_url)
+        self.assertEqual(render_barcode.cache_info().hits, 1)
+
+    def test_invalid_barcodes_are_not_found(self):
+        number = ReceiptFactory().scanned_number
+        wrong_check_digit = number // 10 * 10 + (number + 1) % 10
+
+        for url in (f'/healthid/receipts/barcode/{wrong_check_digit}.svg',
+                    f'/healthid/receipts/barcode/{number}.gif'):
+            self.assertEqual(self.client.get(url).status_code, 404)
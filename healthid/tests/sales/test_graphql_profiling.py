@@ -0,0 +1,77 @@
+import json
+
+from django.test import TestCase, override_settings
+
+from healthid.apps.sales.models import Payments
+from healthid.tests.factories import (OutletFactory, SaleFactory,
+                                      TimezoneFactory, UserFactory)
+from healthid.utils.app_utils import profiling
+
+sales_history_query = '''
+query SalesHistory {{
+    outletSalesHistory(outletId: {outlet_id}, first: 10) {{
+        id
+        splitPayments {{ amount }}
+    }}
+}}
+'''
+
+
+class TestGraphQLProfiling(TestCase):
+
+    def setUp(self):
+        profiling._profiles.clear()
+        TimezoneFactory()
+        self.outlet = OutletFactory()
+        self.user = UserFactory()
+        for _ in range(3):
+            Payments.objects.create(
+                sale=SaleFactory(outlet=self.outlet), amount=10)
+        self.client.force_login(
+            self.user, 'django.contrib.auth.backends.ModelBackend')
+
+    def query(self):
+        return self.client.post(
+            '/healthid/', json.dumps({'query': sales_history_query.format(
+                outlet_id=self.outlet.id)}),
+            content_type='application/json')
+
+    @override_settings(GRAPHQL_PROFILE_SAMPLE_RATE=1)
+    def test_sampled_operations_are_profiled(self):
+        response = self.query()
+        profile, = profiling.recent_profiles()
+
+        self.assertEqual(profile['operation'], 'SalesHistory')
+        self.assertEqual(profile['operation_type'], 'query')
+        self.assertEqual(profile['response_bytes'], len(response.content))
+        self.assertGreater(profile['queries'], 0)
+        fields = {field['field']: field for field in profile['fields']}
+        self.assertEqual(fields['SaleType.splitPayments']['calls'], 3)
+
+    def test_repeated_queries_are_reported(self):
+        operation = profiling.OperationProfile(sampled=True)
+        operation.operation_type = 'query'
+        operation.queries.update(['SELECT 1', 'SELECT 1', 'SELECT 2'])
+
+        profile = profiling.record_profile(operation, 0)
+
+        self.assertEqual(profile['queries'], 3)
+        self.assertEqual(profile['duplicate_queries'],
+                         [{'sql': 'SELECT 1', 'count': 2}])
+
+    @override_settings(GRAPHQL_SLOW_OPERATION_MS=60000)
+    def test_unsampled_fast_operations_are_not_recorded(self):
+        self.query()
+
+        self.assertEqual(profiling.recent_profiles(), [])
+
+    def test_profiles_are_listed_for_staff_only(self):
+        with override_settings(GRAPHQL_PROFILE_SAMPLE_RATE=1):
+            self.query()
+
+        self.assertEqual(
+            self.client.get('/healthid/profiles').status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        profiles = self.client.get('/healthid/profiles').json()
+        self.assertEqual(profiles[0]['operation'], 'SalesHistory')
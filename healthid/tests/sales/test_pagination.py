@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.test import TestCase, override_settings
+
+from healthid.apps.sales.models import Sale
+from healthid.tests.factories import (OutletFactory, SaleFactory,
+                                      TimezoneFactory)
+from healthid.utils.app_utils.pagination import (pagination_query,
+                                                 store_pagination,
+                                                 total_count, total_pages)
+from healthid.utils.app_utils.query_counter import QueryCounter
+
+
+class TestPagination(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        TimezoneFactory()
+        outlet = OutletFactory()
+        for _ in range(5):
+            SaleFactory(outlet=outlet)
+        self.sales = Sale.objects.order_by('id')
+
+    def test_rows_are_counted_without_being_loaded(self):
+        with QueryCounter() as counter:
+            page, num_pages, count = pagination_query(self.sales, 2, 2)
+            sales = list(page)
+
+        self.assertEqual((len(sales), num_pages, count), (2, 3, 5))
+        self.assertEqual(counter.count, 2)
+
+    @override_settings(PAGINATION_COUNT_CACHE_TIMEOUT=60)
+    def test_count_is_cached(self):
+        pagination_query(self.sales, 2, 1)
+        SaleFactory(outlet=self.sales[0].outlet)
+        with QueryCounter() as counter:
+            count = pagination_query(self.sales, 2, 3).count
+
+        self.assertEqual(count, 5)
+        self.assertEqual(counter.count, 0)
+
+    @override_settings(PAGINATION_ESTIMATE_THRESHOLD=1)
+    def test_large_results_are_estimated(self):
+        with QueryCounter() as counter:
+            count = pagination_query(self.sales, 2, 1).count
+
+        self.assertIsInstance(count, int)
+        self.assertEqual(counter.count, 1)
+
+    def test_pagination_is_kept_per_request(self):
+        info = SimpleNamespace(context=HttpRequest())
+        other_info = SimpleNamespace(context=HttpRequest())
+        store_pagination(info, pagination_query(self.sales, 2, 1))
+
+        self.assertEqual((total_pages(info), total_count(info)), (3, 5))
+        self.assertEqual(
+            (total_pages(other_info), total_count(other_info)), (0, 0))
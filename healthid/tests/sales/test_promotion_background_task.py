@@ -4,9 +4,11 @@ from django.core.management import call_command
 from healthid.utils.product_utils.product_expiry import \
     check_for_expiry_products
 from healthid.apps.products.models import BatchInfo
+from healthid.apps.sales.models import Promotion
 from datetime import datetime, timedelta
 
 
+@patch('healthid.utils.product_utils.product_expiry.notify')
 class TestBackgroundTasks(TestCase):
     def setUp(self):
         call_command('loaddata', 'healthid/fixtures/role_data')
@@ -19,20 +21,41 @@ class TestBackgroundTasks(TestCase):
             batch.expiry_date = datetime.today().date() + timedelta(days=days)
             batch.save()
 
-    @patch('healthid.utils.product_utils.product_expiry.create_promotion')
-    def test_create_promotion_for_six_months_near_expiry_products(self, mock):
+    def promoted_products(self, title):
+        promotion = Promotion.objects.get(title=title)
+        return set(promotion.products.values_list('id', flat=True))
+
+    def test_create_promotion_for_six_months_near_expiry_products(self, _):
         self.change_batch_expiry_date(170)
-        check_for_expiry_products()
-        self.assertEqual(mock.call_count, 1)
+        changes = check_for_expiry_products()
+        self.assertEqual(changes, {6: 3})
+        self.assertEqual(
+            self.promoted_products('Expire in 6 months 1'), {1, 2, 3})
 
-    @patch('healthid.utils.product_utils.product_expiry.create_promotion')
-    def test_create_promotion_for_three_month_near_expiry_products(self, mock):
+    def test_create_promotion_for_three_month_near_expiry_products(self, _):
         self.change_batch_expiry_date(70)
-        check_for_expiry_products()
-        self.assertEqual(mock.call_count, 1)
+        self.assertEqual(check_for_expiry_products(), {3: 3})
 
-    @patch('healthid.utils.product_utils.product_expiry.create_promotion')
-    def test_create_promotion_for_one_month_near_expiry_products(self, mock):
+    def test_create_promotion_for_one_month_near_expiry_products(self, _):
         self.change_batch_expiry_date(25)
+        self.assertEqual(check_for_expiry_products(), {1: 3})
+        promotion = Promotion.objects.get(title='Expire in 1 month 1')
+        self.assertEqual(promotion.discount, 60)
+
+    def test_only_products_changing_tier_are_added(self, notify):
+        self.change_batch_expiry_date(170)
         check_for_expiry_products()
-        self.assertEqual(mock.call_count, 1)
+        self.assertEqual(check_for_expiry_products(), {})
+
+        three_months = datetime.today().date() + timedelta(days=70)
+        BatchInfo.objects.filter(product_id=1).update(
+            expiry_date=three_months)
+        self.assertEqual(check_for_expiry_products(), {3: 1})
+        BatchInfo.objects.filter(product_id=2).update(
+            expiry_date=three_months)
+        with self.assertNumQueries(8):
+            changes = check_for_expiry_products()
+        self.assertEqual(changes, {3: 1})
+        self.assertEqual(
+            self.promoted_products('Expire in 3 months 1'), {1, 2})
+        self.assertEqual(notify.call_count, 3)
@@ -9,6 +9,8 @@ from healthid.tests.test_fixtures.sales import (create_sale,
                                                 query_sale_history,
                                                 all_sales_history_query,
                                                 create_sale_with_empty_batches,
+                                                create_sale_with_query_count,
+                                                sold_batch,
                                                 query_team_report,
                                                 create_sales_performance_query,
                                                 get_sales_performance_outlet_filter,
@@ -313,3 +315,22 @@ class TestCreateSale(BaseConfiguration):
         self.assertEqual(response['data']['teamReport']
                          [0]['sale']['salesPerson']['email'], self.login_user['email'])
 
+    def basket_query_count(self, basket_size):
+        batches = []
+        for _ in range(basket_size):
+            product_batch = ProductBatchFactory(
+                product=self.product_2, quantity=100, status='IN_STOCK')
+            batches.append(sold_batch.format(
+                batch_id=product_batch.id, quantity=1, discount=0,
+                price=self.sales_data['price']))
+        sales_data = dict(self.sales_data, batches=','.join(batches))
+        response = self.query_with_token(
+            self.access_token,
+            create_sale_with_query_count.format(**sales_data))
+        self.assertNotIn("errors", response)
+        return response['data']['createSale']['queryCount']
+
+    def test_checkout_query_count_is_flat(self):
+        self.create_receipt_template()
+        self.assertEqual(
+            self.basket_query_count(1), self.basket_query_count(10))
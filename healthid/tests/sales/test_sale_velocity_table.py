@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from healthid.apps.sales.models import (DailyProductSales,
+                                        ProductSalesVelocity, SaleDetail)
+from healthid.apps.sales.sales_velocity import SalesVelocity
+from healthid.tests.factories import (OutletFactory, ProductFactory,
+                                      SaleFactory, TimezoneFactory)
+from healthid.utils.app_utils.query_counter import QueryCounter
+from healthid.utils.orders_utils.inventory_notification import \
+    product_below_stock
+from healthid.utils.sales_utils.sale_velocity import (
+    VELOCITY_WEEKS, calculate_sale_velocity)
+
+
+class TestSaleVelocityTable(TestCase):
+
+    def setUp(self):
+        TimezoneFactory()
+        self.outlet = OutletFactory()
+        self.product = ProductFactory()
+        self.today = timezone.localdate()
+
+    def sell(self, product, quantity, days_ago=0, outlet=None):
+        sale_detail = SaleDetail.objects.create(
+            product=product, sale=SaleFactory(outlet=outlet or self.outlet),
+            quantity=quantity, discount=0, price=10)
+        SaleDetail.objects.filter(id=sale_detail.id).update(
+            created_at=timezone.now() - timedelta(days=days_ago))
+        return sale_detail
+
+    def test_velocity_averages_the_weeks_with_sales(self):
+        self.sell(self.product, 4)
+        self.sell(self.product, 2, days_ago=1)
+        self.sell(self.product, 3, days_ago=15)
+        self.sell(self.product, 50, days_ago=40)
+
+        calculate_sale_velocity()
+
+        velocity = ProductSalesVelocity.objects.get(
+            product=self.product, outlet=self.outlet)
+        self.assertEqual(velocity.weekly_sales, [6, 0, 3, 0])
+        self.assertEqual(velocity.velocity, 4.5)
+        self.assertEqual(velocity.window_end, self.today)
+        self.assertEqual(
+            SalesVelocity(self.product.id, self.outlet.id).weekly_sales(2),
+            [6, 0])
+
+    def test_weekly_sales_are_limited_to_the_stored_weeks(self):
+        sales_velocity = SalesVelocity(self.product.id, self.outlet.id)
+        self.assertEqual(sales_velocity.weekly_sales(VELOCITY_WEEKS),
+                         [0] * VELOCITY_WEEKS)
+        with self.assertRaises(ValueError):
+            sales_velocity.weekly_sales(VELOCITY_WEEKS + 1)
+        with self.assertRaises(ValueError):
+            sales_velocity.weekly_sales(0)
+
+    def test_only_days_since_the_last_run_are_aggregated_again(self):
+        old_sale = self.sell(self.product, 3, days_ago=3)
+        calculate_sale_velocity()
+        SaleDetail.objects.filter(id=old_sale.id).update(quantity=30)
+        self.sell(self.product, 1)
+
+        calculate_sale_velocity()
+        self.assertEqual(ProductSalesVelocity.objects.get(
+            product=self.product).weekly_sales[0], 4)
+
+        calculate_sale_velocity(rebuild=True)
+        self.assertEqual(ProductSalesVelocity.objects.get(
+            product=self.product).weekly_sales[0], 31)
+
+    def test_products_without_sales_in_the_window_are_dropped(self):
+        self.sell(self.product, 3)
+        calculate_sale_velocity()
+        calculate_sale_velocity(self.today + timedelta(weeks=5))
+        self.assertFalse(ProductSalesVelocity.objects.exists())
+        self.assertFalse(DailyProductSales.objects.exists())
+
+    def test_products_below_stock_use_the_stored_velocity(self):
+        fast_product = ProductFactory(reorder_point=10, reorder_max=20)
+        slow_product = ProductFactory(reorder_point=10, reorder_max=20)
+        for days_ago in (0, 7):
+            self.sell(fast_product, 5, days_ago)
+        fast_product.quantity_in_stock = slow_product.quantity_in_stock = 15
+        calculate_sale_velocity()
+
+        products = product_below_stock(
+            self.outlet, [fast_product, slow_product], is_cron_job=False)
+        self.assertEqual([product.id for product in products],
+                         [fast_product.id])
+        self.assertEqual(products[0].suggested_quantity, 85)
+
+    def test_query_count_does_not_grow_with_products(self):
+        query_counts = []
+        for size in (2, 10):
+            for index in range(size):
+                self.sell(ProductFactory(), 2, days_ago=index % 20)
+            calculate_sale_velocity(rebuild=True)
+            with QueryCounter() as counter:
+                calculate_sale_velocity(rebuild=True)
+            query_counts.append(counter.count)
+        self.assertEqual(query_counts[0], query_counts[1])
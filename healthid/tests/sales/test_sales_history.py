@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from graphql import GraphQLError
+
+from healthid.apps.sales.models import Payments, Sale, SaleDetail
+from healthid.tests.factories import (OutletFactory, ProductFactory,
+                                      SaleFactory, TimezoneFactory)
+from healthid.utils.app_utils.query_counter import QueryCounter
+from healthid.utils.app_utils.pagination import encode_cursor, keyset_page
+from healthid.utils.sales_utils.sales_history import sales_history
+
+
+class TestSalesHistory(TestCase):
+
+    def setUp(self):
+        TimezoneFactory()
+        self.outlet = OutletFactory()
+        self.now = timezone.now()
+
+    def sell(self, days_ago=0, products=(), notes=''):
+        sale = SaleFactory(outlet=self.outlet, notes=notes)
+        Sale.objects.filter(id=sale.id).update(
+            created_at=self.now - timedelta(days=days_ago))
+        for product in products:
+            SaleDetail.objects.create(
+                product=product, sale=sale, quantity=1, discount=0,
+                price=10)
+        Payments.objects.create(sale=sale, amount=10)
+        return sale
+
+    def test_search_returns_a_sale_once(self):
+        product = ProductFactory(product_name='Panadol Extra')
+        other = ProductFactory(product_name='Panadol Night')
+        sale = self.sell(products=[product, other])
+        self.sell(products=[ProductFactory(product_name='Aspirin')])
+        self.sell(notes='panadol out of stock')
+
+        sales = sales_history(self.outlet.id, search='panadol')
+
+        self.assertEqual(len(sales), 2)
+        self.assertIn(sale, sales)
+
+    def test_dates_are_filtered_in_the_database(self):
+        recent = self.sell(days_ago=1)
+        self.sell(days_ago=5)
+        self.sell()
+
+        sales = sales_history(
+            self.outlet.id, date_from=self.now - timedelta(days=2),
+            date_to=self.now - timedelta(hours=1))
+
+        self.assertEqual(list(sales), [recent])
+
+    def test_pages_follow_each_other_from_the_cursor(self):
+        sales = [self.sell(days_ago=days_ago) for days_ago in range(5)]
+        history = sales_history(self.outlet.id)
+
+        first_page = keyset_page(history, 2)
+        second_page = keyset_page(
+            history, 2, encode_cursor(first_page[-1]))
+        last_page = keyset_page(
+            history, 2, encode_cursor(second_page[-1]))
+
+        self.assertEqual(first_page + second_page + last_page, sales)
+
+    def test_details_are_prefetched(self):
+        for _ in range(3):
+            self.sell(products=[ProductFactory()])
+        with QueryCounter() as few_sales:
+            self.read_page()
+        for _ in range(10):
+            self.sell(products=[ProductFactory(), ProductFactory()])
+        with QueryCounter() as many_sales:
+            self.read_page()
+
+        self.assertEqual(few_sales.count, many_sales.count)
+
+    def read_page(self):
+        for sale in keyset_page(sales_history(self.outlet.id), 20):
+            [detail.product.product_name
+             for detail in sale.saledetail_set.all()]
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(GraphQLError):
+            keyset_page(sales_history(self.outlet.id), 2, 'not-a-cursor')
@@ -0,0 +1,138 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from healthid.apps.sales.models import (EtlCheckpoint, Sale, SaleDetail,
+                                        SalesPerformance)
+from healthid.tests.factories import (OutletFactory, ProductFactory,
+                                      SaleFactory, TimezoneFactory)
+from healthid.utils.app_utils.query_counter import QueryCounter
+from healthid.utils.sales_utils.sale_performance import (
+    CHECKPOINT_NAME, backfill_sales_performance,
+    populate_sale_performace_table)
+
+
+class TestSalesPerformanceEtl(TestCase):
+
+    def setUp(self):
+        TimezoneFactory()
+        self.outlet = OutletFactory()
+        self.product = ProductFactory()
+
+    def sell(self, quantity, sale=None):
+        return SaleDetail.objects.create(
+            product=self.product,
+            sale=sale or SaleFactory(outlet=self.outlet),
+            quantity=quantity, discount=0, price=10)
+
+    def test_sale_details_are_loaded_with_their_sale(self):
+        sale_detail = self.sell(3)
+
+        self.assertEqual(populate_sale_performace_table(), 1)
+
+        performance = SalesPerformance.objects.get(sale_detail=sale_detail)
+        sale = sale_detail.sale
+        self.assertEqual(performance.sale_id, sale.id)
+        self.assertEqual(performance.cashier_id, sale.sales_person_id)
+        self.assertEqual(performance.outlet_id, self.outlet.id)
+        self.assertEqual(performance.subtotal, sale.sub_total)
+        self.assertEqual(performance.transaction_date, sale.created_at)
+        self.assertEqual(performance.quantity_sold, 3)
+        self.assertEqual(EtlCheckpoint.objects.get(
+            name=CHECKPOINT_NAME).last_id, sale_detail.id)
+
+    def test_queries_depend_on_the_number_of_chunks(self):
+        for quantity in range(1, 4):
+            self.sell(quantity)
+        populate_sale_performace_table()
+        for quantity in range(1, 4):
+            self.sell(quantity)
+        with QueryCounter() as few_details:
+            populate_sale_performace_table(chunk_size=100)
+        for quantity in range(1, 31):
+            self.sell(quantity)
+        with QueryCounter() as many_details:
+            populate_sale_performace_table(chunk_size=100)
+
+        self.assertEqual(few_details.count, many_details.count)
+        self.assertEqual(SalesPerformance.objects.count(), 36)
+
+    def test_a_run_loads_at_most_max_chunks(self):
+        for quantity in range(1, 6):
+            self.sell(quantity)
+
+        self.assertEqual(
+            populate_sale_performace_table(chunk_size=2, max_chunks=2), 4)
+        self.assertEqual(populate_sale_performace_table(chunk_size=2), 1)
+        self.assertEqual(SalesPerformance.objects.count(), 5)
+
+    def test_details_added_to_older_sales_are_loaded(self):
+        old_detail = self.sell(1)
+        self.sell(1)
+        populate_sale_performace_table()
+
+        self.sell(2, sale=old_detail.sale)
+        populate_sale_performace_table()
+
+        self.assertEqual(SalesPerformance.objects.filter(
+            sale=old_detail.sale).count(), 2)
+
+    def test_backfill_skips_details_already_loaded(self):
+        old_detail = self.sell(1)
+        Sale.objects.filter(id=old_detail.sale_id).update(
+            created_at=timezone.now() - timedelta(days=10))
+        self.sell(2)
+        populate_sale_performace_table()
+        checkpoint = EtlCheckpoint.objects.get(name=CHECKPOINT_NAME)
+        SalesPerformance.objects.filter(
+            sale_detail=old_detail).hard_delete()
+
+        today = timezone.now().date()
+        self.assertEqual(backfill_sales_performance(
+            today - timedelta(days=11), today - timedelta(days=9)), 1)
+        backfill_sales_performance(today - timedelta(days=11), today)
+
+        self.assertEqual(SalesPerformance.objects.count(), 2)
+        self.assertEqual(EtlCheckpoint.objects.get(
+            name=CHECKPOINT_NAME).last_id, checkpoint.last_id)
+
+    def test_late_committed_details_are_loaded(self):
+        late_detail = self.sell(1)
+        self.sell(2)
+        populate_sale_performace_table()
+        # committed after the following detail was loaded
+        SalesPerformance.objects.filter(
+            sale_detail=late_detail).hard_delete()
+
+        self.assertEqual(populate_sale_performace_table(), 1)
+        self.assertTrue(SalesPerformance.objects.filter(
+            sale_detail=late_detail).exists())
+
+    def legacy_load(self, sale_detail):
+        populate_sale_performace_table()
+        SalesPerformance.objects.filter(sale_detail=sale_detail).update(
+            sale_detail=None)
+
+    def test_legacy_rows_are_linked_to_their_detail(self):
+        sale_detail = self.sell(2)
+        self.legacy_load(sale_detail)
+
+        with connection.cursor() as cursor:
+            cursor.execute(import_module(
+                'healthid.apps.sales.migrations.'
+                '0037_sales_performance_checkpoint').LINK_LEGACY_ROWS)
+
+        self.assertTrue(SalesPerformance.objects.filter(
+            sale_detail=sale_detail).exists())
+
+    def test_sales_with_legacy_rows_are_not_loaded_again(self):
+        sale_detail = self.sell(2)
+        self.legacy_load(sale_detail)
+
+        today = timezone.now().date()
+        self.assertEqual(backfill_sales_performance(today, today), 0)
+        self.assertEqual(populate_sale_performace_table(), 0)
+        self.assertEqual(SalesPerformance.objects.count(), 1)
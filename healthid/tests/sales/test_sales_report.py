@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from healthid.apps.sales.models import BatchHistory
+from healthid.tests.factories import (BatchInfoFactory, BusinessFactory,
+                                      OutletFactory, ProductFactory,
+                                      SaleFactory, TimezoneFactory,
+                                      UserFactory)
+from healthid.utils.app_utils.query_counter import QueryCounter
+from healthid.utils.sales_utils.sales_report import build_sales_report
+
+
+class TestSalesReport(TestCase):
+
+    def setUp(self):
+        TimezoneFactory()
+        self.business = BusinessFactory()
+        self.outlet = OutletFactory(business=self.business)
+        self.quiet_outlet = OutletFactory(business=self.business)
+        self.cashier = UserFactory()
+        self.product = ProductFactory()
+        self.batch_info = BatchInfoFactory(product=self.product)
+
+    def sell(self, outlet, cashier, quantities, payment_method='cash',
+             paid_amount=100):
+        sale = SaleFactory(outlet=outlet, sales_person=cashier,
+                           payment_method=payment_method,
+                           paid_amount=paid_amount)
+        for quantity in quantities:
+            BatchHistory.objects.create(
+                sale=sale, product=self.product, batch_info=self.batch_info,
+                quantity_taken=quantity)
+        return sale
+
+    def test_report_totals_per_outlet_and_cashier(self):
+        card_cashier = UserFactory()
+        self.sell(self.outlet, self.cashier, [2, 3])
+        self.sell(self.outlet, card_cashier, [4], 'card', 50)
+
+        outlets = build_sales_report([self.business.id])[self.business.id]
+        outlet_report = next(
+            outlet for outlet in outlets if outlet['id'] == self.outlet.id)
+        quiet_report = next(
+            outlet for outlet in outlets
+            if outlet['id'] == self.quiet_outlet.id)
+
+        self.assertEqual(outlet_report['total_number_sold'], 3)
+        self.assertEqual(outlet_report['total_qty_sold'], 9)
+        self.assertEqual(outlet_report['total_amount_cash'], 200)
+        self.assertEqual(outlet_report['total_amount_card'], 50)
+        self.assertEqual(outlet_report['sold_amount'], 250)
+        self.assertEqual(quiet_report['total_number_sold'], 0)
+        self.assertIsNone(quiet_report['sold_amount'])
+        self.assertEqual(quiet_report['cashiers'], [])
+
+        cashier_report = next(
+            cashier for cashier in outlet_report['cashiers']
+            if cashier['user_id'] == self.cashier.id)
+        self.assertEqual(cashier_report['total_qty_sold'], 5)
+        self.assertIsNone(cashier_report['total_amount_card'])
+        self.assertEqual(
+            [item['qty_sold'] for item in cashier_report['product_list']],
+            [2, 3])
+        self.assertEqual(cashier_report['product_list'][0]['batch_nbr'],
+                         self.batch_info.id)
+
+    def test_report_covers_the_requested_day_only(self):
+        self.sell(self.outlet, self.cashier, [2])
+        yesterday = timezone.localdate() - timedelta(days=1)
+        outlets = build_sales_report(
+            [self.business.id], yesterday)[self.business.id]
+        self.assertTrue(all(
+            outlet['total_number_sold'] == 0 for outlet in outlets))
+
+    def test_report_query_count_does_not_grow_with_cashiers(self):
+        query_counts = []
+        for cashiers in (1, 5):
+            for _ in range(cashiers):
+                self.sell(self.outlet, UserFactory(), [1, 1])
+            with QueryCounter() as counter:
+                build_sales_report([self.business.id])
+            query_counts.append(counter.count)
+        self.assertEqual(query_counts[0], query_counts[1])
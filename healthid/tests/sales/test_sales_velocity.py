@@ -1,7 +1,3 @@
-from dateutil.relativedelta import relativedelta
-
-from django.utils import timezone
-
 from healthid.apps.preference.models import OutletPreference
 from healthid.apps.sales.sales_velocity import SalesVelocity
 from healthid.tests.base_config import BaseConfiguration
@@ -48,11 +44,3 @@ class TestSalesVelocity(BaseConfiguration):
         self.assertEqual(
             SalesVelocity(**self.velocity_data).weekly_sales(
                 weeks_count=2), [0, 0])
-
-    def test_get_sales_for_period_method(self):
-        self.assertEqual(
-            SalesVelocity(
-                **self.velocity_data).get_sales_for_period(
-                current_date=timezone.now(),
-                earlier_date=timezone.now() + relativedelta(weeks=-1)),
-            [None])
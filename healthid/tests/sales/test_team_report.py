@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from healthid.apps.business.models import UserBusiness
+from healthid.apps.sales.models import BatchHistory
+from healthid.tests.factories import (OutletFactory, ProductFactory,
+                                      SaleFactory, TimezoneFactory,
+                                      UserFactory)
+from healthid.utils.app_utils.query_counter import QueryCounter
+from healthid.utils.sales_utils.team_report import team_performance
+
+
+class TestTeamReport(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        TimezoneFactory()
+        self.outlet = OutletFactory()
+        self.business = self.outlet.business
+        self.date_to = timezone.now() + timedelta(days=1)
+        self.date_from = self.date_to - timedelta(days=30)
+
+    def cashier(self, business=None):
+        user = UserFactory()
+        UserBusiness.objects.create(
+            user=user, business=business or self.business)
+        return user
+
+    def sell(self, cashier, quantity=1, payment_method='cash', product=None):
+        sale = SaleFactory(sales_person=cashier, outlet=self.outlet,
+                           payment_method=payment_method, paid_amount=100)
+        return BatchHistory.objects.create(
+            sale=sale, product=product or ProductFactory(),
+            quantity_taken=quantity)
+
+    def report(self, **kwargs):
+        return team_performance(
+            self.business.id, self.date_from, self.date_to, **kwargs)
+
+    def test_totals_are_grouped_per_sales_person(self):
+        cashier = self.cashier()
+        product = ProductFactory()
+        self.sell(cashier, 2, product=product)
+        self.sell(cashier, 3, product=product)
+        self.sell(cashier, 1, payment_method='card')
+        self.sell(self.cashier(OutletFactory().business))
+
+        report = self.report()
+
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0].sale.sales_person, cashier)
+        self.assertEqual(report[0].totalProductsSold, 2)
+        self.assertEqual(report[0].totalQtySold, 6)
+        self.assertEqual(report[0].totalCashAmount, 200)
+        self.assertEqual(report[0].totalCardAmount, 100)
+
+    def test_queries_do_not_depend_on_the_number_of_sales(self):
+        for _ in range(2):
+            self.sell(self.cashier())
+        with QueryCounter() as few_sales:
+            self.report()
+        for _ in range(10):
+            self.sell(self.cashier())
+        with QueryCounter() as many_sales:
+            report = self.report()
+
+        self.assertEqual(len(report), 12)
+        self.assertEqual(few_sales.count, many_sales.count)
+
+    def test_report_is_paginated_in_the_database(self):
+        cashiers = sorted([self.cashier() for _ in range(3)],
+                          key=lambda cashier: cashier.id)
+        for cashier in cashiers:
+            self.sell(cashier)
+
+        report = self.report(page_count=2, page_number=2)
+
+        self.assertEqual([sale.sale.sales_person for sale in report],
+                         cashiers[2:])
+
+    def test_report_is_not_cached_by_default(self):
+        self.sell(self.cashier())
+        self.report()
+        with QueryCounter() as uncached:
+            self.report()
+        self.assertGreater(uncached.count, 0)
+
+    @override_settings(TEAM_REPORT_CACHE_TIMEOUT=900)
+    def test_report_is_cached_until_a_sale_is_made(self):
+        cashier = self.cashier()
+        self.sell(cashier)
+        self.report()
+        with QueryCounter() as cached:
+            self.report()
+        self.assertEqual(cached.count, 0)
+
+        self.sell(cashier, 4)
+        self.assertEqual(self.report()[0].totalQtySold, 5)
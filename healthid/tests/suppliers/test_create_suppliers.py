@@ -159,19 +159,22 @@ class SuppliersTestCase(BaseConfiguration, JSONWebTokenTestCase):
     def test_csv_file_upload(self):
         path = os.path.join(self.base_path, 'test.csv')
         request = self.handle_csv_request(path)
-        response = self.view(request, param='suppliers')
+        response = self.import_job_response(
+            self.view(request, param='suppliers'))
         self.assertEqual(response.status_code, 201)
         self.assertIn('success', response.data)
         # test dupplication
         request = self.handle_csv_request(path)
-        response = self.view(request, param='suppliers')
+        response = self.import_job_response(
+            self.view(request, param='suppliers'))
         self.assertEqual(response.status_code, 400)
         self.assertIn('duplicatedSuppliers', response.data)
 
     def test_invalid_csv_data(self):
         path = os.path.join(self.base_path, 'invalid_csv.csv')
         request = self.handle_csv_request(path)
-        response = self.view(request, param='suppliers')
+        response = self.import_job_response(
+            self.view(request, param='suppliers'))
         self.assertEqual(response.status_code, 400)
         self.assertIn('rows', response.data)
         self.assertIn('columns', response.data)
@@ -184,7 +187,8 @@ class SuppliersTestCase(BaseConfiguration, JSONWebTokenTestCase):
     def test_invalid_csv_with_missing_column(self):
         path = os.path.join(self.base_path, 'missing_column.csv')
         request = self.handle_csv_request(path)
-        response = self.view(request, param='suppliers')
+        response = self.import_job_response(
+            self.view(request, param='suppliers'))
         self.assertEqual(response.status_code, 400)
         self.assertIn(ERROR_RESPONSES["csv_missing_field"],
                       str(response.data['error']))
@@ -192,7 +196,8 @@ class SuppliersTestCase(BaseConfiguration, JSONWebTokenTestCase):
     def test_invalid_csv_with_more_column(self):
         path = os.path.join(self.base_path, 'more_column.csv')
         request = self.handle_csv_request(path)
-        response = self.view(request, param='suppliers')
+        response = self.import_job_response(
+            self.view(request, param='suppliers'))
         self.assertEqual(response.status_code, 400)
         self.assertIn(ERROR_RESPONSES["csv_many_field"],
                       str(response.data['error']))
@@ -200,7 +205,8 @@ class SuppliersTestCase(BaseConfiguration, JSONWebTokenTestCase):
     def test_invalid_on_credit(self):
         path = os.path.join(self.base_path, 'invalid_on_credit.csv')
         request = self.handle_csv_request(path)
-        response = self.view(request, param='suppliers')
+        response = self.import_job_response(
+            self.view(request, param='suppliers'))
         self.assertEqual(response.status_code, 400)
         self.assertIn(ERROR_RESPONSES["payment_terms_on_credit"].format(1),
                       str(response.data['error']))
@@ -208,7 +214,8 @@ class SuppliersTestCase(BaseConfiguration, JSONWebTokenTestCase):
     def test_invalid_cash_on_delivery(self):
         path = os.path.join(self.base_path, 'invalid_cash_on_delivery.csv')
         request = self.handle_csv_request(path)
-        response = self.view(request, param='suppliers')
+        response = self.import_job_response(
+            self.view(request, param='suppliers'))
         self.assertEqual(response.status_code, 400)
         self.assertIn(ERROR_RESPONSES["payment_terms_cash_on_deliver"].
                       format(1), str(response.data['error']))
@@ -237,7 +244,8 @@ class SuppliersTestCase(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['suppliers']), {'file': file},
             **self.admin_auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='retail_pro_suppliers')
+        response = self.import_job_response(
+            view(request, param='retail_pro_suppliers'))
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.data["success"],
                          "Successfully added supplier(s)")
@@ -253,7 +261,8 @@ class SuppliersTestCase(BaseConfiguration, JSONWebTokenTestCase):
             reverse('handle_csv', args=['suppliers']), {'file': file},
             **self.admin_auth_headers)
         view = HandleCSV.as_view()
-        response = view(request, param='quick_books_suppliers')
+        response = self.import_job_response(
+            view(request, param='quick_books_suppliers'))
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.data["success"],
                          "Successfully added supplier(s)")
@@ -321,6 +321,36 @@ mutation {{
 '''
 
 
+create_sale_with_query_count = '''
+mutation {{
+  createSale(
+      discountTotal: {discount_total},
+      amountToPay: {amount_to_pay},
+      paymentMethod:"{payment_method}",
+      customerId:"{customer_id}"
+      outletId: {outlet_id}
+      subTotal: {sub_total},
+      changeDue: {change_due},
+      paidAmount: {paid_amount},
+      batches: [{batches}]
+      )
+      {{
+    queryCount
+    message
+  }}
+}}
+'''
+
+sold_batch = '''
+          {{
+              batchId: "{batch_id}",
+              quantity: {quantity},
+              discount: {discount},
+              price: {price}
+          }}
+'''
+
+
 create_anonymous_sale = '''
 mutation {{
   createSale(
@@ -16,11 +16,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
 
 from .apps.authentication.views import activate, PasswordResetView
 from .apps.orders.views import SupplierOrderFormPDFView
-from .views import HandleCSV, HandleCsvExport, EmptyCsvFileExport
+from .apps.receipts.views import ReceiptBarcodeView
+from .views import (CostLimitedGraphQLView, HandleCSV, HandleCsvExport,
+                    EmptyCsvFileExport, GraphQLProfiles, ImportJobStatus)
 from rest_framework.documentation import include_docs_urls
 
 core_schema_view = include_docs_urls(title='HealthID API')
@@ -34,9 +35,12 @@ from django.urls import path
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('healthid/', csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path('healthid/',
+         csrf_exempt(CostLimitedGraphQLView.as_view(graphiql=True))),
     path('healthid/activate/<uidb64>/<token>', activate, name='activate'),
     path('healthid/csv/<param>', HandleCSV.as_view(), name='handle_csv'),
+    path('healthid/csv/jobs/<job_id>', ImportJobStatus.as_view(),
+         name='csv_import_job'),
     path('healthid/export_csv/<param>', HandleCsvExport.as_view(),
          name='export_csv'),
     path('healthid/sample_csv_file/<param>', EmptyCsvFileExport.as_view(),
@@ -46,5 +50,9 @@ urlpatterns = [
     path('healthid/supplier-order-pdf/<supplier_order_detail_id>',
          SupplierOrderFormPDFView.as_view(),
          name='supplier-order-form'),
+    path('healthid/receipts/barcode/<int:scanned_number>.<image_format>',
+         ReceiptBarcodeView.as_view(), name='receipt_barcode'),
+    path('healthid/profiles', GraphQLProfiles.as_view(),
+         name='graphql_profiles'),
     path('healthid/schema/', core_schema_view)
 ]
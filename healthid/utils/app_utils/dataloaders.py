@@ -0,0 +1,78 @@
+from promise import Promise
+from promise.dataloader import DataLoader
+
+
+class ModelLoader(DataLoader):
+    """
+    Load the rows of a queryset by id, with one query per batch of ids.
+
+    Attributes:
+        query_set(queryset): rows to load from
+    """
+
+    def __init__(self, query_set, **kwargs):
+        super().__init__(**kwargs)
+        self.query_set = query_set
+
+    def batch_load_fn(self, keys):
+        rows = self.query_set.in_bulk(set(keys))
+        return Promise.resolve([rows.get(key) for key in keys])
+
+
+class GroupedLoader(DataLoader):
+    """
+    Load the rows of a queryset sharing the values of some fields, with
+    one query per batch of values.
+
+    Keys are the value of the field, or a tuple of values when grouping
+    on several fields. Rows keep the ordering of the queryset within
+    their group.
+
+    Attributes:
+        query_set(queryset): rows to load from
+        fields(tuple): names of the fields the rows are grouped by, e.g.
+                       'sale_id'
+    """
+
+    def __init__(self, query_set, *fields, **kwargs):
+        super().__init__(**kwargs)
+        self.query_set = query_set
+        self.fields = fields
+
+    def key(self, row):
+        values = tuple(getattr(row, field) for field in self.fields)
+        return values if len(values) > 1 else values[0]
+
+    def batch_load_fn(self, keys):
+        if len(self.fields) > 1:
+            values = list(zip(*keys))
+        else:
+            values = [keys]
+        rows = self.query_set.filter(**{
+            f'{field}__in': set(field_values)
+            for field, field_values in zip(self.fields, values)})
+        groups = {}
+        for row in rows:
+            groups.setdefault(self.key(row), []).append(row)
+        return Promise.resolve([groups.get(key, []) for key in keys])
+
+
+def get_loader(info, name, create):
+    """
+    Get a loader from the registry of the request being resolved, so that
+    every resolver of the request shares its batches and cache.
+
+    Args:
+        info(obj): information about the GraphQL query being resolved
+        name(str): name of the loader
+        create(callable): creates the loader when the request has none
+
+    Returns:
+        loader(obj): DataLoader registered under name
+    """
+    loaders = getattr(info.context, 'dataloaders', None)
+    if loaders is None:
+        loaders = info.context.dataloaders = {}
+    if name not in loaders:
+        loaders[name] = create()
+    return loaders[name]
@@ -2,6 +2,7 @@ from graphql import GraphQLError
 from django.core.exceptions import ObjectDoesNotExist
 from healthid.utils.app_utils.database import (SaveContextManager,
                                                get_model_object)
+from healthid.utils.app_utils.identity import memoize_identity
 from healthid.apps.business.models import UserBusiness
 
 
@@ -20,9 +21,17 @@ def get_user_business(user):
         business(obj): user's business
         graphql error: if use has no business
     """
+    return memoize_identity(
+        user, 'business', lambda: load_user_business(user))
+
+
+def load_user_business(user):
     business = None
     try:
-        business = get_model_object(UserBusiness, 'user_id', user.id).business
+        business = get_model_object(
+            UserBusiness, 'user_id', user.id,
+            manager_query=UserBusiness.objects.select_related(
+                'business')).business
         if not business:
             raise GraphQLError(
                 BUSINESS_ERROR_RESPONSES["no_business_error"])
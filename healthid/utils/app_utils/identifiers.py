@@ -0,0 +1,82 @@
+from django.db import connection
+from django.db.models.signals import pre_save
+
+# functions assigning the identifiers of new instances, by model
+_assigners = {}
+
+
+def next_values(sequence, count=1):
+    """
+    Take numbers from a database sequence in a single query.
+
+    Args:
+        sequence(str): name of the sequence
+        count(int): number of values to take
+
+    Returns:
+        list: the values taken, in increasing order
+    """
+    if count < 1:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT nextval(%s) FROM generate_series(1, %s)',
+                       [sequence, count])
+        return [value for value, in cursor.fetchall()]
+
+
+def next_ids(model, count=1):
+    """
+    Take primary keys from the sequence of the auto primary key of a model,
+    for rows inserted with their id.
+
+    Returns:
+        list: the ids taken, in increasing order
+    """
+    if count < 1:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(pg_get_serial_sequence(%s, %s)) '
+            'FROM generate_series(1, %s)',
+            [model._meta.db_table, model._meta.pk.column, count])
+        return [value for value, in cursor.fetchall()]
+
+
+def assign_identifiers(instances):
+    """
+    Assign their generated identifiers to instances of a model before they
+    are inserted, in one query per sequence whatever their number, so that
+    they can be saved or bulk created in a single write.
+
+    Args:
+        instances(list): instances of a single model
+
+    Returns:
+        list: the instances
+    """
+    instances = list(instances)
+    if instances:
+        assign = _assigners.get(instances[0]._meta.concrete_model)
+        if assign is not None:
+            assign(instances)
+    return instances
+
+
+def assign_saved_identifiers(sender, instance, **kwargs):
+    assign_identifiers([instance])
+
+
+def identifier(model):
+    """
+    Register the function assigning the identifiers of the instances of a
+    model that have none, which is run before any of them is saved.
+
+    Args:
+        model(class): model whose identifiers are assigned
+    """
+    def register(assign):
+        _assigners[model] = assign
+        pre_save.connect(assign_saved_identifiers, sender=model,
+                         dispatch_uid=f'identifiers.{model._meta.label}')
+        return assign
+    return register
@@ -0,0 +1,82 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+# identity values of the users seen by the request of each thread
+_request = threading.local()
+
+
+def identity_cache_key(user_id):
+    return f'identity:{user_id}'
+
+
+def open_identity_scope():
+    _request.identities = {}
+
+
+def close_identity_scope():
+    _request.identities = None
+
+
+@contextmanager
+def identity_scope():
+    """
+    Memoize the identity of users for the duration of a block, as the
+    identity middleware does for a request.
+    """
+    open_identity_scope()
+    try:
+        yield
+    finally:
+        close_identity_scope()
+
+
+def memoize_identity(user, name, load):
+    """
+    Get a value describing a user, such as their business or active
+    outlet, loading it once per request. Values are also shared between
+    requests for IDENTITY_CACHE_TIMEOUT seconds when that is set.
+
+    Args:
+        user(obj): user the value describes
+        name(str): name of the value
+        load(callable): loads the value from the database
+
+    Returns:
+        value(obj): the value, None included
+    """
+    identities = getattr(_request, 'identities', None)
+    values = {} if identities is None else identities.setdefault(user.id, {})
+    if name in values:
+        return values[name]
+    timeout = settings.IDENTITY_CACHE_TIMEOUT
+    shared_values = {}
+    if timeout:
+        shared_values = cache.get(identity_cache_key(user.id)) or {}
+    if name in shared_values:
+        values[name] = shared_values[name]
+        return values[name]
+    values[name] = load()
+    if timeout:
+        shared_values[name] = values[name]
+        cache.set(identity_cache_key(user.id), shared_values, timeout)
+    return values[name]
+
+
+def forget_identity(*user_ids):
+    """
+    Drop the memoized identity of users whose business, outlets, role or
+    outlet preference changed.
+    """
+    identities = getattr(_request, 'identities', None) or {}
+    for user_id in user_ids:
+        identities.pop(user_id, None)
+    if settings.IDENTITY_CACHE_TIMEOUT:
+        cache.delete_many(
+            [identity_cache_key(user_id) for user_id in user_ids])
+
+
+def get_role_name(user):
+    return memoize_identity(user, 'role', lambda: str(user.role))
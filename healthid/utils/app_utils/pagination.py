@@ -1,4 +1,84 @@
+import base64
+import binascii
+import hashlib
+import json
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
 from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from graphql import GraphQLError
+
+from healthid.utils.messages.common_responses import ERROR_RESPONSES
+
+# largest page returned after a keyset cursor
+MAX_KEYSET_PAGE_SIZE = 100
+
+PaginationResult = namedtuple(
+    'PaginationResult', ['page', 'num_pages', 'count'])
+
+
+def estimated_count(query_set):
+    """
+    Get the number of rows the database planner expects a queryset to
+    return, without running it.
+
+    Returns:
+        count(int): estimated number of rows, None when the database
+                    gives no estimate
+    """
+    connection = connections[query_set.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = query_set.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def cached_count(query_set):
+    """
+    Count the rows of a queryset with COUNT(*), caching the count for
+    PAGINATION_COUNT_CACHE_TIMEOUT seconds when that is set.
+    """
+    timeout = settings.PAGINATION_COUNT_CACHE_TIMEOUT
+    if not timeout:
+        return query_set.count()
+    sql, params = query_set.query.sql_with_params()
+    key = 'pagination_count:{}'.format(hashlib.md5(
+        f'{query_set.db}:{sql}:{params!r}'.encode()).hexdigest())
+    count = cache.get(key)
+    if count is None:
+        count = query_set.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class CountingPaginator(Paginator):
+    """
+    Paginator counting querysets with COUNT(*) rather than loading them.
+
+    Results the planner expects to hold at least
+    PAGINATION_ESTIMATE_THRESHOLD rows are counted from that estimate,
+    when the threshold is set.
+    """
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return len(self.object_list)
+        threshold = settings.PAGINATION_ESTIMATE_THRESHOLD
+        if threshold:
+            estimate = estimated_count(self.object_list)
+            if estimate is not None and estimate >= threshold:
+                return estimate
+        return cached_count(self.object_list)
 
 
 def pagination_query(query_set, page_count, page_number):
@@ -10,5 +90,69 @@ def pagination_query(query_set, page_count, page_number):
     :returns a tuple of the paginated record,
     number of pages and the total number of items
     """
-    paginator = Paginator(query_set, page_count)
-    return paginator.get_page(page_number), paginator.num_pages, len(query_set)
+    paginator = CountingPaginator(query_set, page_count)
+    page = paginator.get_page(page_number)
+    return PaginationResult(page, paginator.num_pages, paginator.count)
+
+
+def store_pagination(info, pagination_result):
+    """
+    Keep the pagination of a list on the request, for the page count and
+    total fields resolved after it in the same query.
+    """
+    info.context.pagination_result = pagination_result
+    return pagination_result
+
+
+def total_pages(info):
+    pagination_result = getattr(info.context, 'pagination_result', None)
+    return pagination_result[1] if pagination_result else 0
+
+
+def total_count(info):
+    pagination_result = getattr(info.context, 'pagination_result', None)
+    return pagination_result[2] if pagination_result else 0
+
+
+def encode_cursor(instance, field='created_at'):
+    """
+    Encode the position of a row in a list ordered by a field and its id,
+    for the rows after it to be fetched with keyset_page().
+    """
+    # datetimes keep their microseconds, which DjangoJSONEncoder drops
+    position = json.dumps(
+        [getattr(instance, field), instance.pk],
+        default=lambda value: value.isoformat()
+        if hasattr(value, 'isoformat') else str(value))
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise GraphQLError(ERROR_RESPONSES['invalid_cursor'])
+    return value, pk
+
+
+def keyset_page(query_set, first, after=None, field='created_at'):
+    """
+    Get a page of a list ordered by a field and its id, the greatest
+    first, seeking past the last row of the previous page rather than
+    counting the rows before it.
+
+    Args:
+        query_set(queryset): rows to page through
+        first(int): number of rows to return
+        after(str): cursor of the last row of the previous page
+        field(str): field the rows are ordered by
+
+    Returns:
+        rows(list): at most first rows
+    """
+    query_set = query_set.order_by(f'-{field}', '-pk')
+    if after:
+        value, pk = decode_cursor(after)
+        query_set = query_set.filter(
+            Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+    return list(query_set[:min(first, MAX_KEYSET_PAGE_SIZE)])
@@ -0,0 +1,147 @@
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# number of resolvers and repeated queries kept in a profile
+MAX_PROFILED_FIELDS = 10
+MAX_DUPLICATE_QUERIES = 10
+
+_profiles = deque()
+_profiles_lock = threading.Lock()
+
+
+def profiling_enabled():
+    return bool(settings.GRAPHQL_PROFILE_SAMPLE_RATE or
+                settings.GRAPHQL_SLOW_OPERATION_MS)
+
+
+class OperationProfile:
+    """
+    Measures of a GraphQL operation.
+
+    Every operation is timed while profiling is enabled. The resolvers
+    and SQL queries of a GRAPHQL_PROFILE_SAMPLE_RATE share of them are
+    measured as well.
+
+    Attributes:
+        sampled(bool): True when resolvers and queries are measured
+        operation_type(str): 'query' or 'mutation'
+        operation_name(str): name of the operation, or its root fields
+                             when it is anonymous
+        fields(dict): time spent in and calls of each resolver, by
+                      'ParentType.fieldName'
+        queries(Counter): number of runs of each SQL query
+    """
+
+    def __init__(self, sampled=None):
+        if sampled is None:
+            sampled = random.random() < settings.GRAPHQL_PROFILE_SAMPLE_RATE
+        self.sampled = sampled
+        self.operation_type = None
+        self.operation_name = None
+        self.root_fields = []
+        self.fields = defaultdict(lambda: [0.0, 0])
+        self.queries = Counter()
+        self.sql_time = 0.0
+        self.started = time.perf_counter()
+
+    def start_operation(self, info):
+        if self.operation_type is None:
+            operation = info.operation
+            self.operation_type = operation.operation
+            self.operation_name = operation.name and operation.name.value
+        if len(info.path) == 1:
+            self.root_fields.append(info.field_name)
+
+    def record_field(self, info, started):
+        field = self.fields[f'{info.parent_type.name}.{info.field_name}']
+        field[0] += time.perf_counter() - started
+        field[1] += 1
+
+    def record_query(self, execute, sql, params, many, context):
+        """
+        Count a query run on the database, to be installed with
+        connection.execute_wrapper()
+        """
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries[sql] += 1
+
+    def summary(self, response_size):
+        """
+        Returns:
+            profile(dict): the measures of the operation
+        """
+        profile = {
+            'operation': self.operation_name or '{}{{{}}}'.format(
+                self.operation_type, ','.join(self.root_fields)),
+            'operation_type': self.operation_type,
+            'recorded_at': timezone.now().isoformat(),
+            'wall_ms': round((time.perf_counter() - self.started) * 1000, 2),
+            'response_bytes': response_size,
+            'sampled': self.sampled,
+        }
+        if not self.sampled:
+            return profile
+        slowest_fields = sorted(
+            self.fields.items(), key=lambda field: field[1][0],
+            reverse=True)[:MAX_PROFILED_FIELDS]
+        duplicate_queries = [
+            {'sql': sql, 'count': count}
+            for sql, count in self.queries.most_common(MAX_DUPLICATE_QUERIES)
+            if count > 1]
+        profile.update({
+            'queries': sum(self.queries.values()),
+            'sql_ms': round(self.sql_time * 1000, 2),
+            'duplicate_queries': duplicate_queries,
+            'fields': [
+                {'field': name, 'ms': round(elapsed * 1000, 2),
+                 'calls': calls}
+                for name, (elapsed, calls) in slowest_fields],
+        })
+        return profile
+
+
+def record_profile(profile, response_size):
+    """
+    Keep the summary of a profiled operation in the buffer of recent
+    profiles and log it, when it was sampled or slower than
+    GRAPHQL_SLOW_OPERATION_MS.
+
+    Returns:
+        profile(dict): the summary recorded, None when it was not
+    """
+    if profile.operation_type is None:
+        return None
+    summary = profile.summary(response_size)
+    threshold = settings.GRAPHQL_SLOW_OPERATION_MS
+    slow = bool(threshold) and summary['wall_ms'] >= threshold
+    if not (profile.sampled or slow):
+        return None
+    with _profiles_lock:
+        _profiles.append(summary)
+        while len(_profiles) > settings.GRAPHQL_PROFILE_BUFFER_SIZE:
+            _profiles.popleft()
+    logger.log(logging.WARNING if slow else logging.INFO,
+               json.dumps(summary))
+    return summary
+
+
+def recent_profiles():
+    """
+    Returns:
+        profiles(list): the recorded profiles, the most recent first
+    """
+    with _profiles_lock:
+        return list(reversed(_profiles))
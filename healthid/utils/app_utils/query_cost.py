@@ -0,0 +1,234 @@
+from django.conf import settings
+from django.core.cache import cache
+from graphql import GraphQLError
+from graphql.language import ast
+from graphql.type.definition import (GraphQLList, GraphQLNonNull,
+                                     GraphQLObjectType)
+
+from healthid.utils.app_utils.pagination_defaults import PAGINATION_DEFAULT
+from healthid.utils.messages.common_responses import ERROR_RESPONSES
+
+# arguments bounding the number of items of a list field
+LIST_SIZE_ARGUMENTS = ('pageCount', 'first', 'limit')
+
+# items expected from list fields that take no size argument, or are not
+# paginated when it is left out
+LIST_SIZES = {
+    'Query.allSalesHistory': 5000,
+    'Query.allBatchInfo': 5000,
+    'Query.customerCredits': 5000,
+}
+
+# cost of fetching one item of a field, when it is not 1 for objects and
+# 0 for scalars
+FIELD_COSTS = {}
+
+# fields walked, fragments expanded, before a document is too complex
+MAX_ANALYZED_FIELDS = 10000
+
+
+class QueryCostAnalyzer:
+    """
+    Walk the selections of a GraphQL operation, adding up the objects it
+    may fetch. A field returning objects costs FIELD_COSTS or 1 for every
+    item of the lists above it, and a list field multiplies the cost of
+    the fields below it by its size.
+
+    Attributes:
+        schema(obj): schema the operation is run against
+        fragments(dict): fragment definitions of the document
+        variables(dict): variables the operation is run with
+        max_depth(int): depth from which the walk stops, none when 0
+        depth(int): deepest field nesting met
+        analyzed_fields(int): number of fields walked
+    """
+
+    def __init__(self, schema, fragments, variables, max_depth):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables or {}
+        self.max_depth = max_depth
+        self.depth = 0
+        self.analyzed_fields = 0
+
+    def selection_cost(self, parent_type, selection_set, multiplier, depth,
+                       fragment_names=()):
+        cost = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                cost += self.field_cost(
+                    parent_type, selection, multiplier, depth,
+                    fragment_names)
+                continue
+            spread_names = fragment_names
+            if isinstance(selection, ast.FragmentSpread):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                # cycles are rejected when the document is validated
+                if fragment is None or name in fragment_names:
+                    continue
+                spread_names = fragment_names + (name,)
+            else:
+                fragment = selection
+            fragment_type = parent_type
+            if fragment.type_condition:
+                fragment_type = self.schema.get_type(
+                    fragment.type_condition.name.value) or parent_type
+            cost += self.selection_cost(
+                fragment_type, fragment.selection_set, multiplier, depth,
+                spread_names)
+        return cost
+
+    def field_cost(self, parent_type, field, multiplier, depth,
+                   fragment_names):
+        name = field.name.value
+        fields = getattr(parent_type, 'fields', None) or {}
+        if name.startswith('__') or name not in fields:
+            return 0
+        self.analyzed_fields += 1
+        if self.analyzed_fields > MAX_ANALYZED_FIELDS:
+            raise GraphQLError(ERROR_RESPONSES['query_too_complex'])
+        depth += 1
+        self.depth = max(self.depth, depth)
+        key = f'{parent_type.name}.{name}'
+        field_type, is_list = unwrap(fields[name].type)
+        if field.selection_set is None:
+            return FIELD_COSTS.get(key, 0) * multiplier
+        if is_list:
+            multiplier *= self.list_size(key, field)
+        cost = FIELD_COSTS.get(key, 1) * multiplier
+        if self.max_depth and depth > self.max_depth:
+            return cost
+        return cost + self.selection_cost(
+            field_type, field.selection_set, multiplier, depth,
+            fragment_names)
+
+    def list_size(self, key, field):
+        for argument in field.arguments or []:
+            if argument.name.value not in LIST_SIZE_ARGUMENTS:
+                continue
+            value = argument.value
+            if isinstance(value, ast.Variable):
+                value = self.variables.get(value.name.value)
+            elif isinstance(value, ast.IntValue):
+                value = value.value
+            try:
+                return max(int(value), 1)
+            except (TypeError, ValueError):
+                break
+        return LIST_SIZES.get(key, PAGINATION_DEFAULT['page_count'])
+
+
+def unwrap(graphql_type):
+    """
+    Returns:
+        type(obj): named type of a field, without list and non null
+                   wrappers
+        is_list(bool): True when the field returns a list
+    """
+    is_list = False
+    while isinstance(graphql_type, (GraphQLList, GraphQLNonNull)):
+        is_list = is_list or isinstance(graphql_type, GraphQLList)
+        graphql_type = graphql_type.of_type
+    return graphql_type, is_list
+
+
+def get_operation(document_ast, operation_name):
+    """
+    Get the operation of a document that is run, None when the document
+    does not tell which, which fails its execution.
+    """
+    operations = [definition for definition in document_ast.definitions
+                  if isinstance(definition, ast.OperationDefinition)]
+    if operation_name is None:
+        return operations[0] if len(operations) == 1 else None
+    for operation in operations:
+        if operation.name and operation.name.value == operation_name:
+            return operation
+    return None
+
+
+def query_cost(schema, document_ast, variables=None, operation_name=None):
+    """
+    Work out the cost and depth of the operation of a GraphQL document.
+
+    Args:
+        schema(obj): schema the operation is run against
+        document_ast(obj): parsed GraphQL document
+        variables(dict): variables the operation is run with
+        operation_name(str): operation to run, when the document has
+                             several
+
+    Returns:
+        cost(int): number of objects the operation may fetch
+        depth(int): deepest field nesting of the operation
+    """
+    operation = get_operation(document_ast, operation_name)
+    if operation is None:
+        return 0, 0
+    root_type = {
+        'query': schema.get_query_type,
+        'mutation': schema.get_mutation_type,
+        'subscription': schema.get_subscription_type,
+    }[operation.operation]()
+    if not isinstance(root_type, GraphQLObjectType):
+        return 0, 0
+    fragments = {definition.name.value: definition
+                 for definition in document_ast.definitions
+                 if isinstance(definition, ast.FragmentDefinition)}
+    analyzer = QueryCostAnalyzer(
+        schema, fragments, variables, settings.GRAPHQL_MAX_QUERY_DEPTH)
+    cost = analyzer.selection_cost(root_type, operation.selection_set, 1, 0)
+    return cost, analyzer.depth
+
+
+def spend_cost_budget(user_key, cost):
+    """
+    Spend the cost of an operation from the budget a user has for the
+    current minute.
+
+    Returns:
+        remaining(int): budget left, None when budgets are disabled
+    """
+    budget = settings.GRAPHQL_COST_BUDGET_PER_MINUTE
+    if not budget:
+        return None
+    key = f'query_cost_budget:{user_key}'
+    cache.add(key, 0, 60)
+    try:
+        spent = cache.incr(key, cost)
+    except ValueError:
+        cache.set(key, cost, 60)
+        spent = cost
+    if spent > budget:
+        raise GraphQLError(ERROR_RESPONSES['query_budget_exceeded'])
+    return budget - spent
+
+
+def check_query_cost(schema, document_ast, variables=None,
+                     operation_name=None, user_key=None):
+    """
+    Reject an operation nested deeper than GRAPHQL_MAX_QUERY_DEPTH,
+    costing more than GRAPHQL_MAX_QUERY_COST, or going over the cost
+    budget of its user.
+
+    Returns:
+        cost(dict): cost, depth and limits of the operation, to be
+                    reported to the client
+    """
+    cost, depth = query_cost(schema, document_ast, variables, operation_name)
+    max_depth = settings.GRAPHQL_MAX_QUERY_DEPTH
+    max_cost = settings.GRAPHQL_MAX_QUERY_COST
+    if max_depth and depth > max_depth:
+        raise GraphQLError(
+            ERROR_RESPONSES['query_too_deep'].format(depth, max_depth))
+    if max_cost and cost > max_cost:
+        raise GraphQLError(
+            ERROR_RESPONSES['query_too_costly'].format(cost, max_cost))
+    report = {'requested': cost, 'depth': depth, 'max_cost': max_cost,
+              'max_depth': max_depth}
+    if user_key is not None:
+        remaining = spend_cost_budget(user_key, cost)
+        if remaining is not None:
+            report['remaining_budget'] = remaining
+    return report
@@ -0,0 +1,37 @@
+from django.db import connection
+
+
+class QueryCounter():
+    """
+    Count the SQL statements executed on the default connection.
+
+    Usage:
+        with QueryCounter() as counter:
+            ...
+        counter.count
+
+    Attributes:
+        count(int): Holds the number of queries executed inside the block.
+        queries(list): Holds the raw SQL of every query executed, kept so
+                       callers can spot repeated statements.
+    """
+
+    def __init__(self, using=connection):
+        self.connection = using
+        self.count = 0
+        self.queries = []
+        self._wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self._wrapper.__exit__(exception_type, exception_value, traceback)
+        return False
@@ -2,6 +2,8 @@ from functools import wraps
 from graphql import GraphQLError
 from graphql.execution.base import ResolveInfo
 
+from healthid.utils.app_utils.identity import get_role_name
+
 
 def user_permission(*param):
     allowed_role = ['Master Admin']
@@ -13,7 +15,7 @@ def user_permission(*param):
         def wrapper(*args, **kwargs):
             info = [arg for arg in args if isinstance(arg, ResolveInfo)]
             user = info[0].context.user
-            if str(user.role) in allowed_role:
+            if get_role_name(user) in allowed_role:
                 return f(*args, **kwargs)
             raise GraphQLError(
                 "Permission denied. You don't "
@@ -0,0 +1,141 @@
+from rest_framework import status
+
+from healthid.utils.customer_utils.handle_customer_csv_upload import\
+    HandleCustomerCSVValidation
+from healthid.utils.messages.products_responses import (
+    PRODUCTS_SUCCESS_RESPONSES
+)
+from healthid.utils.orders_utils.add_supplier import AddSupplier
+from healthid.utils.product_utils.handle_csv_upload import HandleCsvValidations
+
+
+def created_or_bad_request(created):
+    return status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+
+
+def upload_suppliers(handle_upload, user, io_string, on_duplication):
+    res = handle_upload(user=user,
+                        io_string=io_string,
+                        on_duplication=on_duplication)
+    if res['supplier_count'] == 0 and len(res['duplicated_suppliers']):
+        return {
+            "message": "No supplier has been added due to duplication",
+            "duplicatedSuppliers": res['duplicated_suppliers']
+        }, status.HTTP_400_BAD_REQUEST
+    return {
+        "success": "Successfully added supplier(s)",
+        "noOfSuppliersAdded": res['supplier_count'],
+        "duplicatedSuppliers": res['duplicated_suppliers'],
+    }, status.HTTP_201_CREATED
+
+
+def upload_products(user, io_string, on_duplication):
+    result = HandleCsvValidations().handle_csv_upload(
+        io_string=io_string, user=user, on_duplication=on_duplication)
+    return {
+        "message": ("Products successfully added"
+                    if result['product_count']
+                    else "No new products added"),
+        "noOfProductsAdded": result['product_count'],
+        "duplicatedProducts": result['duplicated_products'],
+        "rowsPerSecond": result['rows_per_second'],
+    }, created_or_bad_request(result['product_count'])
+
+
+def upload_mapped_products(handle_upload, user, io_string):
+    result = handle_upload(io_string=io_string, user=user)
+    if not result['business_id']:
+        return {
+            "message": "Business id associated with this user is not found"
+        }, status.HTTP_200_OK
+    return {
+        "message": ("Products successfully added"
+                    if result['product_count']
+                    else "No new products added"),
+        "noOfProductsAdded": result['product_count'],
+        "noOfProductsUpdated": result['update_count'],
+        "noOfErrorsEncountered": result['error_count']
+    }, created_or_bad_request(
+        result['product_count'] or result['update_count'])
+
+
+def upload_customers(handle_upload, user, io_string, counts_duplicates=False):
+    result = handle_upload(io_string=io_string, user=user)
+    message = {}
+    if counts_duplicates:
+        result, message["noOfDuplicates"] = result
+    return {
+        "message": ("Customers successfully added"
+                    if result
+                    else "No new customers added"),
+        "noOfCustomersAdded": result,
+        **message
+    }, created_or_bad_request(result)
+
+
+def upload_batch_info(user, io_string):
+    HandleCsvValidations().handle_batch_csv_upload(user, io_string)
+    return {
+        "success": PRODUCTS_SUCCESS_RESPONSES["batch_upload_success"]
+    }, status.HTTP_201_CREATED
+
+
+def upload_stale_products(user, io_string):
+    result = HandleCsvValidations().unapprove_stale_product(user, io_string)
+    return {
+        "success": PRODUCTS_SUCCESS_RESPONSES["batch_upload_success"],
+        "noOfProductsFlagged": result,
+    }, status.HTTP_201_CREATED
+
+
+CSV_UPLOADS = {
+    'suppliers': lambda user, io_string, on_duplication: upload_suppliers(
+        AddSupplier().handle_csv_upload, user, io_string, on_duplication),
+    'retail_pro_suppliers':
+        lambda user, io_string, on_duplication: upload_suppliers(
+            AddSupplier().retail_pro_suppliers,
+            user, io_string, on_duplication),
+    'quick_books_suppliers':
+        lambda user, io_string, on_duplication: upload_suppliers(
+            AddSupplier().quick_books_suppliers,
+            user, io_string, on_duplication),
+    'products': upload_products,
+    'retail_pro_products':
+        lambda user, io_string, _: upload_mapped_products(
+            HandleCsvValidations().handle_retail_pro_csv_upload,
+            user, io_string),
+    'quick_books_products':
+        lambda user, io_string, _: upload_mapped_products(
+            HandleCsvValidations().handle_quick_box_csv_upload,
+            user, io_string),
+    'customers': lambda user, io_string, _: upload_customers(
+        HandleCustomerCSVValidation().handle_customer_csv_upload,
+        user, io_string),
+    'retail_pro_customers': lambda user, io_string, _: upload_customers(
+        HandleCustomerCSVValidation().handle_cutomer_retail_pro_csv_upload,
+        user, io_string, counts_duplicates=True),
+    'quick_books_customers': lambda user, io_string, _: upload_customers(
+        HandleCustomerCSVValidation().handle_cutomer_quickbooks_csv_upload,
+        user, io_string),
+    'batch_info': lambda user, io_string, _: upload_batch_info(
+        user, io_string),
+    'stale_products': lambda user, io_string, _: upload_stale_products(
+        user, io_string),
+}
+
+
+def process_csv_upload(param, user, io_string, on_duplication=None):
+    """
+    Import the information of a csv file into the database.
+
+    Args:
+        param(str): nature of the information in the csv, one of the keys
+                    of CSV_UPLOADS
+        user(obj): user uploading the file
+        io_string(obj): file like object iterating over the csv lines
+        on_duplication(str): actions to take on duplicated records
+
+    Returns:
+        tuple: the response message and its HTTP status code
+    """
+    return CSV_UPLOADS[param](user, io_string, on_duplication)
@@ -0,0 +1,223 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.utils.encoders import JSONEncoder
+
+from healthid.apps.imports.models import ImportJob
+from healthid.utils.csv_import.csv_upload import process_csv_upload
+from healthid.utils.messages.products_responses import \
+    PRODUCTS_ERROR_RESPONSES
+
+# lines read between two progress updates of a job
+PROGRESS_INTERVAL = 500
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.CSV_IMPORT_WORKERS,
+            thread_name_prefix='csv-import')
+    return _executor
+
+
+class ProgressFile(object):
+    """
+    Iterate over the lines of an uploaded csv file, recording on its
+    import job how much of the file has been read.
+
+    Attributes:
+        job(obj): ImportJob the file belongs to
+        file(obj): text file being read
+        size(int): size of the file in bytes
+        rows_processed(int): lines read since the start of the file
+    """
+
+    def __init__(self, job, file):
+        self.job = job
+        self.file = file
+        self.size = os.fstat(file.fileno()).st_size or 1
+        self.bytes_read = 0
+        self.rows_processed = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self.file)
+        self.bytes_read += len(line.encode('utf-8'))
+        self.rows_processed += 1
+        if self.rows_processed % PROGRESS_INTERVAL == 0:
+            self.record_progress()
+        return line
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset):
+        # imports reading the file twice report the progress of each pass
+        self.bytes_read = self.rows_processed = 0
+        return self.file.seek(offset)
+
+    def record_progress(self):
+        ImportJob.objects.filter(id=self.job.id).update(
+            rows_processed=self.rows_processed,
+            progress=min(100, self.bytes_read * 100 // self.size))
+
+
+def queue_import_job(user, import_type, csv_file, on_duplication=None):
+    """
+    Store an uploaded csv file on disk and queue it for import.
+
+    Args:
+        user(obj): user uploading the file
+        import_type(str): nature of the information in the csv
+        csv_file(obj): uploaded file
+        on_duplication(str): actions to take on duplicated records
+
+    Returns:
+        job(obj): the queued ImportJob
+    """
+    os.makedirs(settings.CSV_IMPORT_DIR, exist_ok=True)
+    job = ImportJob(user=user, import_type=import_type,
+                    file_name=csv_file.name, on_duplication=on_duplication)
+    job.file_path = os.path.join(settings.CSV_IMPORT_DIR, f'{job.id}.csv')
+    with open(job.file_path, 'wb') as stored_file:
+        for chunk in csv_file.chunks():
+            stored_file.write(chunk)
+    job.save()
+    start_import_job(job.id)
+    return job
+
+
+def start_import_job(job_id):
+    """
+    Hand a queued job to the worker pool once the transaction creating it
+    commits, or run it right away when no workers are configured.
+    """
+    if not settings.CSV_IMPORT_WORKERS:
+        run_import_job(job_id)
+        return
+    transaction.on_commit(
+        lambda: get_executor().submit(run_import_job_in_worker, job_id))
+
+
+def run_import_job_in_worker(job_id):
+    close_old_connections()
+    try:
+        run_import_job(job_id)
+    finally:
+        connection.close()
+
+
+def run_import_job(job_id):
+    """
+    Import the csv file of a queued job and store the outcome on the job.
+
+    Args:
+        job_id(str): id of the ImportJob to run. Jobs which are no longer
+                     queued, e.g. already claimed by another worker, are
+                     left alone.
+    """
+    claimed = ImportJob.objects.filter(
+        id=job_id, status=ImportJob.QUEUED).update(
+            status=ImportJob.PROCESSING, started_at=timezone.now())
+    if not claimed:
+        return
+    job = ImportJob.objects.select_related('user').get(id=job_id)
+    job.status = ImportJob.FAILED
+    try:
+        with open(job.file_path, encoding='utf-8', newline='') as csv_file:
+            progress_file = ProgressFile(job, csv_file)
+            try:
+                message, status_code = process_csv_upload(
+                    job.import_type, job.user, progress_file,
+                    job.on_duplication)
+                job.status, job.progress = ImportJob.COMPLETED, 100
+            finally:
+                job.rows_processed = progress_file.rows_processed
+    except APIException as error:
+        message, status_code = error.detail, error.status_code
+    except Exception as error:
+        message = {'error': str(error)}
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+    job.status_code = status_code
+    job.result = json.loads(json.dumps(message, cls=JSONEncoder))
+    job.finished_at = timezone.now()
+    job.save()
+    if os.path.exists(job.file_path):
+        os.remove(job.file_path)
+
+
+def fail_import_jobs(jobs, message):
+    """
+    Mark jobs as failed with an error message.
+
+    Returns:
+        int: number of jobs failed
+    """
+    return jobs.update(
+        status=ImportJob.FAILED,
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        result={'error': message}, finished_at=timezone.now())
+
+
+def resume_import_jobs():
+    """
+    Scheduled job which hands back to the workers the jobs still queued,
+    e.g. after the server restarted before they were picked up, and fails
+    the jobs whose worker stopped half way.
+
+    Queued jobs are only resumed when their file is in the CSV_IMPORT_DIR
+    of this process. With storage that is not shared with the web
+    processes, e.g. on separate Heroku dynos, they are failed once
+    CSV_IMPORT_TIMEOUT is over instead.
+    """
+    now = timezone.now()
+    timed_out = now - timedelta(seconds=settings.CSV_IMPORT_TIMEOUT)
+    fail_import_jobs(
+        ImportJob.objects.filter(
+            status=ImportJob.PROCESSING, started_at__lte=timed_out),
+        PRODUCTS_ERROR_RESPONSES['import_job_stalled'])
+    stale_jobs = ImportJob.objects.filter(
+        status=ImportJob.QUEUED,
+        created_at__lte=now - timedelta(minutes=5))
+    lost_job_ids = []
+    for job_id, file_path, created_at in stale_jobs.values_list(
+            'id', 'file_path', 'created_at'):
+        if os.path.exists(file_path):
+            start_import_job(job_id)
+        elif created_at <= timed_out:
+            lost_job_ids.append(job_id)
+    fail_import_jobs(
+        ImportJob.objects.filter(
+            id__in=lost_job_ids, status=ImportJob.QUEUED),
+        PRODUCTS_ERROR_RESPONSES['import_file_missing'])
+
+
+def import_job_status(job):
+    """
+    Describe the state of an import job in the format returned by the
+    csv upload endpoints.
+    """
+    return {
+        "jobId": job.id,
+        "importType": job.import_type,
+        "fileName": job.file_name,
+        "status": job.status,
+        "rowsProcessed": job.rows_processed,
+        "progress": job.progress,
+        "statusCode": job.status_code,
+        "result": job.result,
+        "startedAt": job.started_at,
+        "finishedAt": job.finished_at
+    }
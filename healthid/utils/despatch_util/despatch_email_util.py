@@ -1,18 +1,26 @@
+import threading
+from collections import Counter
+from datetime import timedelta
+
 from django.conf import settings
-from django.core.mail import EmailMessage
-from healthid.apps.authentication.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
 from healthid.apps.despatch_queue.models import DespatchQueue, Despatch_Meta
 from healthid.utils.app_utils.database import SaveContextManager
 from django.template.loader import render_to_string
-from healthid.utils.app_utils.database import get_model_object
 from healthid.utils.date_utils.is_same_date import (
     is_same_date, remove_microseconds, remove_seconds)
+from healthid.utils.notifications_utils.notification_executor import \
+    submit_notification
 from smtplib import (
     SMTPException, SMTPAuthenticationError,
     SMTPServerDisconnected, SMTPConnectError)
-import threading
 from django.utils import timezone
 
+# despatches sent, retried and failed by the workers of this process
+DESPATCH_COUNTERS = Counter(sent=0, retried=0, failed=0, latency_seconds=0)
+despatch_counters_lock = threading.Lock()
+
 
 def notify(users, **kwargs):
     '''Function to notify the users
@@ -39,47 +47,184 @@ def notify(users, **kwargs):
                     timezone.localtime(
                         remove_seconds(
                             remove_microseconds(timezone.now())))):
-                thread = threading.Thread(target=send_email_notifications(
-                    subject,
-                    user,
-                    body, d_queue))
-                thread.start()
+                # claimed so that the queue worker leaves it alone
+                change_send_status(d_queue, DespatchQueue.PROCESSING)
+                submit_notification(
+                    send_email_notifications, subject, user, body, d_queue)
             despatch_queues.append(d_queue)
     return despatch_queues
 
 
-def queue_emails_job():
-    email_parts = {}
+def claim_due_despatches(batch_size):
+    """
+    Claim the pending despatches which are due, so that several workers
+    can send them in parallel without sending any of them twice.
+
+    Args:
+        batch_size(int): maximum number of despatches to claim
+
+    Returns:
+        list: claimed DespatchQueue objects with their recipient and meta
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        despatch_ids = list(DespatchQueue.objects.select_for_update(
+            skip_locked=True).filter(
+                status=DespatchQueue.PENDING, due_date__lte=now).order_by(
+                    'due_date').values_list('id', flat=True)[:batch_size])
+        DespatchQueue.objects.filter(id__in=despatch_ids).update(
+            status=DespatchQueue.PROCESSING, updated_at=now)
+    return list(DespatchQueue.objects.filter(
+        id__in=despatch_ids).select_related('recipient').prefetch_related(
+            'despatch').order_by('due_date'))
+
+
+def release_stale_despatches():
+    """
+    Hand back to the queue the despatches claimed by a worker which
+    stopped before sending them.
+    """
+    return DespatchQueue.objects.filter(
+        status=DespatchQueue.PROCESSING,
+        updated_at__lte=timezone.now() - timedelta(
+            seconds=settings.DESPATCH_CLAIM_TIMEOUT)).update(
+                status=DespatchQueue.PENDING, updated_at=timezone.now())
+
+
+def build_despatch_email(despatch_q, connection):
+    """
+    Build the email of a claimed despatch from its meta.
+
+    Returns:
+        obj: EmailMessage, or None when there is nothing to send to the
+             recipient
+    """
+    email_parts = {despatch_meta.dataKey: despatch_meta.dataValue
+                   for despatch_meta in despatch_q.despatch.all()}
+    user = despatch_q.recipient
+    if not (user.email_notification_permissions and email_parts.get('body')):
+        return None
+    html_body = render_to_string('email_alerts/email_base.html', {
+        'template_type': 'Email Notification',
+        'small_text_detail': email_parts['body'],
+    })
+    email = EmailMessage(subject=email_parts.get('subject'),
+                         body=html_body,
+                         from_email=settings.DEFAULT_FROM_EMAIL,
+                         to=[str(user.email)],
+                         connection=connection)
+    email.content_subtype = 'html'
+    return email
+
+
+def retry_despatch(despatch_q, error):
+    """
+    Queue a despatch whose sending failed to be sent again after a delay
+    doubling with every attempt, or mark it failed once it has used up
+    its attempts.
+    """
+    despatch_q.attempts += 1
+    despatch_q.last_error = str(error)
+    if despatch_q.attempts >= settings.DESPATCH_MAX_ATTEMPTS:
+        despatch_q.status = DespatchQueue.FAILED
+        record_despatch_counter('failed')
+    else:
+        despatch_q.status = DespatchQueue.PENDING
+        despatch_q.due_date = timezone.now() + timedelta(
+            seconds=settings.DESPATCH_RETRY_DELAY *
+            2 ** (despatch_q.attempts - 1))
+        record_despatch_counter('retried')
+
+
+def send_despatch(connection, despatch_q):
     try:
-        despatch_queue = DespatchQueue.objects.all()
-        despatch_queue_meta = Despatch_Meta.objects.all()
-        if len(despatch_queue) > 0:
-            for despatch_q in despatch_queue:
-                id = despatch_q.recipient_id
-                if timezone.localtime(remove_seconds(despatch_q.due_date)) <= \
-                    timezone.localtime(
-                    remove_seconds(remove_microseconds(timezone.now()))) and \
-                        despatch_q.status == 'pending':
-                    email_part = get_model_object(User, 'id', id)
-                    for despatch_meta in despatch_queue_meta:
-                        if despatch_meta.__dict__['despatch_id'] ==\
-                                despatch_q.__dict__['id']:
-                            email_parts['email'] = email_part
-                            email_parts[despatch_meta.__dict__['dataKey']
-                                        ] = despatch_meta.__dict__['dataValue']
-                    if email_parts:
-                        send_email_notifications(
-                            email_parts['subject'],
-                            email_parts['email'],
-                            email_parts['body'], despatch_q)
-    except Exception:
-        pass
+        email = build_despatch_email(despatch_q, connection)
+        if email is None:
+            despatch_q.status = DespatchQueue.CANCELLED
+            return
+        connection.send_messages([email])
+    except (SMTPServerDisconnected, SMTPConnectError,
+            SMTPAuthenticationError):
+        # the connection is unusable, the rest of the batch is retried
+        raise
+    except Exception as error:
+        # a despatch which cannot be built or sent, e.g. with a bad header,
+        # is retried and then failed without holding back the batch
+        retry_despatch(despatch_q, error)
+    else:
+        despatch_q.attempts += 1
+        despatch_q.status = DespatchQueue.SENT
+        despatch_q.sent_at = timezone.now()
+        record_despatch_counter(
+            'sent', (despatch_q.sent_at - despatch_q.due_date).total_seconds())
+
+
+def send_despatch_batch(despatches):
+    """
+    Send the emails of claimed despatches over a single SMTP connection
+    and save the outcome of each of them, even when the batch stops half
+    way, so that the despatches sent are not sent again.
+    """
+    pending = list(despatches)
+    try:
+        with get_connection() as connection:
+            while pending:
+                send_despatch(connection, pending[0])
+                pending.pop(0)
+    except (SMTPException, OSError) as error:
+        for despatch_q in pending:
+            retry_despatch(despatch_q, error)
+    finally:
+        for despatch_q in despatches:
+            despatch_q.updated_at = timezone.now()
+        DespatchQueue.objects.bulk_update(
+            despatches, ['status', 'attempts', 'due_date', 'sent_at',
+                         'last_error', 'updated_at'])
+
+
+def queue_emails_job():
+    """
+    Scheduled job sending the email despatches which are due, a batch at
+    a time, until none are left or DESPATCH_MAX_BATCHES batches were sent.
+    """
+    release_stale_despatches()
+    for _ in range(settings.DESPATCH_MAX_BATCHES):
+        despatches = claim_due_despatches(settings.DESPATCH_BATCH_SIZE)
+        if not despatches:
+            return
+        send_despatch_batch(despatches)
+
+
+def record_despatch_counter(counter, latency=None):
+    with despatch_counters_lock:
+        DESPATCH_COUNTERS[counter] += 1
+        if latency is not None:
+            DESPATCH_COUNTERS['latency_seconds'] += latency
+
+
+def get_despatch_counters():
+    """
+    Get the counters of the despatches sent by this process.
+
+    Returns:
+        dict: number of despatches sent, retried and failed, with the
+              average delay in seconds between their due date and when
+              they were sent
+    """
+    with despatch_counters_lock:
+        counters = dict(DESPATCH_COUNTERS)
+    latency = counters.pop('latency_seconds')
+    counters['average_latency_seconds'] = \
+        latency / counters['sent'] if counters['sent'] else 0
+    return counters
 
 
 def change_send_status(d_queue, status):
     '''Function to change received status
     '''
     d_queue.status = status
+    if status == DespatchQueue.SENT:
+        d_queue.sent_at = timezone.now()
     with SaveContextManager(d_queue, model=DespatchQueue):
         return
 
@@ -94,7 +239,9 @@ def send_email_notifications(subject, user, body, despatch_meta):
         'template_type': 'Email Notification',
         'small_text_detail': body,
     }
-    if user.email_notification_permissions and body:
+    if not (user.email_notification_permissions and body):
+        change_send_status(despatch_meta, DespatchQueue.CANCELLED)
+    else:
         html_body = render_to_string(
             template,
             context
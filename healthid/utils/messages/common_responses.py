@@ -42,4 +42,11 @@ ERROR_RESPONSES = {
     "payment_terms_on_credit": "On credit payment terms requires "
                                  "at least 1 credit day or more",
     "proposed_edit_inexistant": "Proposed Edit of id {} does not exist",
+    "invalid_cursor": "The pagination cursor is not valid",
+    "query_too_deep": "Query depth of {} exceeds the maximum depth of {}",
+    "query_too_costly": "Query cost of {} exceeds the maximum cost of {}, "
+                        "paginate or select fewer nested lists",
+    "query_too_complex": "Query has too many fields to be analyzed",
+    "query_budget_exceeded": "Query cost budget exceeded, "
+                             "try again in a minute",
 }
@@ -68,5 +68,9 @@ PRODUCTS_ERROR_RESPONSES = {
                           "Please check its expiry and delivery dates.",
     "promotion_generated_success": "{}, generated successfully!",
     "update_price_error": "You can update only one value, either "
-                            "markup or sales_price"
+                            "markup or sales_price",
+    "import_job_stalled": "The import stopped before finishing. "
+                          "Please upload the file again.",
+    "import_file_missing": "The uploaded file is no longer available. "
+                           "Please upload it again."
 }
@@ -1,32 +1,42 @@
 from django.conf import settings
 from django.core.mail import EmailMessage
+from django.db import transaction
 from healthid.apps.notifications.models import Notification, NotificationMeta
-from healthid.utils.app_utils.database import SaveContextManager
+from healthid.utils.notifications_utils.notification_executor import \
+    submit_notification
+from healthid.utils.notifications_utils.pusher_transport import (
+    notification_event, publish_events)
 from django.template.loader import render_to_string
 
 
 def notify(users, subject, body, event_name=None,
            html_subject=None, html_body=None):
     '''
-    Function to notify the appropriate user
+    Function to notify the appropriate users, creating their notifications
+    in bulk and publishing a single event for all of them once committed
     '''
-    notifications = []
-    for user in users:
-        notification = Notification(subject=str(subject),
-                                    user=user,
-                                    event_name=event_name
-                                    or Notification().event_name)
-
-        with SaveContextManager(notification) as notification:
-            notification_meta = NotificationMeta.objects.create(
-                notification_id=notification.id,
-                body=str(body))
-
-            notification.notification_meta = notification_meta
-            notifications.append(notification)
-
-            if html_subject and html_body:
-                send_email_notifications(html_subject, user, html_body)
+    event_name = event_name or Notification().event_name
+    notifications = [
+        Notification(subject=str(subject), user=user, event_name=event_name)
+        for user in users]
+    if not notifications:
+        return notifications
+    with transaction.atomic():
+        Notification.objects.bulk_create(notifications)
+        notification_metas = NotificationMeta.objects.bulk_create([
+            NotificationMeta(notification=notification, body=str(body))
+            for notification in notifications])
+    for notification, notification_meta in zip(
+            notifications, notification_metas):
+        notification.notification_meta = notification_meta
+
+    if subject:
+        submit_notification(publish_events, [
+            notification_event(event_name, subject, body)])
+    if html_subject and html_body:
+        for user in users:
+            submit_notification(
+                send_email_notifications, html_subject, user, html_body)
     return notifications
 
 
@@ -0,0 +1,128 @@
+import atexit
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+
+class NotificationExecutor(object):
+    """
+    Bounded thread pool sending notifications off the request and
+    scheduler threads.
+
+    At most max_workers notifications run at once and max_queue more
+    wait for a worker. When the queue is full, submitting waits up to
+    submit_timeout seconds for room and then runs the notification on
+    the submitting thread, so that notifications slow their producers
+    down rather than being dropped or piling up in memory. With no
+    workers, notifications run on the submitting thread.
+
+    Attributes:
+        max_workers(int): number of worker threads
+        max_queue(int): number of notifications waiting for a worker
+        submit_timeout(float): seconds to wait for room in the queue
+    """
+
+    def __init__(self, max_workers, max_queue, submit_timeout):
+        self.max_workers = max_workers
+        self.submit_timeout = submit_timeout
+        self.slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self.lock = threading.Lock()
+        self.counters = Counter(submitted=0, completed=0, failed=0,
+                                ran_inline=0, run_seconds=0)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='notifications') if max_workers else None
+
+    def count(self, counter, value=1):
+        with self.lock:
+            self.counters[counter] += value
+
+    def run(self, function, args, kwargs):
+        started_at = time.monotonic()
+        try:
+            function(*args, **kwargs)
+        except Exception:
+            self.count('failed')
+            traceback.print_exc(file=sys.stdout)
+        else:
+            self.count('completed')
+        self.count('run_seconds', time.monotonic() - started_at)
+
+    def run_in_worker(self, function, args, kwargs):
+        close_old_connections()
+        try:
+            self.run(function, args, kwargs)
+        finally:
+            self.slots.release()
+            connection.close()
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Run function(*args, **kwargs) on a worker thread, or on this
+        thread when no worker is available in time.
+        """
+        self.count('submitted')
+        if self.executor and self.slots.acquire(timeout=self.submit_timeout):
+            try:
+                self.executor.submit(
+                    self.run_in_worker, function, args, kwargs)
+                return
+            except RuntimeError:
+                # the executor was shut down
+                self.slots.release()
+        self.count('ran_inline')
+        self.run(function, args, kwargs)
+
+    def get_counters(self):
+        """
+        Returns:
+            dict: notifications submitted, completed, failed and run on
+                  the submitting thread, the number still queued or
+                  running and the average run time in seconds
+        """
+        with self.lock:
+            counters = dict(self.counters)
+        run_seconds = counters.pop('run_seconds')
+        finished = counters['completed'] + counters['failed']
+        counters['pending'] = counters['submitted'] - finished
+        counters['average_run_seconds'] = \
+            run_seconds / finished if finished else 0
+        return counters
+
+    def shutdown(self, wait=True):
+        """
+        Stop accepting notifications, running the ones already queued
+        before returning when wait is True.
+        """
+        if self.executor:
+            self.executor.shutdown(wait=wait)
+
+
+notification_executor = NotificationExecutor(
+    settings.NOTIFICATION_WORKERS, settings.NOTIFICATION_QUEUE_SIZE,
+    settings.NOTIFICATION_SUBMIT_TIMEOUT)
+atexit.register(notification_executor.shutdown)
+
+
+def submit_notification(function, *args, **kwargs):
+    """
+    Send a notification in the background once the current transaction
+    commits, so that the workers see the records it refers to.
+
+    Args:
+        function(callable): function sending the notification
+        args: positional arguments of the function
+        kwargs: keyword arguments of the function
+    """
+    if not notification_executor.executor:
+        # notifications run inline see the uncommitted records
+        notification_executor.submit(function, *args, **kwargs)
+        return
+    transaction.on_commit(
+        lambda: notification_executor.submit(function, *args, **kwargs))
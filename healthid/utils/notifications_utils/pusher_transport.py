@@ -0,0 +1,70 @@
+import threading
+
+from django.conf import settings
+from healthid.settings import pusher
+
+# channel the in-app notification events are published on
+NOTIFICATION_CHANNEL = 'notification-channel'
+
+# events published in a single call, the most Pusher accepts
+PUSHER_BATCH_SIZE = 10
+
+
+class LocalTransport(object):
+    """
+    Transport keeping the events published in memory instead of sending
+    them to Pusher, for the tests and offline development.
+
+    Attributes:
+        events(list): events published, oldest first
+    """
+
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+    def trigger_batch(self, batch):
+        with self.lock:
+            self.events.extend(batch)
+
+    def clear(self):
+        with self.lock:
+            self.events.clear()
+
+
+local_transport = LocalTransport()
+
+
+def get_transport():
+    """
+    Returns:
+        obj: the Pusher client, or the local transport when
+             PUSHER_TRANSPORT is 'local'
+    """
+    if settings.PUSHER_TRANSPORT == 'local':
+        return local_transport
+    return pusher
+
+
+def notification_event(event_name, subject, body):
+    """
+    Returns:
+        dict: event telling the clients about notifications
+    """
+    return {
+        'channel': NOTIFICATION_CHANNEL,
+        'name': event_name,
+        'data': {'subject': str(subject), 'message': str(body)},
+    }
+
+
+def publish_events(events):
+    """
+    Publish events with one call per PUSHER_BATCH_SIZE of them.
+
+    Args:
+        events(list): events built by notification_event()
+    """
+    transport = get_transport()
+    for start in range(0, len(events), PUSHER_BATCH_SIZE):
+        transport.trigger_batch(events[start:start + PUSHER_BATCH_SIZE])
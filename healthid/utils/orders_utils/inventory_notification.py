@@ -1,10 +1,8 @@
 from collections import namedtuple
 from healthid.apps.outlets.models import Outlet
-from healthid.apps.sales.sales_velocity import SalesVelocity
-from healthid.apps.products.models import Product, ProductMeta
+from healthid.apps.products.models import Product
 from healthid.utils.app_utils.send_mail import SendMail
-from healthid.utils.messages.sales_responses import \
-    SALES_ERROR_RESPONSES
+from healthid.utils.sales_utils.sale_velocity import get_sales_velocities
 
 
 def send_manager_email(products, managers_email):
@@ -43,6 +41,7 @@ def product_below_stock(outlet, business_products, is_cron_job=True):
         list: tuple(product_name, quantity)
     """
     products_below_stock = []
+    sales_velocities = get_sales_velocities(outlet, business_products)
     for product in business_products:
         reorder_point = product.reorder_point
         reorder_max = product.reorder_max
@@ -55,12 +54,7 @@ def product_below_stock(outlet, business_products, is_cron_job=True):
 
         remaining_stock = product.quantity_in_stock
 
-        sales_velocity = ProductMeta.objects.filter(
-            dataKey = 'Sale Velocity',
-            product_id = product.id
-        ).values_list('dataValue',flat=True).first() or 1
-
-        sales_velocity = float(sales_velocity)
+        sales_velocity = sales_velocities.get(product.id, 1)
 
         minimum_product_unit = reorder_point * sales_velocity
         maximum_product_unit = reorder_max * sales_velocity
@@ -1,5 +1,6 @@
 from healthid.apps.preference.models import OutletPreference
 from graphql import GraphQLError
+from healthid.utils.app_utils.identity import memoize_identity
 from healthid.utils.messages.outlet_responses import OUTLET_ERROR_RESPONSES
 
 
@@ -12,13 +13,12 @@ def get_outlet_preference_by_user(user):
         outlet_preference(obj): if user is active to an outlet
         None: if user is not active to any outlet
     """
-    outlet_user = user.outletuser_set.filter(is_active_outlet=True)
-    if outlet_user.exists():
-        outlet_id = outlet_user.first().outlet_id
-        outlet_preference = OutletPreference.objects.filter(
-            outlet_id=outlet_id).first()
-        return outlet_preference
-    return None
+    return memoize_identity(
+        user, 'outlet_preference',
+        lambda: OutletPreference.objects.filter(
+            outlet__outletuser__user=user,
+            outlet__outletuser__is_active_outlet=True
+        ).order_by('outlet__outletuser__pk').first())
 
 
 def get_user_outlet_currency_id(user):
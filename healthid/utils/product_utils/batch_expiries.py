@@ -1,65 +1,110 @@
-import threading
-from datetime import datetime
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import attrgetter
+
 from dateutil.relativedelta import relativedelta
+from django.db.models import Case, F, IntegerField, Q, Value, When
 from django.template.loader import render_to_string
-from healthid.apps.products.models import BatchInfo
+from django.utils import timezone
+from healthid.apps.authentication.models import User
+from healthid.apps.products.models import BatchExpiryNotice, BatchInfo
 from healthid.utils.notifications_utils.handle_notifications import notify
+from healthid.utils.notifications_utils.notification_executor import \
+    submit_notification
 
+# days before expiry from which the outlet of a batch is notified, once per
+# window, the last window being for batches that have expired
+EXPIRY_WINDOWS = (365, 90, 30, 0)
 
-def notify_about_expired_products():
-    '''Method to extract expired batches from the database
+
+def expiry_window(today):
+    '''Expression of the narrowest expiry window a batch is in
     '''
-    expired_batches = []
-    today = datetime.today().date()
-    batches = BatchInfo.objects.all()
-    if batches:
-        for batch in batches:
-            expiry_date = batch.expiry_date
-            days_to_expiry = (expiry_date - today).days
-            if days_to_expiry <= 365:
-                batch = {
-                    'batch': batch,
-                    'days_to_expiry': days_to_expiry
-                }
-                expired_batches.append(batch)
-        thread = threading.Thread(
-            target=trigger_notification(expired_batches),
-            daemon=True)
-        thread.start()
+    whens = [When(expiry_date__lt=today, then=Value(0))]
+    whens += [
+        When(expiry_date__lte=today + timedelta(days=days), then=Value(days))
+        for days in sorted(EXPIRY_WINDOWS) if days]
+    return Case(*whens, output_field=IntegerField())
+
+
+def batches_to_notify(today):
+    '''Batches in stock that entered an expiry window their outlet has
+    not been notified about, by outlet and expiry date
 
+    Args:
+        today(date): date the expiry windows start from
 
-def trigger_notification(expired_batches):
-    '''Method to trigger a notification to Master Admin users
+    Returns:
+        batches(obj): query set of the batches
     '''
+    widest_window = today + timedelta(days=max(EXPIRY_WINDOWS))
+    return BatchInfo.objects.filter(
+        expiry_date__lte=widest_window, sold_out=False,
+        outlet__isnull=False).annotate(
+        window=expiry_window(today)).filter(
+        Q(expiry_notice__isnull=True) |
+        Q(expiry_notice__window_days__gt=F('window'))).select_related(
+        'product', 'outlet').order_by('outlet_id', 'expiry_date', 'id')
 
-    for batch in expired_batches:
-        outlet = batch['batch'].outlet
-
-        users = outlet.active_outlet_users
-        outlet_master_admins = [
-            user for user in users if str(user.role) == 'Master Admin']
-        batch_number = batch["batch"].batch_no
-        message = f'Products with batch no. { batch_number } are within \
-12 months to expiry!'
-
-        products = batch['batch'].product.all()
-        product_names = [product.product_name for product in products]
-        html_body = render_to_string(
-            'batch_expiries/expiry_notification.html',
-            {
-                'batch': batch['batch'],
-                'product': product_names,
-                'outlet': batch['batch'].outlet.name,
-                'days_to_expiry': batch["days_to_expiry"]
-            })
-        subject = 'Expired Products!'
-        event_name = 'batch-expiry-notification-event'
-        thread = threading.Thread(target=notify(users=outlet_master_admins,
-                                                subject=subject,
-                                                body=message,
-                                                event_name=event_name,
-                                                html_body=html_body))
-        thread.start()
+
+def notify_about_expired_products(today=None):
+    '''Method to notify the Master Admins of every outlet about its
+    batches entering an expiry window, with one digest per outlet
+    '''
+    today = today or datetime.today().date()
+    batches = list(batches_to_notify(today))
+    for _, outlet_batches in groupby(batches, key=attrgetter('outlet_id')):
+        outlet_batches = list(outlet_batches)
+        submit_notification(
+            trigger_notification, outlet_batches[0].outlet, outlet_batches,
+            today)
+    record_expiry_notices(batches)
+    return batches
+
+
+def record_expiry_notices(batches):
+    '''Record the expiry window of notified batches so that the next scans
+    only pick the batches entering a narrower one
+    '''
+    notices = BatchExpiryNotice.objects.in_bulk(
+        [batch.id for batch in batches])
+    new_notices = []
+    for batch in batches:
+        notice = notices.get(batch.id)
+        if notice is None:
+            new_notices.append(BatchExpiryNotice(
+                batch=batch, window_days=batch.window))
+        else:
+            notice.window_days = batch.window
+            notice.notified_at = timezone.now()
+    BatchExpiryNotice.objects.bulk_create(new_notices)
+    BatchExpiryNotice.objects.bulk_update(
+        list(notices.values()), ['window_days', 'notified_at'])
+
+
+def trigger_notification(outlet, batches, today):
+    '''Method to send the Master Admin users of an outlet a digest of its
+    batches nearing expiry
+    '''
+    outlet_master_admins = User.objects.filter(
+        outletuser__outlet=outlet, outletuser__is_active_outlet=True,
+        role__name='Master Admin')
+    expiring_batches = [{
+        'batch_no': batch.batch_no,
+        'product': batch.product.product_name if batch.product else '',
+        'expiry_date': batch.expiry_date,
+        'days_to_expiry': (batch.expiry_date - today).days,
+    } for batch in batches]
+    message = f'{len(batches)} product batch(es) in {outlet.name} have \
+expired or are within 12 months to expiry!'
+    html_body = render_to_string(
+        'batch_expiries/expiry_notification.html',
+        {'outlet': outlet.name, 'batches': expiring_batches})
+    notify(users=list(outlet_master_admins),
+           subject='Expired Products!',
+           body=message,
+           event_name='batch-expiry-notification-event',
+           html_body=html_body)
 
 
 def generate_expiry_notification(expired_batches):
@@ -80,11 +125,10 @@ def generate_expiry_notification(expired_batches):
         }
         expired_products.append(message)
     event_name = 'expiry-notification-event'
-    thread = threading.Thread(target=notify(users=outlet_user,
-                                            subject='Expired Products!',
-                                            body=message,
-                                            event_name=event_name, ))
-    thread.start()
+    notify(users=outlet_user,
+           subject='Expired Products!',
+           body=message,
+           event_name=event_name, )
 
 
 def notify_pusher_about_expired_products():
@@ -104,7 +148,4 @@ def notify_pusher_about_expired_products():
                     'days_to_expiry': days_to_expiry
                 }
                 expired_batches.append(batch)
-    thread = threading.Thread(
-        target=generate_expiry_notification(expired_batches),
-        daemon=True)
-    thread.start()
+    submit_notification(generate_expiry_notification, expired_batches)
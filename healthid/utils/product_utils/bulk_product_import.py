@@ -0,0 +1,282 @@
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Lower
+from rest_framework.exceptions import ValidationError
+
+from healthid.apps.business.models import Business
+from healthid.apps.orders.models.suppliers import SuppliersMeta
+from healthid.apps.products.models import (DispensingSize, Product,
+                                           ProductCategory, ProductMeta)
+from healthid.utils.app_utils.identifiers import assign_identifiers
+from healthid.utils.messages.common_responses import ERROR_RESPONSES
+from healthid.utils.product_utils.product_search import \
+    update_search_vectors
+
+
+def lowered_names(model, field, names, **filters):
+    """
+    Fetch the rows of a model whose field matches any of several names,
+    ignoring case, with a single query.
+
+    Args:
+        model(class): model to look the names up in
+        field(str): name of the field holding the names
+        names(set): lowered names to look for
+        filters: additional filters on the model
+
+    Returns:
+        queryset: matching rows annotated with their 'lowered_name'
+    """
+    return model.objects.annotate(lowered_name=Lower(field)).filter(
+        lowered_name__in=names, **filters)
+
+
+class BulkProductImport(object):
+    """
+    Import products from the rows of a validated CSV file.
+
+    The rows are processed in chunks. Every lookup a chunk needs is loaded
+    into dictionaries up front and its products are inserted together, so
+    the number of queries depends on the number of chunks rather than on
+    the number of rows.
+
+    Attributes:
+        user(obj): user importing the products
+        on_duplication(dict): action to take on a duplicated product, keyed
+                              by lowered product name
+        chunk_size(int): number of products inserted per query
+    """
+
+    def __init__(self, user, on_duplication=None, chunk_size=1000):
+        self.user = user
+        self.on_duplication = on_duplication or {}
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def row_names(row):
+        return {
+            'name': row.get('name') or row.get('product name'),
+            'category': row.get('category') or row.get('product category'),
+            'dispensing size': (row.get('dispensing size') or
+                                row.get('measurement unit')),
+            'preferred supplier': row.get('preferred supplier'),
+            'backup supplier': row.get('backup supplier'),
+        }
+
+    def load_lookups(self, rows, business_ids):
+        """
+        Load the categories, suppliers, dispensing sizes and existing
+        products referenced by the rows, keyed by lowered name.
+        """
+        names = {key: set() for key in self.row_names({})}
+        for row in rows:
+            for key, value in self.row_names(row).items():
+                names[key].add((value or '').lower())
+        supplier_names = names['preferred supplier'] | \
+            names['backup supplier']
+
+        # categories of the user's first business win, as they always have
+        business_order = {
+            business_id: index
+            for index, business_id in enumerate(business_ids)}
+        categories = {}
+        for category in sorted(
+                lowered_names(ProductCategory, 'name', names['category'],
+                              business_id__in=business_ids).values(
+                    'id', 'business_id', 'is_vat_applicable',
+                    'loyalty_weight', 'lowered_name'),
+                key=lambda category: business_order[
+                    category['business_id']]):
+            categories.setdefault(category['lowered_name'], category)
+
+        return {
+            'categories': categories,
+            'suppliers': dict(lowered_names(
+                SuppliersMeta, 'display_name', supplier_names
+            ).values_list('lowered_name', 'supplier_id')),
+            'dispensing_sizes': dict(lowered_names(
+                DispensingSize, 'name', names['dispensing size']
+            ).values_list('lowered_name', 'id')),
+            'products': set(lowered_names(
+                Product, 'product_name', names['name'],
+                business_id__in=business_ids
+            ).values_list('lowered_name', flat=True))
+        }
+
+    def check_row(self, row, lookups):
+        """
+        Resolve the references of a row.
+
+        Returns:
+            references(dict): the category, suppliers and dispensing size
+                              the row refers to
+            errors(dict): error message per column of the row
+        """
+        names = self.row_names(row)
+        references = {
+            'category': lookups['categories'].get(
+                (names['category'] or '').lower()),
+            'dispensing_size_id': lookups['dispensing_sizes'].get(
+                (names['dispensing size'] or '').lower()),
+            'preferred_supplier_id': lookups['suppliers'].get(
+                (names['preferred supplier'] or '').lower()),
+            'backup_supplier_id': lookups['suppliers'].get(
+                (names['backup supplier'] or '').lower()),
+        }
+        errors = {}
+        if references['category'] is None:
+            errors['category'] = "This category '{}' does not exist".format(
+                names['category'])
+        if references['dispensing_size_id'] is None:
+            errors['dispensing size'] = \
+                'DispensingSize with Dispensing size {} does not ' \
+                'exist.'.format(names['dispensing size'])
+        for column in ('preferred supplier', 'backup supplier'):
+            if references[column.replace(' ', '_') + '_id'] is None:
+                errors[column] = \
+                    'SuppliersMeta with Display name {} does not ' \
+                    'exist.'.format(names[column])
+        return references, errors
+
+    def build_product(self, row, references):
+        category = references['category']
+        vat_status = row.get('vat status').lower() == 'vat' \
+            if row.get('vat status') \
+            else category.get('is_vat_applicable')
+        loyalty_weight = row.get('loyalty weight') \
+            if str(row.get('loyalty weight')).isdigit() \
+            else category.get('loyalty_weight')
+        average_weekly_sales = settings.MOCK_AVERAGE_WEEKLY_SALES
+        return Product(
+            product_category_id=category.get('id'),
+            business_id=category.get('business_id'),
+            product_name=self.row_names(row)['name'],
+            dispensing_size_id=references['dispensing_size_id'],
+            description=row.get('description') or '',
+            brand=row.get('brand') or '',
+            manufacturer=row.get('manufacturer') or '',
+            vat_status=vat_status,
+            preferred_supplier_id=references['preferred_supplier_id'],
+            backup_supplier_id=references['backup_supplier_id'],
+            image=row.get('image') or row.get('product image') or '',
+            loyalty_weight=loyalty_weight,
+            global_upc=row.get('global upc'),
+            reorder_point=average_weekly_sales * 3,
+            reorder_max=average_weekly_sales * 6)
+
+    def validate(self, rows, lookups, first_row=1):
+        """
+        Check a chunk of rows against the lookups loaded for it.
+
+        Returns:
+            products(list): unsaved Product instances for the new products
+            duplicates(list): (row number, product name, row) of the rows
+                              naming products which already exist
+            errors(list): error messages per column keyed by row number,
+                          in the format used for invalid CSV columns
+        """
+        products, duplicates, errors = [], [], []
+        known_products = set(lookups['products'])
+        for row_count, row in enumerate(rows, first_row):
+            references, row_errors = self.check_row(row, lookups)
+            if row_errors:
+                errors.append({f'{row_count}': row_errors})
+                continue
+            product_name = self.row_names(row)['name']
+            if product_name.lower() not in known_products:
+                known_products.add(product_name.lower())
+                products.append(self.build_product(row, references))
+            elif (self.on_duplication.get(product_name.lower()) or
+                  '').lower() != 'skip':
+                duplicates.append((row_count, product_name, row))
+        return products, duplicates, errors
+
+    def insert(self, products):
+        """
+        Number a chunk of products, then insert them and store their
+        metadata in one pass, without firing Product save signals.
+        """
+        Product.all_products.bulk_create(assign_identifiers(products))
+        update_search_vectors(Product.all_objects.filter(
+            pk__in=[product.id for product in products]))
+        ProductMeta.objects.bulk_create([
+            ProductMeta(product=product, dataKey='global_upc',
+                        dataValue=product.global_upc)
+            for product in products if product.global_upc])
+
+    @staticmethod
+    def report_duplicates(duplicates):
+        conflicts = {}
+        for product in lowered_names(
+                Product, 'product_name',
+                {product_name.lower() for _, product_name, _ in duplicates}
+        ).values('id', 'product_name', 'sku_number', 'lowered_name'):
+            conflicts.setdefault(product.pop('lowered_name'), []).append(
+                product)
+        return [{
+            'row': row_count,
+            'message': ERROR_RESPONSES['duplication_error'].format(
+                product_name),
+            'data': row,
+            'conflicts': conflicts.get(product_name.lower(), [])
+        } for row_count, product_name, row in duplicates]
+
+    def chunks(self, rows):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def run(self, rows):
+        """
+        Import the products of a CSV file.
+
+        The rows are read and checked a chunk at a time so that memory use
+        is bounded by the chunk size. Every chunk is inserted inside a
+        single transaction which is rolled back when any row of the file
+        turns out to be invalid, so nothing is saved from an invalid file.
+
+        Args:
+            rows(iterable): product rows as returned by
+                            validate_products_csv_upload() or
+                            iter_products_csv()
+
+        Returns:
+            dict: the number of products added, the duplicated products
+                  and the throughput of the import in rows per second
+            ValidationError: listing the errors of every invalid row,
+                             when any row is invalid
+        """
+        started_at = time.monotonic()
+        business_ids = list(Business.objects.filter(
+            user_id=self.user.id).values_list('id', flat=True))
+        [row_count, product_count, duplicates, errors] = [0, 0, [], []]
+        with transaction.atomic():
+            for chunk in self.chunks(rows):
+                # products inserted from earlier chunks are looked up as
+                # existing ones
+                products, chunk_duplicates, chunk_errors = self.validate(
+                    chunk, self.load_lookups(chunk, business_ids),
+                    first_row=row_count + 1)
+                row_count += len(chunk)
+                duplicates.extend(chunk_duplicates)
+                errors.extend(chunk_errors)
+                if not errors:
+                    self.insert(products)
+                    product_count += len(products)
+            if errors:
+                raise ValidationError({'rows': errors})
+        duplicated_products = self.report_duplicates(duplicates)
+        elapsed = time.monotonic() - started_at
+        return {
+            'product_count': product_count,
+            'duplicated_products': duplicated_products,
+            'rows_per_second': round(row_count / elapsed, 2)
+            if elapsed else row_count
+        }
@@ -243,8 +243,6 @@ def create_batch_helper(product, user, supplier_id, unit_cost, qty, tag="BN"):
         outlet_id = user_outlet.id
     )
     product_batch.save()
-    # update the properties of the product, now that a new product batch has been added
-    product.update_inventory()
 
 
 def create_out_of_stock_batch(product, user, supplier_id, unit_cost):
@@ -1,4 +1,24 @@
+import csv
+from itertools import islice
+
 from rest_framework.exceptions import NotFound
+from rest_framework.fields import DateTimeField
+
+from healthid.apps.products.models import Product
+
+# foreign keys exported by name, joined into the products query
+EXPORT_RELATIONS = ('product_category', 'dispensing_size',
+                    'preferred_supplier', 'backup_supplier')
+
+
+class CsvBuffer():
+    """
+    File like object handing each row the csv writer writes back to the
+    caller instead of storing it, so that rows can be streamed.
+    """
+
+    def write(self, value):
+        return value
 
 
 class HandleCsvExport():
@@ -17,16 +37,6 @@ class HandleCsvExport():
             return 'NO VAT'
         return kwargs.get('value')
 
-    @classmethod
-    def write_csv(cls, product, request):
-        if request.data is not None:
-            for key, value in request.data.items():
-                if value is False:
-                    del product[key]
-        product = {cls.capitalize(key): cls.transform_value_for_csv(
-            key=key, value=value) for key, value in product.items()}
-        return product
-
     @staticmethod
     def validate_request_data(custom_headers, headers, key, value):
         if key not in headers and isinstance(value, bool):
@@ -37,5 +47,63 @@ class HandleCsvExport():
         if value is True:
             custom_headers.append(key)
 
+    @staticmethod
+    def product_tags(product_ids):
+        """
+        Get the names of the tags of several products with one query.
+
+        Returns:
+            dict: comma separated tag names keyed by product id
+        """
+        tags = {}
+        for product_id, tag in Product.all_products.filter(
+                id__in=product_ids, tags__isnull=False).values_list(
+                    'id', 'tags__name'):
+            tags.setdefault(product_id, []).append(tag)
+        return {product_id: ', '.join(names)
+                for product_id, names in tags.items()}
+
+    @classmethod
+    def product_value(cls, product, field, tags):
+        if field in EXPORT_RELATIONS:
+            related = getattr(product, field)
+            return related.name if related else None
+        if field == 'tags':
+            return tags.get(product.id)
+        if field == 'quantity':
+            return product.quantity_in_stock
+        if field == 'created_at':
+            return DateTimeField().to_representation(product.created_at)
+        return cls.transform_value_for_csv(
+            key=field, value=getattr(product, field))
+
+    def stream_products(self, products, fields, chunk_size=2000):
+        """
+        Write products as csv rows, one chunk of products at a time.
+
+        Args:
+            products(queryset): products to export
+            fields(list): product fields to export, in column order
+            chunk_size(int): number of products fetched per query
+
+        Returns:
+            generator: the csv lines, starting with the header
+        """
+        headers = [self.capitalize(field) for field in fields]
+        writer = csv.writer(CsvBuffer())
+        yield writer.writerow(headers)
+        products = products.select_related(*EXPORT_RELATIONS).iterator(
+            chunk_size=chunk_size)
+        while True:
+            chunk = list(islice(products, chunk_size))
+            if not chunk:
+                return
+            tags = self.product_tags([product.id for product in chunk]) \
+                if 'tags' in fields else {}
+            for product in chunk:
+                yield writer.writerow([
+                    self.product_value(product, field, tags)
+                    for field in fields])
+
 
 handle_csv_export = HandleCsvExport()
@@ -7,8 +7,7 @@ from healthid.apps.products.models import Product
 
 from healthid.apps.business.models import Business
 from healthid.apps.orders.models.suppliers import SuppliersMeta
-from healthid.apps.products.models import (BatchInfo, Product, DispensingSize, Product,
-                                           ProductCategory, Quantity)
+from healthid.apps.products.models import BatchInfo, Product, Quantity
 from healthid.utils.app_utils.database import (SaveContextManager,
                                                get_model_object)
 from healthid.utils.product_utils.product import \
@@ -16,10 +15,10 @@ from healthid.utils.product_utils.product import \
 from healthid.utils.messages.common_responses import ERROR_RESPONSES
 from healthid.utils.messages.products_responses import PRODUCTS_ERROR_RESPONSES
 from healthid.utils.product_utils.batch_utils import batch_info_instance
+from healthid.utils.product_utils.bulk_product_import import \
+    BulkProductImport
 from healthid.utils.product_utils.validate_products_csv_upload import\
-    validate_products_csv_upload
-from healthid.utils.product_utils.check_product_category import\
-    check_product_category
+    iter_products_csv, validate_products_csv_upload
 from healthid.utils.get_on_duplication_csv_upload_actions import\
     get_on_duplication_csv_upload_actions
 from healthid.utils.product_utils.check_product import\
@@ -36,100 +35,22 @@ class HandleCsvValidations(object):
         Parses products information from an appropriately formatted CSV file
         and save them.
         arguments:
-            io_string(obj): 'io.StringIO' object containing a list
+            io_string(obj): 'io.StringIO' or file object containing a list
                             of products in CSV format
         returns:
-            int: the number of saved products
+            dict: the number of saved products, the duplicated products and
+                  the import throughput in rows per second
         """
         on_duplication_actions = get_on_duplication_csv_upload_actions(
             on_duplication)
-        params = {'model': Product, 'error_type': ValidationError}
-        [product_count, row_count, duplicated_products] = [0, 0, []]
-        products = validate_products_csv_upload(io_string)
-        user_bussinesses = Business.objects.filter(user_id=user.id).values()
-        for row in products:
-            row_count += 1
-            category = row.get('category') or row.get('product category')
-            product_categories = ProductCategory.objects.filter(
-                name__iexact=category).values()
-
-            product_name = row.get('name') or row.get('product name')
-            on_duplicate_action = on_duplication_actions.get(
-                product_name.lower()) or ''
-            product_category = check_product_category(
-                user_bussinesses, product_categories, category, row_count)
-
-            supplier = get_model_object(SuppliersMeta,
-                                        'display_name__iexact',
-                                        row.get('preferred supplier'),
-                                        error_type=NotFound,
-                                        label='Display name')
-
-            backup_supplier = get_model_object(SuppliersMeta,
-                                               'display_name__iexact',
-                                               row.get('backup supplier'),
-                                               error_type=NotFound,
-                                               label='Display name')
-
-            dispensing_size = get_model_object(DispensingSize,
-                                               'name__iexact',
-                                               row.get('dispensing size') or
-                                               row.get('measurement unit'),
-                                               error_type=NotFound,
-                                               label='Dispensing size')
-
-            vat_status = row.get('vat status').lower() == 'vat' or False\
-                if row.get('vat status')\
-                else product_category.get('is_vat_applicable')
-
-            loyalty_weight = row.get('loyalty weight')\
-                if str(row.get('loyalty weight')).isdigit()\
-                else product_category.get('loyalty_weight')
-
-            image = row.get('image') or row.get('product image')
-            global_upc = row.get('global upc')
-            
-            current_products = Product.objects.filter(
-                product_name__iexact=product_name).values()
-            product = check_product(user_bussinesses,
-                                    current_products,
-                                    product_name,
-                                    row_count,
-                                    True)
-
-            if not product:
-                product_instance = Product(
-                    product_category_id=product_category.get('id'),
-                    business_id=product_category.get('business_id'),
-                    product_name=product_name,
-                    dispensing_size_id=dispensing_size.id,
-                    description=row.get('description') or '',
-                    brand=row.get('brand') or '',
-                    manufacturer=row.get('manufacturer') or '',
-                    vat_status=vat_status,
-                    preferred_supplier_id=supplier.supplier_id,
-                    backup_supplier_id=backup_supplier.supplier_id,
-                    tags=row.get('tags') or '',
-                    image=image or '',
-                    loyalty_weight=loyalty_weight)
-
-                product_count += 1
-                product_instance.global_upc = global_upc
-                generate_reorder_points_and_max(user.id, product_instance)
-            elif on_duplicate_action.lower() != 'skip':
-                duplicated_products.append({
-                    'row': row_count,
-                    'message': ERROR_RESPONSES['duplication_error'].format(
-                        product_name),
-                    'data': row,
-                    'conflicts': Product.objects.filter(
-                        product_name__iexact=product_name).values(
-                        'id', 'product_name', 'sku_number')
-                })
-        return {
-            'product_count': product_count,
-            'duplicated_products': duplicated_products
-        }
+        if io_string.seekable():
+            # validate the whole file first, then read it again in chunks
+            validate_products_csv_upload(io_string, keep_products=False)
+            io_string.seek(0)
+            products = iter_products_csv(io_string)
+        else:
+            products = validate_products_csv_upload(io_string)
+        return BulkProductImport(user, on_duplication_actions).run(products)
 
     def handle_batch_csv_upload(self, user, batch_info_csv):
         """
@@ -0,0 +1,312 @@
+from collections import defaultdict, namedtuple
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from healthid.apps.orders.models.orders import ProductBatch
+from healthid.apps.products.models import (
+    PRODUCT_STOCK_FIELDS, Product, ProductInventory)
+
+STOCK_COUNTERS = ('in_stock_quantity', 'pre_ordered_quantity',
+                  'in_stock_batches', 'in_stock_unit_cost',
+                  'batches', 'unit_cost')
+INVENTORY_FIELDS = STOCK_COUNTERS + ('selling_unit_cost', )
+OUT_OF_STOCK_REF = 'OUT OF STOCK'
+
+StockSnapshot = namedtuple(
+    'StockSnapshot', ['product_id', 'counters', 'selling_unit_cost'])
+EMPTY_SNAPSHOT = StockSnapshot(None, (0, ) * len(STOCK_COUNTERS), None)
+
+
+def take_stock_snapshot(batch):
+    """
+    Work out what a single batch adds to its product's inventory counters.
+
+    Args:
+        batch(obj): ProductBatch instance
+
+    Returns:
+        snapshot(StockSnapshot): the product the batch belongs to, its
+                                 contribution to every counter in
+                                 STOCK_COUNTERS and the unit cost it offers
+                                 for selling while unexpired
+    """
+    if batch.product_id is None or batch.deleted_at is not None:
+        return EMPTY_SNAPSHOT
+    unit_cost = Decimal(batch.unit_cost or 0)
+    quantity = batch.quantity or 0
+    in_stock = batch.status == ProductBatch.IN_STOCK
+    counters = (
+        quantity if in_stock and batch.batch_ref != OUT_OF_STOCK_REF else 0,
+        quantity if batch.status == ProductBatch.PENDING_DELIVERY else 0,
+        1 if in_stock else 0,
+        unit_cost if in_stock else 0,
+        1,
+        unit_cost,
+    )
+    # expiry dates assigned from user input are still ISO strings until
+    # the batch is reloaded, and compare the same way as dates
+    selling_unit_cost = unit_cost \
+        if batch.expiry_date and str(batch.expiry_date) >= str(date.today()) \
+        else None
+    return StockSnapshot(batch.product_id, counters, selling_unit_cost)
+
+
+def record_batch_changes(batches, created=False):
+    """
+    Apply the stock deltas of batches that have just been written.
+
+    Every ProductBatch remembers the snapshot it was loaded (or last
+    recorded) with, so the delta of a write is the difference between that
+    snapshot and the batch's current state. It is called by the
+    ProductBatch post_save signal, and by code writing batches with
+    bulk_update() which bypasses signals. Products of batches whose previous
+    state is unknown, e.g. loaded with only(), are recounted instead.
+
+    Args:
+        batches(list): ProductBatch instances already saved to the database
+        created(bool): whether the batches have just been inserted
+    """
+    deltas = defaultdict(lambda: [0] * len(STOCK_COUNTERS))
+    raised_costs = {}
+    lowered_costs = defaultdict(list)
+    unknown = set()
+    for batch in batches:
+        previous = getattr(batch, '_stock_snapshot', None)
+        current = take_stock_snapshot(batch)
+        batch._stock_snapshot = current
+        if previous is None and not created:
+            if current.product_id is not None:
+                unknown.add(current.product_id)
+            continue
+        previous = previous or EMPTY_SNAPSHOT
+        if previous != current:
+            add_snapshot_delta(deltas, previous, current)
+            add_selling_cost_change(
+                raised_costs, lowered_costs, previous, current)
+    for product_id in unknown:
+        deltas.pop(product_id, None)
+    if deltas:
+        apply_inventory_deltas(deltas, raised_costs, lowered_costs)
+    if unknown:
+        rebuild_inventories(unknown)
+
+
+def add_snapshot_delta(deltas, previous, current):
+    for sign, snapshot in ((-1, previous), (1, current)):
+        if snapshot.product_id is None:
+            continue
+        delta = deltas[snapshot.product_id]
+        for index, value in enumerate(snapshot.counters):
+            delta[index] += sign * value
+
+
+def add_selling_cost_change(raised_costs, lowered_costs, previous, current):
+    if (previous.product_id, previous.selling_unit_cost) == \
+            (current.product_id, current.selling_unit_cost):
+        return
+    if previous.selling_unit_cost is not None:
+        lowered_costs[previous.product_id].append(previous.selling_unit_cost)
+    if current.selling_unit_cost is not None:
+        raised_costs[current.product_id] = max(
+            current.selling_unit_cost, raised_costs.get(
+                current.product_id, current.selling_unit_cost))
+
+
+def apply_inventory_deltas(deltas, raised_costs=None, lowered_costs=None):
+    """
+    Add counter deltas to the inventories of several products and refresh
+    the stock properties derived from them, in a fixed number of queries.
+
+    The selling unit cost is a maximum, so it can only be raised
+    incrementally. It is read again from the batches only when the batch
+    that carried it goes away or gets cheaper.
+
+    Args:
+        deltas(dict): counter deltas, in STOCK_COUNTERS order, keyed by
+                      product id
+        raised_costs(dict): highest new selling unit cost per product id
+        lowered_costs(dict): selling unit costs withdrawn per product id
+    """
+    raised_costs = raised_costs or {}
+    lowered_costs = lowered_costs or {}
+    product_ids = set(deltas)
+    with transaction.atomic():
+        inventories = {
+            inventory.product_id: inventory
+            for inventory in ProductInventory.objects.select_for_update(
+                of=('self', )).select_related('product').filter(
+                    product_id__in=product_ids)}
+        # products without counters yet are built from the batch tables,
+        # which already hold the change being recorded
+        missing = product_ids - set(inventories)
+        if missing:
+            rebuild_inventories(missing)
+
+        stale_costs = set()
+        for product_id, inventory in inventories.items():
+            for field, value in zip(STOCK_COUNTERS, deltas[product_id]):
+                setattr(inventory, field, getattr(inventory, field) + value)
+            if any(cost >= (inventory.selling_unit_cost or 0)
+                   for cost in lowered_costs.get(product_id, [])):
+                stale_costs.add(product_id)
+            raised_cost = raised_costs.get(product_id)
+            if raised_cost is not None and (
+                    inventory.selling_unit_cost is None or
+                    raised_cost > inventory.selling_unit_cost):
+                inventory.selling_unit_cost = raised_cost
+        if stale_costs:
+            selling_costs = get_selling_unit_costs(stale_costs)
+            for product_id in stale_costs:
+                inventories[product_id].selling_unit_cost = \
+                    selling_costs.get(product_id)
+        save_inventories(list(inventories.values()))
+
+
+def get_selling_unit_costs(product_ids):
+    return dict(ProductBatch.objects.filter(
+        product_id__in=product_ids, expiry_date__gte=date.today()
+    ).values_list('product_id').annotate(Max('unit_cost')))
+
+
+def count_inventories(product_ids):
+    """
+    Compute the inventory counters of several products from scratch with
+    one grouped aggregate over their batches.
+
+    Args:
+        product_ids(list): ids of the products to count
+
+    Returns:
+        counters(dict): counter values keyed by field name, keyed by
+                        product id. Products without batches are left out.
+    """
+    in_stock = Q(status=ProductBatch.IN_STOCK)
+    # the aggregates are aliased apart from the model fields they shadow
+    aggregates = dict(zip(('total_' + field for field in INVENTORY_FIELDS), (
+        Sum('quantity', filter=in_stock & ~Q(batch_ref=OUT_OF_STOCK_REF)),
+        Sum('quantity', filter=Q(status=ProductBatch.PENDING_DELIVERY)),
+        Count('id', filter=in_stock),
+        Sum('unit_cost', filter=in_stock),
+        Count('id'),
+        Sum('unit_cost'),
+        Max('unit_cost', filter=Q(expiry_date__gte=date.today())))))
+    rows = ProductBatch.objects.filter(
+        product_id__in=product_ids
+    ).values_list('product_id').annotate(**aggregates).values_list(
+        'product_id', *aggregates)
+    counters = {}
+    for product_id, *values in rows:
+        row = dict(zip(INVENTORY_FIELDS, values))
+        for field in STOCK_COUNTERS:
+            row[field] = row[field] or 0
+        counters[product_id] = row
+    return counters
+
+
+def rebuild_inventories(product_ids):
+    """
+    Recount the inventories of several products from their batches and
+    refresh the stock properties derived from them.
+
+    Args:
+        product_ids(list): ids of the products to rebuild
+
+    Returns:
+        inventories(list): the rebuilt ProductInventory instances
+    """
+    counters = count_inventories(product_ids)
+    existing = ProductInventory.objects.in_bulk(product_ids)
+    inventories = []
+    for product in Product.all_products.filter(id__in=product_ids):
+        inventory = existing.get(product.id) or \
+            ProductInventory(product=product)
+        inventory.product = product
+        values = counters.get(product.id, {})
+        for field in INVENTORY_FIELDS:
+            setattr(inventory, field, values.get(
+                field, None if field == 'selling_unit_cost' else 0))
+        inventories.append(inventory)
+    save_inventories(inventories, created=[
+        inventory for inventory in inventories
+        if inventory.product_id not in existing])
+    return inventories
+
+
+def save_inventories(inventories, created=()):
+    """
+    Write inventory counters and the product stock properties derived from
+    them with bulk queries, so that no Product save signals fire.
+    """
+    created_ids = {inventory.product_id for inventory in created}
+    now = timezone.now()
+    for inventory in inventories:
+        inventory.updated_at = now
+    ProductInventory.objects.bulk_create(created)
+    ProductInventory.objects.bulk_update(
+        [inventory for inventory in inventories
+         if inventory.product_id not in created_ids],
+        INVENTORY_FIELDS + ('updated_at', ))
+    Product.all_products.bulk_update(
+        [inventory.update_product() for inventory in inventories],
+        PRODUCT_STOCK_FIELDS)
+
+
+def reconcile_inventory(product_ids=None, fix=True, chunk_size=500):
+    """
+    Verify the inventory counters against the batch tables.
+
+    Args:
+        product_ids(list): products to check, every product when omitted
+        fix(bool): rebuild the counters of products found to have drifted
+        chunk_size(int): number of products checked per grouped query
+
+    Returns:
+        report(dict): number of products checked and the drift found as a
+                      list of (product id, field, recorded, expected)
+    """
+    if product_ids is None:
+        product_ids = Product.all_products.order_by('id').values_list(
+            'id', flat=True)
+    product_ids = list(product_ids)
+    drift = []
+    for start in range(0, len(product_ids), chunk_size):
+        chunk = product_ids[start:start + chunk_size]
+        expected_counters = count_inventories(chunk)
+        inventories = ProductInventory.objects.in_bulk(chunk)
+        drifted = set()
+        for product in Product.all_products.filter(id__in=chunk):
+            inventory = inventories.get(product.id) or \
+                ProductInventory(product=product)
+            expected = ProductInventory(
+                product=product, **expected_counters.get(product.id, {}))
+            for field in INVENTORY_FIELDS:
+                recorded_value = getattr(inventory, field)
+                expected_value = getattr(expected, field)
+                if recorded_value != expected_value:
+                    drift.append(
+                        (product.id, field, recorded_value, expected_value))
+                    drifted.add(product.id)
+            recorded_fields = [getattr(product, field)
+                               for field in PRODUCT_STOCK_FIELDS]
+            expected.update_product()
+            for field, recorded_value in zip(
+                    PRODUCT_STOCK_FIELDS, recorded_fields):
+                expected_value = getattr(product, field)
+                if recorded_value != expected_value:
+                    drift.append(
+                        (product.id, field, recorded_value, expected_value))
+                    drifted.add(product.id)
+        if fix and drifted:
+            rebuild_inventories(drifted)
+    return {'checked': len(product_ids), 'drift': drift}
+
+
+def reconcile_inventory_job():
+    """
+    Scheduled job which verifies and repairs the inventory counters.
+    """
+    return reconcile_inventory(fix=True)
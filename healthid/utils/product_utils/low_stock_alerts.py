@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import (Case, ExpressionWrapper, F, FloatField,
+                              IntegerField, OuterRef, Subquery, Value, When)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from healthid.apps.authentication.models import User
+from healthid.apps.outlets.models import Outlet
+from healthid.apps.products.models import LowStockAlert, Product
+from healthid.apps.sales.models import ProductSalesVelocity
+from healthid.utils.messages.products_responses import \
+    PRODUCTS_SUCCESS_RESPONSES
+from healthid.utils.notifications_utils.handle_notifications import notify
+from healthid.utils.notifications_utils.notification_executor import \
+    submit_notification
+
+
+def reorder_threshold(outlet):
+    '''Expression of the quantity at or below which a product is low in
+    stock at an outlet, its reorder point, or else the outlet's, in weeks of
+    its sales velocity there
+    '''
+    velocity = ProductSalesVelocity.objects.filter(
+        outlet=outlet, product=OuterRef('pk')).values('velocity')
+    reorder_point = Case(
+        When(reorder_point__gt=0, then=F('reorder_point')),
+        default=Value(outlet.outletpreference.reorder_point),
+        output_field=IntegerField())
+    return ExpressionWrapper(
+        reorder_point * Coalesce(Subquery(velocity), Value(1.0)),
+        output_field=FloatField())
+
+
+def low_stock_products(outlet):
+    '''Products of the business of an outlet at or below their reorder
+    threshold there
+
+    Args:
+        outlet(obj): outlet whose preference and sales velocities are used
+
+    Returns:
+        products(obj): query set of the products, by name
+    '''
+    return Product.objects.filter(business_id=outlet.business_id).annotate(
+        threshold=reorder_threshold(outlet)).filter(
+        quantity_in_stock__lte=F('threshold')).order_by('product_name', 'id')
+
+
+def alert_low_stock(now=None):
+    '''Method to alert the users of every outlet about the products low in
+    stock there, with one digest per outlet.
+
+    An outlet is alerted about a product staying low once every
+    LOW_STOCK_ALERT_WINDOW seconds, and as soon as it gets low again once
+    restocked.
+
+    Returns:
+        dict: products alerted about, by outlet id
+    '''
+    now = now or timezone.now()
+    debounced_since = now - timedelta(
+        seconds=settings.LOW_STOCK_ALERT_WINDOW)
+    alerted = {}
+    outlets = Outlet.objects.filter(
+        outletpreference__isnull=False).select_related('outletpreference')
+    for outlet in outlets:
+        products = list(low_stock_products(outlet))
+        alerts = {alert.product_id: alert
+                  for alert in LowStockAlert.objects.filter(outlet=outlet)}
+        restocked = set(alerts) - {product.id for product in products}
+        if restocked:
+            LowStockAlert.objects.filter(
+                outlet=outlet, product_id__in=restocked).delete()
+        due = [product for product in products
+               if product.id not in alerts
+               or alerts[product.id].alerted_at <= debounced_since]
+        if due:
+            submit_notification(trigger_low_stock_alert, outlet, due)
+            record_low_stock_alerts(outlet, due, alerts, now)
+            alerted[outlet.id] = due
+    return alerted
+
+
+def record_low_stock_alerts(outlet, products, alerts, now):
+    '''Record the time an outlet was alerted about products so that the
+    next runs skip them until the window is over
+    '''
+    new_alerts = []
+    renewed_alerts = []
+    for product in products:
+        alert = alerts.get(product.id)
+        if alert is None:
+            new_alerts.append(LowStockAlert(
+                outlet=outlet, product=product, alerted_at=now))
+        else:
+            alert.alerted_at = now
+            renewed_alerts.append(alert)
+    LowStockAlert.objects.bulk_create(new_alerts)
+    LowStockAlert.objects.bulk_update(renewed_alerts, ['alerted_at'])
+
+
+def trigger_low_stock_alert(outlet, products):
+    '''Method to send the active users of an outlet a digest of its
+    products low in stock
+    '''
+    outlet_users = User.objects.filter(
+        outletuser__outlet=outlet, outletuser__is_active_outlet=True)
+    message = '\n'.join(
+        PRODUCTS_SUCCESS_RESPONSES['low_quantity_alert'].format(
+            product.product_name, product.quantity_in_stock)
+        for product in products)
+    notify(users=list(outlet_users),
+           subject='Low quantity alert',
+           event_name='product_quantity',
+           body=message)
@@ -1,66 +1,148 @@
-from itertools import groupby
-from datetime import datetime
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+
+from healthid.apps.authentication.models import User
+from healthid.apps.outlets.models import Outlet
 from healthid.apps.products.models import BatchInfo
 from healthid.apps.sales.models import Promotion, PromotionType
 from healthid.utils.app_utils.database import SaveContextManager
 from healthid.utils.notifications_utils.handle_notifications import notify
 
+logger = logging.getLogger(__name__)
+
+# expiry tiers of the promotions, by months to expiry: the days to expiry
+# they run up to, the discount they give and the title of their promotions
+EXPIRY_TIERS = {
+    1: (30, 60, 'Expire in 1 month'),
+    3: (91, 40, 'Expire in 3 months'),
+    6: (182, 20, 'Expire in 6 months'),
+}
+
 
-def check_for_expiry_products():
+def expiry_tier(today):
     """
-    Check for products about to expire
+    Expression of the expiry tier, in months, a batch expiring after today
+    is in.
+    """
+    whens = [
+        When(expiry_date__lte=today + timedelta(days=days), then=Value(months))
+        for months, (days, *_) in sorted(EXPIRY_TIERS.items())]
+    return Case(*whens, output_field=IntegerField())
+
+
+def bucket_expiring_products(business_id, today):
     """
+    Bucket the products of a business with unsold batches expiring within
+    the longest tier, by the tiers of their batches.
 
-    batches = BatchInfo.objects.filter(sold_out=False)
-    batches_by_outlets = [list(result) for key, result in groupby(
-        batches, key=lambda batch: batch.product.business.outlet_set.first())]
-    today = datetime.today().date()
-    for batches_per_outlet in batches_by_outlets:
-        expire_in_six_months = []
-        expire_in_three_months = []
-        expire_in_one_month = []
-        for batch in batches_per_outlet:
-            expiry_date = batch.expiry_date
-            days_to_expiry = (expiry_date - today).days
-            outlet = batch.product.business.outlet_set.first()
-            if 182 >= days_to_expiry > 91:
-                expire_in_six_months.append(batch.product)
-            elif 91 >= days_to_expiry > 30:
-                expire_in_three_months.append(batch.product)
-            elif 30 >= days_to_expiry > 0:
-                expire_in_one_month.append(batch.product)
-        if expire_in_six_months:
-            title = f'Expire in 6 months {outlet.id}'
-            create_promotion(expire_in_six_months, title, 20, outlet)
-        if expire_in_three_months:
-            title = f'Expire in 3 months {outlet.id}'
-            create_promotion(expire_in_three_months, title, 40, outlet)
-        if expire_in_one_month:
-            title = f'Expire in 1 month {outlet.id}'
-            create_promotion(expire_in_one_month, title, 60, outlet)
-
-
-def create_promotion(products, title, discount, outlet):
+    Returns:
+        buckets(dict): ids of the products of each tier, by months
+    """
+    longest_tier = max(days for days, *_ in EXPIRY_TIERS.values())
+    rows = BatchInfo.objects.filter(
+        sold_out=False, product__business_id=business_id,
+        expiry_date__gt=today,
+        expiry_date__lte=today + timedelta(days=longest_tier)).annotate(
+        tier=expiry_tier(today)).values_list(
+        'tier', 'product_id').distinct()
+    buckets = defaultdict(set)
+    for tier, product_id in rows:
+        buckets[tier].add(product_id)
+    return buckets
+
+
+def check_for_expiry_products(today=None):
+    """
+    Add the products about to expire to the expiry promotions of the
+    first outlet of their business, creating the promotions on the fly.
+
+    Returns:
+        changes(Counter): number of products added to the promotions of
+                          each tier, by months
+    """
+    today = today or datetime.today().date()
+    changes = Counter()
+    outlets = Outlet.objects.order_by(
+        'business_id', 'id').distinct('business_id')
+    for outlet in outlets:
+        buckets = bucket_expiring_products(outlet.business_id, today)
+        if buckets:
+            changes.update(update_expiry_promotions(outlet, buckets))
+    logger.info('%d products changed expiry tier: %s',
+                sum(changes.values()), dict(changes))
+    return changes
+
+
+def update_expiry_promotions(outlet, buckets):
+    """
+    Add the products bucketed by tier that are missing from the expiry
+    promotions of an outlet in a single insert.
+
+    Args:
+        outlet(obj): outlet the promotions are for
+        buckets(dict): ids of the products of each tier, by months
+
+    Returns:
+        changes(Counter): number of products added to the promotion of
+                          each tier, by months
+    """
+    titles = {months: f'{EXPIRY_TIERS[months][2]} {outlet.id}'
+              for months in buckets}
+    promotions = Promotion.objects.in_bulk(
+        list(titles.values()), field_name='title')
+    through = Promotion.products.through
+    promoted = set(through.objects.filter(
+        promotion_id__in=[promotion.id for promotion in promotions.values()]
+    ).values_list('promotion_id', 'product_id'))
+    changes = Counter()
+    new_rows = []
+    with transaction.atomic():
+        for months, product_ids in sorted(buckets.items()):
+            title = titles[months]
+            promotion = promotions.get(title)
+            if promotion is None:
+                promotion = create_promotion(
+                    title, EXPIRY_TIERS[months][1], outlet)
+            added = sorted(product_id for product_id in product_ids
+                           if (promotion.id, product_id) not in promoted)
+            new_rows += [through(promotion_id=promotion.id,
+                                 product_id=product_id)
+                         for product_id in added]
+            if added:
+                changes[months] = len(added)
+        through.objects.bulk_create(new_rows)
+    if changes:
+        notify_promotion_managers(outlet, [titles[months]
+                                           for months in sorted(changes)])
+    return changes
+
+
+def create_promotion(title, discount, outlet):
     '''
     Create promotion for products about to expiry
     '''
-    promotion = Promotion.objects.filter(title=title).first()
-    products_added = True
-    if promotion:
-        products_added = not all(
-            product in products for product in promotion.products.all())
-        promotion.products.add(*products)
-    else:
-        promotion_type, _ = PromotionType.objects.get_or_create(name='expiry')
-        description = 'Products about to expire.'
-        promotion = Promotion(title=title, promotion_type=promotion_type,
-                              description=description, discount=discount,
-                              is_approved=False, outlet=outlet)
-        with SaveContextManager(promotion, model=Promotion) as promotion:
-            promotion.products.add(*products)
-    if products_added:
-        users = outlet.active_outlet_users
-        roles = ('Master Admin', 'Manager')
-        users = [user for user in users if str(user.role) in roles]
+    promotion_type, _ = PromotionType.objects.get_or_create(name='expiry')
+    description = 'Products about to expire.'
+    promotion = Promotion(title=title, promotion_type=promotion_type,
+                          description=description, discount=discount,
+                          is_approved=False, outlet=outlet)
+    with SaveContextManager(promotion, model=Promotion) as promotion:
+        return promotion
+
+
+def notify_promotion_managers(outlet, titles):
+    '''
+    Notify the Master Admins and Managers of an outlet about the products
+    added to its expiry promotions
+    '''
+    users = list(User.objects.filter(
+        outletuser__outlet=outlet, outletuser__is_active_outlet=True,
+        role__name__in=('Master Admin', 'Manager')))
+    for title in titles:
         message = f'Products have been added to promotion {title}.'
-        notify(users=users, subject='Products about to expire.', body=message)
+        notify(users=users, subject='Products about to expire.',
+               body=message)
@@ -0,0 +1,94 @@
+import re
+
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db.models import F, OuterRef, Q, Subquery
+
+from healthid.apps.orders.models.suppliers import Suppliers
+from healthid.apps.products.models import ProductCategory, ProductMeta
+
+# product names are brand names, so words are not stemmed
+SEARCH_CONFIG = 'simple'
+
+# product fields the search document is built from
+SEARCH_FIELDS = {'product_name', 'brand', 'manufacturer', 'description',
+                 'product_category', 'preferred_supplier'}
+
+
+def search_vector(category_model=ProductCategory, supplier_model=Suppliers):
+    """
+    Build the search document of products, weighting the product name
+    above its brand and manufacturer, then its category and preferred
+    supplier, then its description.
+
+    Args:
+        category_model(class): model of product categories
+        supplier_model(class): model of suppliers
+
+    Returns:
+        vector(obj): expression to store in Product.search_vector
+    """
+    category = category_model.objects.filter(
+        pk=OuterRef('product_category_id')).values('name')[:1]
+    supplier = supplier_model.objects.filter(
+        pk=OuterRef('preferred_supplier_id')).values('name')[:1]
+    return (
+        SearchVector('product_name', weight='A', config=SEARCH_CONFIG) +
+        SearchVector(
+            'brand', 'manufacturer', weight='B', config=SEARCH_CONFIG) +
+        SearchVector(
+            Subquery(category), Subquery(supplier), weight='C',
+            config=SEARCH_CONFIG) +
+        SearchVector('description', weight='D', config=SEARCH_CONFIG))
+
+
+def update_search_vectors(products):
+    """
+    Rebuild the search document of products with one UPDATE.
+
+    Args:
+        products(queryset): products whose name, brand, manufacturer,
+                            description, category or supplier changed
+    """
+    products.update(search_vector=search_vector())
+
+
+def exact_matches(products, search_term):
+    """
+    Get the products whose SKU number or global UPC is the search term, as
+    scanned or typed in at the till.
+    """
+    upc_products = ProductMeta.objects.filter(
+        dataKey='global_upc', dataValue=search_term).values('product_id')
+    return products.filter(
+        Q(sku_number=search_term) | Q(global_upc=search_term) |
+        Q(pk__in=upc_products))
+
+
+def search_products(products, search_term):
+    """
+    Search products by SKU number or global UPC, then by the words of
+    their name, brand, manufacturer, category, preferred supplier and
+    description. Every word is matched as a prefix, for typeahead.
+
+    Args:
+        products(queryset): products to search
+        search_term(str): SKU number, global UPC or words to look for
+
+    Returns:
+        products(queryset): exact SKU or UPC hits when there are any,
+                            otherwise the matching products, the best
+                            ranked first
+    """
+    exact = exact_matches(products, search_term)
+    if exact.exists():
+        return exact
+    words = re.findall(r'[^\W_]+', search_term)
+    if not words:
+        return products.filter(product_name__icontains=search_term)
+    query = SearchQuery(
+        ' & '.join(f'{word}:*' for word in words),
+        config=SEARCH_CONFIG, search_type='raw')
+    return products.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query)
+    ).order_by('-search_rank', 'pk')
@@ -4,41 +4,67 @@ from rest_framework.exceptions import ValidationError
 from healthid.utils.messages.common_responses import ERROR_RESPONSES
 
 
-def validate_products_csv_upload(io_string):
+VALID_COLUMNS = {
+    'name': 'required',
+    'product name': 'required',
+    'description': 'required',
+    'brand': 'required',
+    'manufacturer': 'required',
+    'dispensing size': 'required',
+    'measurement unit': 'required',
+    'preferred supplier': 'required',
+    'backup supplier': 'required',
+    'category': 'required',
+    'product category': 'required',
+    'loyalty weight': 'not required',
+    'vat status': 'not required',
+    'tags': 'not required',
+    'image': 'not required',
+    'product image': 'not required',
+    'global upc': 'not required'
+}
+
+
+def read_csv_columns(io_string):
+    for row in csv.reader(io_string):
+        return list(map(lambda column: column.lower().strip(), row))
+    return []
+
+
+def iter_products_csv(io_string):
+    """
+        Read the products of a CSV file already validated with
+        validate_products_csv_upload(), one row at a time.
+
+        arguments:
+            io_string(obj): file object positioned at the start of the CSV
+
+        returns:
+            generator: a product dictionary per row
+        """
+    csv_columns = read_csv_columns(io_string)
+    for row in csv.reader(io_string):
+        yield {column: value
+               for column, value in zip(csv_columns, row) if column}
+
+
+def validate_products_csv_upload(io_string, keep_products=True):
     """
         Validate products info from an appropriately formatted CSV file.
 
         arguments:
             io_string(obj): 'io.StringIO' object containing a list
                             of products in CSV format
+            keep_products(bool): whether to return the products read, or
+                                 only to validate them without holding the
+                                 whole file in memory
 
         returns:
             array: a list of products
         """
-    [row_count, csv_columns, products, csv_errors] = [0, [], [], {}]
-    valid_columns = {
-        'name': 'required',
-        'product name': 'required',
-        'description': 'required',
-        'brand': 'required',
-        'manufacturer': 'required',
-        'dispensing size': 'required',
-        'measurement unit': 'required',
-        'preferred supplier': 'required',
-        'backup supplier': 'required',
-        'category': 'required',
-        'product category': 'required',
-        'loyalty weight': 'not required',
-        'vat status': 'not required',
-        'tags': 'not required',
-        'image': 'not required',
-        'product image': 'not required',
-        'global upc': 'not required'
-    }
-
-    for row in csv.reader(io_string):
-        csv_columns = list(map(lambda column: column.lower().strip(), row))
-        break
+    [row_count, products, csv_errors] = [0, [], {}]
+    valid_columns = VALID_COLUMNS
+    csv_columns = read_csv_columns(io_string)
 
     for column in csv_columns:
         csv_errors = {
@@ -75,7 +101,8 @@ def validate_products_csv_upload(io_string):
             ]
         } if len(row_errors) else csv_errors
 
-        products = [*products, product]
+        if keep_products:
+            products.append(product)
 
     if len(csv_columns) < 10 or len(csv_columns) > 13:
         message = {
@@ -1,46 +1,74 @@
-import cloudinary
+from functools import lru_cache
+from io import BytesIO
+from os import environ, getenv
+
 import barcode
-from barcode.writer import ImageWriter
-from random import randint
+from barcode.errors import BarcodeError
+from barcode.writer import ImageWriter, SVGWriter
+from django.urls import reverse
 
+DOMAIN = environ.get('DOMAIN') or getenv('DOMAIN')
 
-def generate_barcode(receipt, receipt_model):
-    """
-    generates a barcode for a receipt
+# sequences receipts and their barcodes are numbered from, the numbers of
+# barcodes being used as UPC-A codes of number system 0, which receipts
+# never had before
+RECEIPT_NUMBER_SEQUENCE = 'receipts_receipt_no_seq'
+SCANNED_NUMBER_SEQUENCE = 'receipts_scanned_number_seq'
 
-    Args:
-        receipt(obj): receipt whose barcode is being created for
-        receipt_model: model of receipt
+# content types of the barcode images, by format
+BARCODE_FORMATS = {
+    'svg': 'image/svg+xml',
+    'png': 'image/png',
+}
+
+# barcode images kept in memory, a receipt being printed or mailed a few
+# times right after its sale
+BARCODE_CACHE_SIZE = 512
 
+
+def upc_code(number):
+    """
     Returns:
-        string: url for barcode created
+        int: UPC-A code of a number taken from the receipts sequence,
+             check digit included
     """
-    barcode_number = randint(100000000000, 999999999999)
-    image = barcode.get_barcode_class('upca')
-    receipt_instance = receipt_model.objects.filter(
-        scanned_number=barcode_number)
-    if receipt_instance.exists():
-        return generate_barcode(receipt, receipt_model)
-    barcode_image = image(str(barcode_number), writer=ImageWriter())
-    filename = barcode_image.save('receipt')
-    image_url = cloudinary.uploader.upload(filename).get('url')
-    receipt.scanned_number = barcode_number
-    return image_url
-
-
-def generate_receipt_number(receipt, receipt_model):
+    upc = barcode.get_barcode_class('upca')(f'{number:011d}')
+    return int(upc.get_fullcode())
+
+
+@lru_cache(maxsize=BARCODE_CACHE_SIZE)
+def render_barcode(scanned_number, image_format='svg'):
     """
-    generates a unique number for a receipt
+    Render the barcode of a receipt.
 
     Args:
-        receipt(obj): receipt whose reciept no is being created for
-        receipt_model: model of receipt
+        scanned_number(int): UPC-A code of the receipt
+        image_format(str): 'svg' or 'png'
+
+    Returns:
+        bytes: barcode image
 
+    Raises:
+        ValueError: when the number is not a valid UPC-A code
+    """
+    code = f'{scanned_number:012d}'
+    writer = ImageWriter() if image_format == 'png' else SVGWriter()
+    try:
+        upc = barcode.get_barcode_class('upca')(code, writer=writer)
+    except BarcodeError as error:
+        raise ValueError(str(error))
+    if upc.get_fullcode() != code:
+        raise ValueError(f'{code} has a wrong check digit')
+    image = BytesIO()
+    upc.write(image, options={'format': image_format.upper()})
+    return image.getvalue()
+
+
+def barcode_link(scanned_number, image_format='svg'):
+    """
     Returns:
-        string: unique characters for receipt
+        string: url the barcode of a receipt is rendered at
     """
-    receipt_no = f'RN{randint(100, 999)}-{receipt.sale.id}'
-    receipts = receipt_model.objects.filter(receipt_no=receipt_no)
-    if receipts.exists():
-        return generate_receipt_number(receipt, receipt_model)
-    return receipt_no
+    path = reverse('receipt_barcode', kwargs={
+        'scanned_number': scanned_number, 'image_format': image_format})
+    return f'{DOMAIN or ""}{path}'
@@ -1,62 +1,98 @@
 import math
-from healthid.apps.products.models import Quantity
+from collections import OrderedDict
+
+from django.db import transaction
+
 from healthid.apps.orders.models.orders import ProductBatch
-from django.db.models import F
+from healthid.utils.product_utils.inventory_ledger import \
+    record_batch_changes
+
+
+def lock_sold_batches(batch_ids):
+    """
+    Lock every batch in a basket with a single SELECT ... FOR UPDATE.
+
+    Args:
+        batch_ids(list): ids of the ProductBatch rows being sold
+
+    Returns:
+        batches(dict): ProductBatch instances keyed by their id, with the
+                       product and its category already joined in
+    """
+    batches = ProductBatch.objects.select_for_update(
+        of=('self',)
+    ).select_related(
+        'product__product_category'
+    ).filter(id__in=set(batch_ids))
+    return {batch.id: batch for batch in batches}
 
 
-def initiate_sale(product_batch_instances, sold_products_instances, sale, sale_detail,
-                  batch_history):
+def initiate_sale(sold_products_instances, sale, sale_detail):
     """
     This function create a sale detail by looping through all sold
     products and create a record in SaleDetail by adding sale Id.
 
-    It deduct sold quantity from batch quantity
+    It deducts the sold quantities from the batches in a fixed number of
+    queries whatever the size of the basket: the batches are locked in one
+    query, decremented in one bulk update, and the stock deltas are then
+    applied to the inventory of every distinct product sold at once.
     args:
-        product_batch_instance : Holds a list of ProductBatch objects corresponding to the batch_id's 
         sold_products_instance : Holds a list of sold product
         sale: Holds a sale instance
         sale_detail: Holds sale detail model passed as argument
     """
-    products = zip(product_batch_instances, sold_products_instances)
-    sale_details = []
-    sold_products_loyalty_points = []
-    for product_batch_instance, sold_products_instance in products:
-        product_category = product_batch_instance.product.product_category
-        loyalty_points = (sold_products_instance.price / product_category.amount_paid) * product_batch_instance.product.loyalty_weight  # noqa
-        sold_products_loyalty_points.append(math.floor(loyalty_points))
-
-        # adjust the quantity sold to reflect in prodcut batches
-        batch_product = ProductBatch.objects.get(
-                id = product_batch_instance.id
-            )
-        if sale.return_sale_id:
-            quantity_left = batch_product.quantity + sold_products_instance.quantity
-            sold_products_instance.price *= -1
-        else:
-            quantity_left = batch_product.quantity - sold_products_instance.quantity
-
-        if quantity_left < 0:
-            raise ValueError(
-                f'Error:Trying to sell more products than you have in stock.'
-                )
-        batch_product.quantity = quantity_left
-        # if the quantity is less than 0, set the status to out_of_stock
-        if batch_product.quantity == 0:
-            batch_product.status = "OUT_OF_STOCK"
-            batch_product.product.update_inventory()
-        if sale.return_sale_id:
-            batch_product.status = "IN_STOCK"
-            batch_product.product.update_inventory()
-        batch_product.save()
-
-        detail = sale_detail(quantity=sold_products_instance.quantity,
-                             discount=sold_products_instance.discount,
-                             price=sold_products_instance.price,
-                             note="",
-                             batch_id=batch_product.id,
-                             product=product_batch_instance.product,
-                             sale=sale)
-        sale_details.append(detail)
-
-    sale_detail.objects.bulk_create(sale_details)
+    with transaction.atomic():
+        batches = lock_sold_batches(
+            [str(sold.batch_id) for sold in sold_products_instances])
+
+        quantities = OrderedDict()
+        for sold_products_instance in sold_products_instances:
+            batch_id = str(sold_products_instance.batch_id)
+            quantities[batch_id] = quantities.get(batch_id, 0) + \
+                sold_products_instance.quantity
+
+        for batch_id, quantity in quantities.items():
+            batch_product = batches[batch_id]
+            if sale.return_sale_id:
+                quantity_left = batch_product.quantity + quantity
+            else:
+                quantity_left = batch_product.quantity - quantity
+
+            if quantity_left < 0:
+                raise ValueError(
+                    f'Error:Trying to sell more products than you have in '
+                    f'stock.')
+            batch_product.quantity = quantity_left
+            # if the quantity is 0, set the status to out_of_stock
+            if batch_product.quantity == 0:
+                batch_product.status = "OUT_OF_STOCK"
+            if sale.return_sale_id:
+                batch_product.status = "IN_STOCK"
+
+        updated_batches = [batches[batch_id] for batch_id in quantities]
+        ProductBatch.objects.bulk_update(
+            updated_batches, ['quantity', 'status'])
+        record_batch_changes(updated_batches)
+
+        sale_details = []
+        sold_products_loyalty_points = []
+        for sold_products_instance in sold_products_instances:
+            batch_product = batches[str(sold_products_instance.batch_id)]
+            product = batch_product.product
+            product_category = product.product_category
+            loyalty_points = (sold_products_instance.price / product_category.amount_paid) * product.loyalty_weight  # noqa
+            sold_products_loyalty_points.append(math.floor(loyalty_points))
+            if sale.return_sale_id:
+                sold_products_instance.price *= -1
+
+            detail = sale_detail(quantity=sold_products_instance.quantity,
+                                 discount=sold_products_instance.discount,
+                                 price=sold_products_instance.price,
+                                 note="",
+                                 batch_id=batch_product.id,
+                                 product=product,
+                                 sale=sale)
+            sale_details.append(detail)
+
+        sale_detail.objects.bulk_create(sale_details)
     return sum(sold_products_loyalty_points)
@@ -1,33 +1,158 @@
-from healthid.apps.sales.models import SalesPerformance, Sale, SaleDetail
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import count
 
-def populate_sale_performace_table():
+from django.db import close_old_connections, connection, transaction
+
+from healthid.apps.sales.models import (EtlCheckpoint, SaleDetail,
+                                        SalesPerformance)
+
+CHECKPOINT_NAME = 'sales_performance'
+# sale details loaded per query, and chunks loaded per scheduled run
+CHUNK_SIZE = 2000
+MAX_CHUNKS_PER_RUN = 50
+# ids below the checkpoint scanned again on every run, for the details of
+# sales committed after details with higher ids were loaded
+RESCAN_IDS = 1000
+
+SALE_DETAIL_FIELDS = (
+    'id', 'product_id', 'price', 'discount', 'quantity', 'sale_id',
+    'sale__sales_person_id', 'sale__outlet_id', 'sale__customer_id',
+    'sale__sub_total', 'sale__created_at')
+
+
+def load_sale_details(sale_details):
+    """
+    Insert the sales performance rows of a chunk of sale details, joined
+    to their sales. Details already loaded are skipped, so loading a
+    chunk again is harmless.
+
+    Args:
+        sale_details(list): sale details as returned by
+                            values(*SALE_DETAIL_FIELDS)
     """
-    populate the sale performance table with data from sale details and sale table
+    SalesPerformance.objects.bulk_create([
+        SalesPerformance(
+            sale_detail_id=sale_detail['id'],
+            product_id=sale_detail['product_id'],
+            unit_price=sale_detail['price'],
+            discount=sale_detail['discount'],
+            quantity_sold=sale_detail['quantity'],
+            sale_id=sale_detail['sale_id'],
+            cashier_id=sale_detail['sale__sales_person_id'],
+            outlet_id=sale_detail['sale__outlet_id'],
+            customer_id=sale_detail['sale__customer_id'],
+            subtotal=sale_detail['sale__sub_total'],
+            transaction_date=sale_detail['sale__created_at'])
+        for sale_detail in sale_details], ignore_conflicts=True)
+
+
+def unloaded_sale_details():
     """
-    # firstly get all the sale_id of the most recent sales performance
+    Sale details with no sales performance row. The sales with rows that
+    were loaded before rows were linked to their detail, and could not be
+    matched to one, are left out as already loaded.
+    """
+    return SaleDetail.objects.filter(performance__isnull=True).exclude(
+        sale__in=SalesPerformance.all_objects.filter(
+            sale_detail__isnull=True).values('sale_id'))
 
-    most_recent_sale_performance = SalesPerformance.objects.all().order_by("sale_id").last()
-    
-    if most_recent_sale_performance:
-        total_sale_details = SaleDetail.objects.filter(sale_id__gt = most_recent_sale_performance.sale_id)
-    else:
-        total_sale_details = SaleDetail.objects.all()
 
-    # add all not present in the db
-    for existing_sale_detail in total_sale_details:
-        corresponding_sale = Sale.objects.get(id = existing_sale_detail.sale_id)
-        new_sale_performance = SalesPerformance()
+def next_chunk(sale_details, last_id, chunk_size):
+    return list(sale_details.filter(id__gt=last_id).order_by('id').values(
+        *SALE_DETAIL_FIELDS)[:chunk_size])
 
-        new_sale_performance.product_id = existing_sale_detail.product_id
-        new_sale_performance.unit_price = existing_sale_detail.price
-        new_sale_performance.discount = existing_sale_detail.discount
-        new_sale_performance.quantity_sold = existing_sale_detail.quantity
 
-        new_sale_performance.sale_id = corresponding_sale.id
-        new_sale_performance.cashier_id = corresponding_sale.sales_person_id
-        new_sale_performance.outlet_id = corresponding_sale.outlet_id
-        new_sale_performance.customer_id = corresponding_sale.customer_id
-        new_sale_performance.subtotal = corresponding_sale.sub_total
-        new_sale_performance.transaction_date = corresponding_sale.created_at
+def populate_sale_performace_table(chunk_size=CHUNK_SIZE,
+                                   max_chunks=MAX_CHUNKS_PER_RUN):
+    """
+    Load the sale details added since the last run into the sales
+    performance table, a chunk at a time.
 
-        new_sale_performance.save()
+    The id of the last loaded detail is saved with each chunk, so a run
+    which stops half way resumes from the last chunk, and details added
+    to older sales are still picked up. A run loads at most max_chunks
+    chunks, leaving the rest of a large backlog to the next runs, or
+    every chunk when max_chunks is None.
+
+    Ids are taken before the sales are committed, so a sale committed
+    late can hold ids below the checkpoint. The last RESCAN_IDS ids below
+    it are scanned again on every run for such details. Details committed
+    later than that are only loaded by backfill_sales_performance.
+
+    Returns:
+        int: number of sale details loaded
+    """
+    checkpoint, _ = EtlCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+    late_details = list(unloaded_sale_details().filter(
+        id__gt=checkpoint.last_id - RESCAN_IDS,
+        id__lte=checkpoint.last_id).order_by('id').values(
+        *SALE_DETAIL_FIELDS))
+    load_sale_details(late_details)
+    loaded = len(late_details)
+    for _ in count() if max_chunks is None else range(max_chunks):
+        with transaction.atomic():
+            # locked so that concurrent runs load different chunks
+            checkpoint = EtlCheckpoint.objects.select_for_update().get(
+                name=CHECKPOINT_NAME)
+            sale_details = next_chunk(
+                SaleDetail.objects.all(), checkpoint.last_id, chunk_size)
+            if not sale_details:
+                break
+            load_sale_details(sale_details)
+            checkpoint.last_id = sale_details[-1]['id']
+            checkpoint.save()
+        loaded += len(sale_details)
+    return loaded
+
+
+def backfill_sales_performance(date_from, date_to, chunk_size=CHUNK_SIZE):
+    """
+    Load the sale details of the sales made between two dates, whatever
+    the checkpoint of the incremental load.
+
+    Args:
+        date_from(date): first day of the sales to load
+        date_to(date): last day of the sales to load
+
+    Returns:
+        int: number of sale details loaded
+    """
+    sale_details = unloaded_sale_details().filter(
+        sale__created_at__date__gte=date_from,
+        sale__created_at__date__lte=date_to)
+    loaded, last_id = 0, 0
+    while True:
+        chunk = next_chunk(sale_details, last_id, chunk_size)
+        if not chunk:
+            return loaded
+        load_sale_details(chunk)
+        loaded, last_id = loaded + len(chunk), chunk[-1]['id']
+
+
+def backfill_in_worker(date_from, date_to, chunk_size):
+    close_old_connections()
+    try:
+        return backfill_sales_performance(date_from, date_to, chunk_size)
+    finally:
+        connection.close()
+
+
+def backfill_in_parallel(date_from, date_to, workers=4,
+                         chunk_size=CHUNK_SIZE):
+    """
+    Backfill the sales performance table by splitting the dates into one
+    range per worker, each loaded on its own thread and connection.
+
+    Returns:
+        int: number of sale details loaded
+    """
+    days = (date_to - date_from).days + 1
+    range_days = -(-days // workers)
+    ranges = [
+        (date_from + timedelta(days=start),
+         min(date_to, date_from + timedelta(days=start + range_days - 1)))
+        for start in range(0, days, range_days)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(
+            lambda dates: backfill_in_worker(*dates, chunk_size), ranges))
@@ -1,45 +1,146 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Max, Q, Sum
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 
-from django.db.models.functions import ExtractWeek
-from django.db.models import Sum
-from dateutil.relativedelta import relativedelta
+from healthid.apps.sales.models import (DailyProductSales,
+                                        ProductSalesVelocity, SaleDetail)
+
+# number of weeks the sales velocity is averaged over
+VELOCITY_WEEKS = 4
+
+
+def velocity_window(window_end):
+    """
+    Get the weeks of the rolling window ending on a day.
+
+    Returns:
+        list: (first day, last day) of each week, the most recent first
+    """
+    return [(window_end - timedelta(days=7 * week + 6),
+             window_end - timedelta(days=7 * week))
+            for week in range(VELOCITY_WEEKS)]
+
+
+def update_daily_sales(first_day, window_start, window_end):
+    """
+    Aggregate the sale details from a day to the end of the window into
+    the daily product sales, with one grouped query. Days which fell out
+    of the window are dropped.
+    """
+    daily_sales = SaleDetail.objects.annotate(
+        sale_date=TruncDate('created_at')).filter(
+            sale_date__gte=first_day, sale_date__lte=window_end).values(
+                'product_id', 'sale__outlet_id', 'sale_date').annotate(
+                    quantity_sold=Sum('quantity'))
+    existing = {
+        (row.product_id, row.outlet_id, row.sale_date): row
+        for row in DailyProductSales.objects.filter(
+            sale_date__gte=first_day, sale_date__lte=window_end)}
+    created, updated = [], []
+    for sales in daily_sales:
+        key = (sales['product_id'], sales['sale__outlet_id'],
+               sales['sale_date'])
+        row = existing.get(key)
+        if row is None:
+            created.append(DailyProductSales(
+                product_id=key[0], outlet_id=key[1], sale_date=key[2],
+                quantity_sold=sales['quantity_sold']))
+        elif row.quantity_sold != sales['quantity_sold']:
+            row.quantity_sold = sales['quantity_sold']
+            updated.append(row)
+    DailyProductSales.objects.bulk_create(created)
+    DailyProductSales.objects.bulk_update(updated, ['quantity_sold'])
+    DailyProductSales.objects.filter(sale_date__lt=window_start).delete()
+
 
+def compute_sales_velocities(window_end):
+    """
+    Compute the weekly sales of every product and outlet with sales in
+    the window, with one grouped query over the daily product sales.
+
+    Returns:
+        dict: (weekly sales, velocity) keyed by (product id, outlet id)
+    """
+    weeks = velocity_window(window_end)
+    weekly_sums = {
+        f'week_{week}': Sum('quantity_sold', filter=Q(
+            sale_date__gte=first_day, sale_date__lte=last_day))
+        for week, (first_day, last_day) in enumerate(weeks)}
+    velocities = {}
+    for sales in DailyProductSales.objects.filter(
+            sale_date__gte=weeks[-1][0], sale_date__lte=window_end).values(
+                'product_id', 'outlet_id').annotate(**weekly_sums):
+        weekly_sales = [sales[f'week_{week}'] or 0
+                        for week in range(VELOCITY_WEEKS)]
+        weeks_with_sales = len([sold for sold in weekly_sales if sold])
+        if weeks_with_sales:
+            velocities[(sales['product_id'], sales['outlet_id'])] = (
+                weekly_sales, sum(weekly_sales) / weeks_with_sales)
+    return velocities
 
-from healthid.apps.products.models import Product, ProductMeta
-from healthid.apps.sales.models import SaleDetail
 
-def update_sale_velocity(velocity_dict):
+def save_sales_velocities(velocities, window_end):
     """
-    recieves the calculated sale velocity and updates the product meta with it
+    Upsert the computed velocities and drop those of products which no
+    longer have sales in the window.
     """
-    for product_id, sale_velocity in velocity_dict.items():
-        product_meta, _ = ProductMeta.objects.get_or_create(
-            dataKey = "Sale Velocity",
-            product_id = product_id
-        )
-        product_meta.dataValue = sale_velocity
-        product_meta.save()
+    existing = {(row.product_id, row.outlet_id): row
+                for row in ProductSalesVelocity.objects.all()}
+    created, updated = [], []
+    for key, (weekly_sales, velocity) in velocities.items():
+        row = existing.pop(key, None)
+        if row is None:
+            created.append(ProductSalesVelocity(
+                product_id=key[0], outlet_id=key[1],
+                weekly_sales=weekly_sales, velocity=velocity,
+                window_end=window_end))
+            continue
+        row.weekly_sales, row.velocity = weekly_sales, velocity
+        row.window_end, row.updated_at = window_end, timezone.now()
+        updated.append(row)
+    ProductSalesVelocity.objects.bulk_create(created)
+    ProductSalesVelocity.objects.bulk_update(
+        updated, ['weekly_sales', 'velocity', 'window_end', 'updated_at'])
+    ProductSalesVelocity.objects.filter(
+        id__in=[row.id for row in existing.values()]).delete()
 
 
-def calculate_sale_velocity():
+def calculate_sale_velocity(window_end=None, rebuild=False):
     """
-    for each product present in the sale detail table
-    calculate the sale velocity and store it
+    Refresh the sales velocity of every product and outlet.
+
+    Only the days since the last run are read from the sale details;
+    the velocities are then computed from the daily sales of
+    the rolling window.
+
+    Args:
+        window_end(date): last day of the window, defaults to today
+        rebuild(bool): aggregate every day of the window again
     """
-    maximum_weeks = 4
-    four_weeks_ago = timezone.now() - relativedelta(weeks = maximum_weeks)
-    velocity_dict = {}
+    window_end = window_end or timezone.localdate()
+    window_start = velocity_window(window_end)[-1][0]
+    # the last day of the previous run is aggregated again as its sales
+    # may have been incomplete
+    last_run = ProductSalesVelocity.objects.aggregate(
+        Max('window_end'))['window_end__max']
+    first_day = window_start if rebuild or not last_run \
+        else max(last_run, window_start)
+    with transaction.atomic():
+        update_daily_sales(first_day, window_start, window_end)
+        save_sales_velocities(
+            compute_sales_velocities(window_end), window_end)
 
-    #get sales from at most 4 weeks ago
-    sale_details = SaleDetail.objects.filter(created_at__gt = four_weeks_ago)
-    # get the sum of quantity grouped by week and product_id
-    product_and_week_sale = sale_details.annotate(week  = ExtractWeek('created_at')).values('product_id','week').annotate(weekly_quantity = Sum("quantity"))
-    # get all the distinct product id's present
-    distinct_product_ids = product_and_week_sale.values_list('product_id', flat=True).distinct()
-    # for each product calculate the sale velocity
-    for product_id in distinct_product_ids:
-        weekly_sales = product_and_week_sale.filter(product_id = product_id).values_list('weekly_quantity',flat= True)
-        sale_velocity = sum(weekly_sales)/len(weekly_sales)
-        velocity_dict[product_id] = sale_velocity
 
-    update_sale_velocity(velocity_dict)
+def get_sales_velocities(outlet, products):
+    """
+    Get the stored sales velocity of several products at an outlet.
+
+    Returns:
+        dict: velocity keyed by product id, for products with sales
+    """
+    return dict(ProductSalesVelocity.objects.filter(
+        outlet=outlet, product__in=products).values_list(
+            'product_id', 'velocity'))
@@ -0,0 +1,49 @@
+from django.db.models import Exists, OuterRef, Q
+
+from healthid.apps.sales.models import Sale, SaleDetail
+
+
+def search_sales(sales, search):
+    """
+    Keep the sales matching a search on their customer, sales person,
+    notes or the products sold. Products are matched with a subquery so
+    that a sale is returned once however many of its products match.
+    """
+    sold_products = SaleDetail.objects.filter(
+        sale=OuterRef('pk'), product__product_name__icontains=search)
+    return sales.annotate(sold_product=Exists(sold_products)).filter(
+        Q(customer__first_name__icontains=search) |
+        Q(customer__last_name__icontains=search) |
+        Q(sales_person__first_name__icontains=search) |
+        Q(sales_person__last_name__icontains=search) |
+        Q(customer__email__icontains=search) |
+        Q(notes__icontains=search) |
+        Q(sold_product=True))
+
+
+def sales_history(outlet_id, search=None, date_from=None, date_to=None):
+    """
+    Get the sales of an outlet, the most recent first.
+
+    Args:
+        outlet_id(int): outlet the sales were made in
+        search(str): text to look for in the sales
+        date_from(datetime): earliest sale to return
+        date_to(datetime): latest sale to return
+
+    Returns:
+        sales(queryset): sales with their details prefetched, to be paged
+                         with pagination_query() or keyset_page()
+    """
+    sales = Sale.objects.filter(outlet_id=outlet_id)
+    if date_from:
+        sales = sales.filter(created_at__gte=date_from)
+    if date_to:
+        sales = sales.filter(created_at__lte=date_to)
+    if search:
+        sales = search_sales(sales, search)
+    return sales.select_related(
+        'customer', 'sales_person', 'outlet'
+    ).prefetch_related(
+        'saledetail_set__product'
+    ).order_by('-created_at', '-id')
@@ -1,35 +1,159 @@
-from healthid.apps.sales.models import BatchHistory
-from healthid.apps.outlets.models import Outlet
-from healthid.apps.business.models import Business
-from healthid.utils.app_utils.send_mail import SendMail
-from healthid.apps.sales.models import Sale
-from django.contrib.auth import get_user_model
-import pytz
 import datetime
-from django.db.models import Sum, Count
-
-
-
-date_today_before = datetime.datetime.now().replace(
-    hour=0, minute=0, second=0, microsecond=000000)
-date_today_after = datetime.datetime.now().replace(
-    hour=23, minute=59, second=59, microsecond=999999)
 
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
 
-def send_sales_report():
+from healthid.apps.business.models import Business
+from healthid.apps.outlets.models import Outlet
+from healthid.apps.sales.models import BatchHistory
+from healthid.utils.app_utils.send_mail import SendMail
 
-    businesses = Business.objects.all()
+SALES_METRICS = ('number_sold', 'qty_sold', 'cash', 'card', 'sold_amount')
+# keys the metrics are reported under, for outlets and cashiers alike
+METRIC_KEYS = dict(zip(SALES_METRICS, (
+    'total_number_sold', 'total_qty_sold', 'total_amount_cash',
+    'total_amount_card', 'sold_amount')))
+
+
+def sales_report_window(report_date=None):
+    """
+    Get the bounds of the day a sales report covers.
+
+    Args:
+        report_date(date): day of the report, today when omitted
+
+    Returns:
+        window(tuple): first and last moment of the day in the current
+                       timezone
+    """
+    report_date = report_date or timezone.localdate()
+    return (
+        timezone.make_aware(
+            datetime.datetime.combine(report_date, datetime.time.min)),
+        timezone.make_aware(
+            datetime.datetime.combine(report_date, datetime.time.max)))
+
+
+def empty_metrics():
+    # counts start at zero while sums stay empty until a sale is made
+    return {key: 0 if metric == 'number_sold' else None
+            for metric, key in METRIC_KEYS.items()}
+
+
+def add_metrics(report, totals):
+    for metric, key in METRIC_KEYS.items():
+        if totals[metric] is not None:
+            report[key] = (report[key] or 0) + totals[metric]
+
+
+def cashier_sales_totals(sales):
+    """
+    Compute every metric of every cashier of every outlet in one grouped
+    query.
+
+    Args:
+        sales(queryset): BatchHistory rows covered by the report
+
+    Returns:
+        totals(queryset): one row per outlet and cashier holding the
+                          SALES_METRICS and the cashier's details
+    """
+    paid_amount = 'sale__paid_amount'
+    return sales.values(
+        'sale__outlet_id', 'sale__sales_person_id',
+        'sale__sales_person__first_name', 'sale__sales_person__email',
+        'sale__sales_person__role__name'
+    ).annotate(
+        number_sold=Count('product'),
+        qty_sold=Sum('quantity_taken'),
+        cash=Sum(paid_amount, filter=Q(sale__payment_method='cash')),
+        card=Sum(paid_amount, filter=Q(sale__payment_method='card')),
+        sold_amount=Sum(paid_amount)
+    ).order_by('sale__outlet_id', 'sale__sales_person_id')
+
+
+def sold_products(sales):
+    """
+    Stream the product level breakdown of the sales covered by a report.
+    """
+    return sales.values_list(
+        'sale__outlet_id', 'sale__sales_person_id',
+        'product__product_name', 'quantity_taken', 'batch_info_id',
+        'batch_info__expiry_date').order_by('created_at').iterator()
+
+
+def build_sales_report(business_ids=None, report_date=None):
+    """
+    Build the daily sales performance of businesses, per outlet and per
+    cashier, with a fixed number of queries whatever the number of
+    businesses, outlets and cashiers.
+
+    Args:
+        business_ids(list): businesses to report on, all when omitted
+        report_date(date): day to report on, today when omitted
+
+    Returns:
+        report(dict): list of outlet reports keyed by business id. An
+                      outlet report holds its totals and its 'cashiers',
+                      each holding the same totals and their
+                      'product_list'.
+    """
+    if business_ids is None:
+        business_ids = Business.objects.values_list('id', flat=True)
+    business_ids = list(business_ids)
+    date_from, date_to = sales_report_window(report_date)
+    report = {business_id: [] for business_id in business_ids}
+    outlets = {}
+    for outlet in Outlet.objects.filter(
+            business_id__in=business_ids).values('id', 'name', 'business_id'):
+        outlet_report = {'id': outlet['id'], 'name': outlet['name'],
+                         **empty_metrics(), 'cashiers': []}
+        report[outlet['business_id']].append(outlet_report)
+        outlets[outlet['id']] = outlet_report
+
+    sales = BatchHistory.objects.filter(
+        created_at__gte=date_from, created_at__lte=date_to,
+        sale__outlet_id__in=outlets)
+    cashiers = {}
+    for totals in cashier_sales_totals(sales):
+        outlet_report = outlets[totals['sale__outlet_id']]
+        add_metrics(outlet_report, totals)
+        cashier = {
+            'user_id': totals['sale__sales_person_id'],
+            'user_name': '{}, {}, {}'.format(
+                totals['sale__sales_person__first_name'],
+                totals['sale__sales_person__email'],
+                totals['sale__sales_person__role__name']),
+            **empty_metrics(),
+            'product_list': []
+        }
+        add_metrics(cashier, totals)
+        outlet_report['cashiers'].append(cashier)
+        cashiers[totals['sale__outlet_id'], cashier['user_id']] = cashier
+
+    for (outlet_id, sales_person_id, product_name, quantity, batch_id,
+         expiry_date) in sold_products(sales):
+        cashiers[outlet_id, sales_person_id]['product_list'].append({
+            'product_name': product_name,
+            'qty_sold': quantity,
+            'batch_nbr': batch_id,
+            'expire_date': expiry_date
+        })
+    return report
+
+
+def send_sales_report(report_date=None):
+    """
+    Email every business owner the daily sales report of their business.
+    """
+    businesses = Business.objects.select_related('user')
+    report = build_sales_report(
+        [business.id for business in businesses], report_date)
     for business in businesses:
-        generate_report(business.id, str(business.user))
+        generate_report(report[business.id], str(business.user))
 
 
-def generate_report(business_id, user_email):
-    sales_data = check_user_sales()
-    for index in range(len(sales_data)):
-        for key in sales_data[index].keys():
-            if key == business_id:
-                sale_performance = sales_data[index][''+key+'']
-
+def generate_report(sale_performance, user_email):
     to_email = [
         user_email
         ]
@@ -44,110 +168,3 @@ def generate_report(business_id, user_email):
     send_mail = SendMail(
         sales_report_template, context, subject, to_email)
     send_mail.send()
-
-def check_user_sales():
-    businesses = business_list()
-    outlets_businesses = outlets_business(businesses)
-    return outlets_businesses
-
-
-def calculate_sales(outlet_id):
-
-    info = []
-    users = BatchHistory.objects.filter(created_at__gte=date_today_before).filter(
-        created_at__lte=date_today_after).filter(sale__outlet_id=outlet_id).distinct('sale__sales_person_id')
-
-
-    for user in users:
-        user_info = {}
-        user_info['user_id'] = user.sale.sales_person_id
-        user_info['user_name'] = f'{user.sale.sales_person.first_name}, {user.sale.sales_person.email}, {user.sale.sales_person.role.name}'
-        user_info['Total_number_of_Products_sold'] = person_sales_total(user.sale.sales_person_id, outlet_id, 'total_number_per_day')
-        user_info['Total_qty_of_Products_sold'] = person_sales_total(user.sale.sales_person_id, outlet_id, 'total_qty_per_day')
-        user_info['total_cash_per_day'] = person_sales_total(user.sale.sales_person_id, outlet_id, 'person_cash_per_day')
-        user_info['total_card_per_day'] = person_sales_total(user.sale.sales_person_id, outlet_id, 'person_card_per_day')
-        user_info['total_amount_day'] = person_sales_total(user.sale.sales_person_id, outlet_id, 'total_amount_day')
-        user_info['product_list'] = person_sales_total(user.sale.sales_person_id, outlet_id, 'product_list')
-        info.append(user_info)
-    return info
-
-
-def person_sales_total( id, outlet_id ,types):
-    if types == 'total_number_per_day':
-        total_number_per_day = BatchHistory.objects.filter(created_at__gte=date_today_before).filter(
-            created_at__lte=date_today_after).filter(sale__sales_person_id=id).filter(sale__outlet_id=outlet_id).aggregate(number=Count('product__product_name'))
-        return total_number_per_day['number']
-    elif types == 'person_cash_per_day':
-        amount_in_cash = BatchHistory.objects.filter(created_at__gte=date_today_before).filter(
-            created_at__lte=date_today_after).filter(sale__sales_person_id=id).filter(sale__outlet_id=outlet_id).filter(sale__payment_method='cash').aggregate(Sum_cash=Sum('sale__paid_amount'))
-        return amount_in_cash['Sum_cash']
-    elif types == 'person_card_per_day':
-        amount_in_card = BatchHistory.objects.filter(created_at__gte=date_today_before).filter(
-            created_at__lte=date_today_after).filter(sale__sales_person_id=id).filter(sale__outlet_id=outlet_id).filter(sale__payment_method='card').aggregate(Sum_card=Sum('sale__paid_amount'))
-        return amount_in_card['Sum_card']
-    elif types == 'total_qty_per_day':
-        total_qty_per_day = BatchHistory.objects.filter(created_at__gte=date_today_before).filter(
-            created_at__lte=date_today_after).filter(sale__sales_person_id=id).filter(sale__outlet_id=outlet_id).aggregate(qty=Sum('quantity_taken'))
-        return total_qty_per_day['qty']
-    elif types == 'total_amount_day':
-        total_amount_day = BatchHistory.objects.filter(sale__sales_person_id=id).filter(sale__outlet_id=outlet_id).filter(created_at__gte=date_today_before).filter(
-            created_at__lte=date_today_after).aggregate(total_amount_day=Sum('sale__paid_amount'))
-        return total_amount_day['total_amount_day']
-    elif types == 'product_list':
-        list_item = []
-        product_list = BatchHistory.objects.filter(created_at__gte=date_today_before).filter(sale__outlet_id=outlet_id).filter(created_at__lte=date_today_after).filter(sale__sales_person_id=id)
-        for i in product_list:
-            item = {}
-            item['product_name'] = i.product.product_name
-            item['qty_sold'] = i.quantity_taken
-            item['batch_nbr'] = i.batch_info.id
-            item['expire_date'] = i.batch_info.expiry_date
-            list_item.append(item)
-        return list_item
-
-
-def business_list():
-    business_ids = Business.objects.all()
-    ids = [{f'{business.id}':None} for business in business_ids]
-    return ids
-
-
-def outlets_business(business_list):
-    business = business_list
-    for index in range(len(business)):
-        for key in business[index].keys():
-            business[index][''+key+''] = []
-            outlet_one = Outlet.objects.filter(business_id = f'{key}')
-            for i in outlet_one:
-                obj = {}
-                obj['id'] = i.id
-                obj['name'] = i.name
-                obj['total_number_sold'] = outlet_sales_total(i.id, 'number_sold')
-                obj['total_qty_sold'] = outlet_sales_total(i.id,'qty_sold')
-                obj['total_amount_cash'] = outlet_sales_total(i.id, 'cash')
-                obj['total_amount_card'] = outlet_sales_total(i.id, 'card')
-                obj['sold_amount'] = outlet_sales_total(i.id, 'sold_amount')
-                obj['salers'] = calculate_sales(i.id)
-                business[index][''+key+''].append(obj)
-    return business
-
-def outlet_sales_total(key, types):
-    if types == 'number_sold':
-        total_number_product = BatchHistory.objects.filter(sale__outlet_id=key).filter(
-            created_at__gte=date_today_before).filter(created_at__lte=date_today_after).aggregate(total_pro=Count('product__product_name'))
-        return total_number_product['total_pro']
-    elif types == 'qty_sold':
-        total_sold_product = BatchHistory.objects.filter(sale__outlet_id=key).filter(
-        created_at__gte=date_today_before).filter(created_at__lte=date_today_after).aggregate(total_pro=Sum('quantity_taken'))
-        return total_sold_product['total_pro']
-    elif types == 'cash':
-        total_cash = BatchHistory.objects.filter(sale__outlet_id=key).filter(created_at__gte=date_today_before).filter(created_at__lte=date_today_after).filter(sale__payment_method='cash').aggregate(total_cash=Sum('sale__paid_amount'))
-        return total_cash['total_cash']
-    elif types == 'card':
-        total_card = BatchHistory.objects.filter(sale__outlet_id=key).filter(
-            created_at__gte=date_today_before).filter(created_at__lte=date_today_after).filter(sale__payment_method='card').aggregate(total_card=Sum('sale__paid_amount'))
-        return total_card['total_card']
-    elif types == 'sold_amount':
-        sold_amount = BatchHistory.objects.filter(sale__outlet_id=key).filter(created_at__gte=date_today_before).filter(created_at__lte=date_today_after).aggregate(total_day=Sum('sale__paid_amount'))
-        return sold_amount['total_day']
-
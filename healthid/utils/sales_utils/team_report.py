@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Count, Min, Q, Sum
+
+from healthid.apps.sales.models import BatchHistory
+
+
+def team_report_version_key(business_id):
+    return f'team_report_version:{business_id}'
+
+
+def invalidate_team_report(business_id):
+    """
+    Drop the cached team reports of a business by moving its reports to
+    a new version.
+    """
+    key = team_report_version_key(business_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def team_sales_totals(business_id, date_from, date_to):
+    """
+    Compute the totals of every sales person of a business in one grouped
+    query.
+
+    Args:
+        business_id(str): business the sales people belong to
+        date_from(datetime): start of the period reported on
+        date_to(datetime): end of the period reported on
+
+    Returns:
+        totals(queryset): one row per sales person, holding the id of
+                          their first BatchHistory row as 'first_sale'
+    """
+    paid_amount = 'sale__paid_amount'
+    return BatchHistory.objects.filter(
+        created_at__gte=date_from, created_at__lte=date_to,
+        sale__sales_person__user_business__business_id=business_id
+    ).values('sale__sales_person_id').annotate(
+        first_sale=Min('id'),
+        total_products_sold=Count('product__product_name', distinct=True),
+        total_qty_sold=Sum('quantity_taken'),
+        total_cash_amount=Sum(
+            paid_amount, filter=Q(sale__payment_method='cash')),
+        total_card_amount=Sum(
+            paid_amount, filter=Q(sale__payment_method='card'))
+    ).order_by('sale__sales_person_id')
+
+
+def build_team_report(business_id, date_from, date_to, page_count=None,
+                      page_number=None):
+    totals = team_sales_totals(business_id, date_from, date_to)
+    if page_count and page_number:
+        totals = Paginator(totals, page_count).get_page(page_number)
+    totals = list(totals)
+    sales = BatchHistory.objects.select_related(
+        'sale__sales_person').in_bulk(
+            [sales_totals['first_sale'] for sales_totals in totals])
+    report = []
+    for sales_totals in totals:
+        sale = sales[sales_totals['first_sale']]
+        sale.totalProductsSold = sales_totals['total_products_sold']
+        sale.totalQtySold = sales_totals['total_qty_sold'] or 0
+        sale.totalCashAmount = sales_totals['total_cash_amount'] or 0
+        sale.totalCardAmount = sales_totals['total_card_amount'] or 0
+        report.append(sale)
+    return report
+
+
+def team_performance(business_id, date_from, date_to, page_count=None,
+                     page_number=None):
+    """
+    Get the sales performance of every sales person of a business over a
+    period, a page at a time when a page is given.
+
+    When TEAM_REPORT_CACHE_TIMEOUT is set, reports are cached per
+    business, period and page until a sale is made in the business.
+
+    Returns:
+        report(list): one BatchHistory row per sales person, holding
+                      their totalProductsSold, totalQtySold,
+                      totalCashAmount and totalCardAmount
+    """
+    if not settings.TEAM_REPORT_CACHE_TIMEOUT:
+        return build_team_report(
+            business_id, date_from, date_to, page_count, page_number)
+    version = cache.get_or_set(team_report_version_key(business_id), 0, None)
+    key = 'team_report:{}:{}:{}:{}:{}:{}'.format(
+        business_id, version, date_from.isoformat(), date_to.isoformat(),
+        page_count, page_number)
+    report = cache.get(key)
+    if report is None:
+        report = build_team_report(
+            business_id, date_from, date_to, page_count, page_number)
+        cache.set(key, report, settings.TEAM_REPORT_CACHE_TIMEOUT)
+    return report
@@ -37,7 +37,7 @@ class SalesValidator:
                 x.batch_id)
         )
         for batch in self.sorted_batch_queryset:
-            self.product_ids.append(batch.product.id)
+            self.product_ids.append(batch.product_id)
 
         self.product_queryset = self.get_products()
         self.products_db_ids = self.product_queryset.values_list(
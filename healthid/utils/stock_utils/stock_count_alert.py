@@ -1,4 +1,3 @@
-import threading
 from datetime import datetime, timedelta
 
 from healthid.apps.stock.models import StockCountTemplate
@@ -6,6 +5,8 @@ from healthid.apps.events.models import Event, EventType
 from healthid.utils.app_utils.database import (SaveContextManager)
 from healthid.utils.app_utils.send_mail import SendMail
 from healthid.utils.notifications_utils.handle_notifications import notify
+from healthid.utils.notifications_utils.notification_executor import \
+    submit_notification
 
 
 def generate_stock_counts_notifications():
@@ -31,10 +32,8 @@ def generate_stock_counts_notifications():
             }
             send_mail = SendMail(email_stock_template,
                                  context, subject, to_email)
-            thread = threading.Thread(target=notify_users(
-                send_mail, assigned_users, messg),
-                daemon=True)
-            thread.start()
+            submit_notification(
+                notify_users, send_mail, assigned_users, messg)
 
 
 def notify_users(send_mail, assigned_users, message):
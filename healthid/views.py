@@ -1,25 +1,25 @@
-import csv
-import io
-import traceback
-import sys
-from django.shortcuts import render
-from django.db.models import Count, Sum, F
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from graphene_django.views import GraphQLView
+from graphql import GraphQLError, parse
+from graphql.error import GraphQLSyntaxError
+from graphql.execution import ExecutionResult
+from graphql_jwt.exceptions import JSONWebTokenError
+from graphql_jwt.settings import jwt_settings
+from graphql_jwt.utils import get_http_authorization, get_payload
 from rest_framework import status
 from rest_framework.authentication import (SessionAuthentication,
                                            TokenAuthentication)
 from rest_framework.parsers import MultiPartParser
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from healthid.apps.imports.models import ImportJob
 from healthid.apps.products.models import Product, BatchInfo
 from healthid.apps.orders.models.suppliers import \
     (Suppliers, SuppliersContacts, SuppliersMeta)
 from healthid.apps.profiles.models import Profile
 from healthid.apps.products.serializers import ProductsSerializer
-from healthid.utils.orders_utils.add_supplier import AddSupplier
 from healthid.utils.product_utils.handle_csv_export import handle_csv_export
-from healthid.utils.product_utils.handle_csv_upload import HandleCsvValidations
 from healthid.utils.constants.product_constants import (
     PRODUCT_INCLUDE_CSV_FIELDS, BATCH_INFO_CSV_FIELDS)
 from healthid.utils.constants.customer_constants import (
@@ -27,12 +27,12 @@ from healthid.utils.constants.customer_constants import (
 from healthid.utils.constants.suppliers_infor_constants import \
     SUPPLIERS_INCLUDE_CSV_FIELDS
 from healthid.utils.csv_export.generate_csv import generate_csv_response
-from healthid.utils.customer_utils.handle_customer_csv_upload import\
-    HandleCustomerCSVValidation
+from healthid.utils.csv_import.csv_upload import CSV_UPLOADS
+from healthid.utils.csv_import.import_jobs import (import_job_status,
+                                                   queue_import_job)
+from healthid.utils.app_utils.profiling import recent_profiles
+from healthid.utils.app_utils.query_cost import check_query_cost
 from healthid.utils.messages.common_responses import ERROR_RESPONSES
-from healthid.utils.messages.products_responses import (
-    PRODUCTS_SUCCESS_RESPONSES
-)
 
 
 class HandleCSV(APIView):
@@ -43,238 +43,46 @@ class HandleCSV(APIView):
     def post(self, request, param, format=None):
         """
         Rest API post method that is meant to handle the mass,
-        upload of information from csv files
+        upload of information from csv files. The file is queued for
+        import in the background, see ImportJobStatus for its progress.
         :param request: Will be used to extract the file type
         :param param: endpoint parameter confirming the nature of info,
                       expected in the csv
         :param format:
-        :return: Throws error on validation failure and returns,
-                  success on Successful data upload
+        :return: Throws error on an invalid file or parameter and returns,
+                  the queued import job otherwise
         """
-        handle_csv_object = HandleCsvValidations()
-        handle_customer_csv_object = HandleCustomerCSVValidation()
-        handle_supplier_csv_object = AddSupplier()
-        retail_pro_suppliers = handle_supplier_csv_object.retail_pro_suppliers
-        quick_books_suppliers = \
-            handle_supplier_csv_object.quick_books_suppliers
-        handle_csv = handle_csv_object.handle_csv_upload
-        retail_pro_csv_upload = handle_csv_object.handle_retail_pro_csv_upload
-        quick_box_csv_upload = handle_csv_object.handle_quick_box_csv_upload
-        handle_supplier_csv = handle_supplier_csv_object.handle_csv_upload
-        handle_customer_csv_upload =\
-            handle_customer_csv_object.handle_customer_csv_upload
-        handle_cutomer_retail_pro_csv_upload =\
-            handle_customer_csv_object.handle_cutomer_retail_pro_csv_upload
-        handle_cutomer_quickbooks_csv_upload =\
-            handle_customer_csv_object.handle_cutomer_quickbooks_csv_upload
+        if param not in CSV_UPLOADS:
+            message = {"error": ERROR_RESPONSES['wrong_param']}
+            return Response(message, status.HTTP_400_BAD_REQUEST)
         csv_file = request.FILES['file']
 
         if not csv_file.name.endswith('.csv'):
             message = {"error": "Please upload a csv file"}
             return Response(message, status.HTTP_400_BAD_REQUEST)
-        data_set = csv_file.read().decode('UTF-8')
-
-        io_string = io.StringIO(data_set)
-        on_duplication = request.POST.get('on_duplication')
-        try:
-            if param == 'suppliers':
-                user = request.user
-                res = handle_supplier_csv(user=user,
-                                          io_string=io_string,
-                                          on_duplication=on_duplication)
-                added_suppliers = res['supplier_count']
-                message = {
-                    "success": "Successfully added supplier(s)",
-                    "noOfSuppliersAdded": res['supplier_count'],
-                    "duplicatedSuppliers": res['duplicated_suppliers'],
-                }
-                if added_suppliers == 0 and len(res['duplicated_suppliers']):
-                    return Response(
-                        {
-                            "message":
-                            "No supplier has been added due to duplication",
-                            "duplicatedSuppliers": res['duplicated_suppliers']
-                        },
-                        status.HTTP_400_BAD_REQUEST
-                    )
-                return Response(message, status.HTTP_201_CREATED)
-
-            if param == 'retail_pro_suppliers':
-                user = request.user
-                res = retail_pro_suppliers(user=user,
-                                           io_string=io_string,
-                                           on_duplication=on_duplication)
-                added_suppliers = res['supplier_count']
-                message = {
-                    "success": "Successfully added supplier(s)",
-                    "noOfSuppliersAdded": res['supplier_count'],
-                    "duplicatedSuppliers": res['duplicated_suppliers'],
-                }
-                if added_suppliers == 0 and len(res['duplicated_suppliers']):
-                    return Response(
-                        {
-                            "message":
-                            "No supplier has been added due to duplication",
-                            "duplicatedSuppliers": res['duplicated_suppliers']
-                        },
-                        status.HTTP_400_BAD_REQUEST
-                    )
-                return Response(message, status.HTTP_201_CREATED)
-            if param == 'quick_books_suppliers':
-                user = request.user
-                res = quick_books_suppliers(user=user,
-                                            io_string=io_string,
-                                            on_duplication=on_duplication)
-                added_suppliers = res['supplier_count']
-                message = {
-                    "success": "Successfully added supplier(s)",
-                    "noOfSuppliersAdded": res['supplier_count'],
-                    "duplicatedSuppliers": res['duplicated_suppliers'],
-                }
-                if added_suppliers == 0 and len(res['duplicated_suppliers']):
-                    return Response(
-                        {
-                            "message":
-                            "No supplier has been added due to duplication",
-                            "duplicatedSuppliers": res['duplicated_suppliers']
-                        },
-                        status.HTTP_400_BAD_REQUEST
-                    )
-                return Response(message, status.HTTP_201_CREATED)
 
-            if param == 'products':
-                user = request.user
-                result = handle_csv(io_string=io_string,
-                                    user=user,
-                                    on_duplication=on_duplication)
-                message = {
-                    "message": ("Products successfully added"
-                                if result['product_count']
-                                else "No new products added"),
-                    "noOfProductsAdded": result['product_count'],
-                    "duplicatedProducts": result['duplicated_products'],
-                }
-                return Response(message,
-                                status.HTTP_201_CREATED
-                                if result['product_count']
-                                else status.HTTP_400_BAD_REQUEST)
-            if param == 'retail_pro_products':
-                user = request.user
-                result = retail_pro_csv_upload(io_string=io_string,
-                                               user=user)
-                if result['business_id']:
-                    message = {"message": ("Products successfully added"
-                                           if result['product_count']
-                                           else "No new products added"),
-                               "noOfProductsAdded": result['product_count'],
-                               "noOfProductsUpdated": result['update_count'],
-                               "noOfErrorsEncountered": result['error_count']
-                               }
-                    return Response(message,
-                                    status.HTTP_201_CREATED
-                                    if result['product_count']  or result['update_count']
-                                    else status.HTTP_400_BAD_REQUEST
-                                    )
-                else:
-                    message = \
-                        {"message":
-                         "Business id associated with this user is not found"
-                         }
-                    return Response(message)
-            if param == 'quick_books_products':
-                user = request.user
-                result = quick_box_csv_upload(io_string=io_string,
-                                              user=user)
-                if result['business_id']:
-                    message = {"message": ("Products successfully added"
-                                           if result['product_count']
-                                           else "No new products added"),
-                               "noOfProductsAdded": result['product_count'],
-                               "noOfProductsUpdated": result['update_count'],
-                               "noOfErrorsEncountered": result['error_count']
-                               }
-                    return Response(message,
-                                    status.HTTP_201_CREATED
-                                    if (result['product_count'] or result['update_count'])
-                                    else status.HTTP_400_BAD_REQUEST
-                                    )
-                else:
-                    message = {"message": "Business id associated with this user is not found"
-                               }
-                    return Response(message)
-            if param == 'customers':
-                user = request.user
-                result = handle_customer_csv_upload(
-                    io_string=io_string, user=user)
-                message = {
-                    "message": ("Customers successfully added"
-                                if result
-                                else "No new customers added"),
-                    "noOfCustomersAdded": result
-                }
-                return Response(message,
-                                status.HTTP_201_CREATED
-                                if result
-                                else status.HTTP_400_BAD_REQUEST
-                                )
+        job = queue_import_job(request.user, param, csv_file,
+                               request.POST.get('on_duplication'))
+        return Response(import_job_status(job), status.HTTP_202_ACCEPTED)
 
-            if param == 'retail_pro_customers':
-                user = request.user
-                result, duplicate_counts = handle_cutomer_retail_pro_csv_upload(
-                    io_string=io_string, user=user)
-                message = {
-                    "message": ("Customers successfully added"
-                                if result
-                                else "No new customers added"),
-                    "noOfCustomersAdded": result,
-                    "noOfDuplicates": duplicate_counts
-                }
-                return Response(message,
-                                status.HTTP_201_CREATED
-                                if result
-                                else status.HTTP_400_BAD_REQUEST
-                                )
 
-            if param == 'quick_books_customers':
-                user = request.user
-                result = handle_cutomer_quickbooks_csv_upload(
-                    io_string=io_string, user=user)
-                message = {
-                    "message": ("Customers successfully added"
-                                if result
-                                else "No new customers added"),
-                    "noOfCustomersAdded": result
-                }
-                return Response(message,
-                                status.HTTP_201_CREATED
-                                if result
-                                else status.HTTP_400_BAD_REQUEST
-                                )
-            if param == 'batch_info':
-                user = request.user
-                handle_csv_object.handle_batch_csv_upload(user, io_string)
-                message = {
-                    "success": PRODUCTS_SUCCESS_RESPONSES[
-                        "batch_upload_success"
-                    ]
-                }
-                return Response(message, status.HTTP_201_CREATED)
-            
-            if param == 'stale_products':
-                user = request.user
-                result = handle_csv_object.unapprove_stale_product(user, io_string)
-                message = {
-                    "success": PRODUCTS_SUCCESS_RESPONSES[
-                        "batch_upload_success"
-                    ],
-                    "noOfProductsFlagged": result,
-                }
-                return Response(message, status.HTTP_201_CREATED)
-
-        except Exception as e:
-            traceback.print_exc(file=sys.stdout)
-            raise e
+class ImportJobStatus(APIView):
+    authentication_classes = (SessionAuthentication, TokenAuthentication)
+    permission_classes = (IsAuthenticated, )
 
+    def get(self, request, job_id, format=None):
+        """
+        Rest API get method reporting the progress of a csv upload
+        :param request:
+        :param job_id: id of the import job returned by the upload
+        :return: the status, progress and outcome of the import
+        """
+        job = ImportJob.objects.filter(id=job_id, user=request.user).first()
+        if job is None:
+            message = {"error": ERROR_RESPONSES[
+                'inexistent_record_query_error'].format('Import job')}
+            return Response(message, status.HTTP_404_NOT_FOUND)
+        return Response(import_job_status(job), status.HTTP_200_OK)
 
 
 class HandleCsvExport(APIView):
@@ -283,30 +91,30 @@ class HandleCsvExport(APIView):
     serializer_class = ProductsSerializer
 
     def post(self, request, param):
+        """
+        Rest API post method streaming the approved products as a csv
+        file, so that large catalogues start downloading right away
+        :param request: may hold the fields to include or exclude and a
+                        limit on the number of products
+        :param param: nature of the information to export
+        :return: the streamed csv file
+        """
         if param == 'products':
             limit = request.data.get('limit', None)
-            query_set = Product.objects.filter(is_approved=True)[:limit]
-            serializer = self.serializer_class(query_set, many=True)
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = \
-                'attachment; filename="products.csv"'
+            query_set = Product.objects.filter(
+                is_approved=True).order_by('id')[:limit]
             headers = self.serializer_class.Meta.fields.copy()
+            custom_headers = list()
             if request.data is not None:
-                custom_headers = list()
                 for key, value in request.data.items():
                     handle_csv_export.validate_request_data(
                         custom_headers, headers, key, value)
             headers = custom_headers if custom_headers else headers
-            headers = \
-                [handle_csv_export.capitalize(word) for word in headers]
-            writer = csv.DictWriter(
-                response,
-                fieldnames=headers,
-                extrasaction='ignore')
-            writer.writeheader()
-            for product in serializer.data:
-                product = handle_csv_export.write_csv(product, request)
-                writer.writerow(product)
+            response = StreamingHttpResponse(
+                handle_csv_export.stream_products(query_set, headers),
+                content_type='text/csv')
+            response['Content-Disposition'] = \
+                'attachment; filename="products.csv"'
             return response
 
 
@@ -355,3 +163,72 @@ class EmptyCsvFileExport(APIView):
             response = Response(ERROR_RESPONSES["wrong_param"],
                                 status.HTTP_404_NOT_FOUND)
         return response
+
+
+class GraphQLProfiles(APIView):
+    authentication_classes = (SessionAuthentication, TokenAuthentication)
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request, format=None):
+        """
+        Rest API get method listing the GraphQL operations recently
+        profiled by this process, for staff users
+        :param request: may hold an operation to list the profiles of
+        :return: the profiles, the most recent first
+        """
+        profiles = recent_profiles()
+        operation = request.query_params.get('operation')
+        if operation:
+            profiles = [profile for profile in profiles
+                        if profile['operation'] == operation]
+        return Response(profiles, status.HTTP_200_OK)
+
+
+class CostLimitedGraphQLView(GraphQLView):
+    """
+    GraphQL endpoint rejecting operations too deep or costly before they
+    run, and reporting the cost of the others in the response extensions.
+    """
+
+    def execute_graphql_request(self, request, data, query, variables,
+                                operation_name, show_graphiql=False):
+        if query:
+            try:
+                document_ast = parse(query)
+            except GraphQLSyntaxError:
+                document_ast = None
+            if document_ast is not None:
+                try:
+                    request.query_cost = check_query_cost(
+                        self.schema, document_ast, variables,
+                        operation_name, self.cost_budget_key(request))
+                except GraphQLError as error:
+                    return ExecutionResult(errors=[error], invalid=True)
+        return super().execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql)
+
+    @staticmethod
+    def cost_budget_key(request):
+        """
+        Get the user whose budget an operation is spent from: the user of
+        its token, read without a query as the token is only checked
+        when the operation runs, else the session user or the client
+        address.
+        """
+        token = get_http_authorization(request)
+        if token:
+            try:
+                return jwt_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(
+                    get_payload(token))
+            except JSONWebTokenError:
+                pass
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.id
+        return request.META.get('REMOTE_ADDR')
+
+    def json_encode(self, request, d, pretty=False):
+        query_cost = getattr(request, 'query_cost', None)
+        if query_cost is not None and isinstance(d, dict):
+            d['extensions'] = {'cost': query_cost}
+        return super().json_encode(request, d, pretty)
@@ -37,5 +37,8 @@ python3 manage.py makemigrations && python3 manage.py migrate
 echo "<<<<<<<<<<<<<<<<<<<< START API >>>>>>>>>>>>>>>>>>>>>>>>"
 sleep 3
 
+# Start the scheduled jobs, run by a single process
+python3 manage.py run_scheduler &
+
 # Start the API
 gunicorn --workers 2 -t 3600 healthid.wsgi -b 0.0.0.0:80 --access-logfile '-' --reload